@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+bench_results.py
+
+Common result format of the benchmark harnesses and a regression gate.
+
+A run is a JSON document with a schema version, the host fingerprint, the git
+revision and, for every configuration, the per-trial values of its metrics:
+
+    {
+      "schema": "bench-results", "version": 1,
+      "harness": "task3/task1", "created": "2025-01-01T12:00:00+00:00",
+      "host": {...}, "git": {"revision": "...", "dirty": false},
+      "metrics": {"time_ms": {"unit": "ms", "better": "lower"}},
+      "records": [{"config": {"threads": 4}, "metrics": {"time_ms": [10.1, 10.3]}}]
+    }
+
+The compare command tests every metric of every configuration present in both
+runs with a one-sided Mann-Whitney U test, corrects the p-values of the gated
+metrics of each configuration for multiple comparisons with the Holm method and
+exits with 1 on significant regressions. A comparison with too few trials to
+ever reach significance is inconclusive and makes it exit with 3 instead of
+passing. Metrics described with gate=False, such as context switches or
+system-wide memory, are only shown:
+
+    python common/bench_results.py compare baseline.json current.json
+
+The harnesses import this module as common.bench_results, so they are run with
+the repository root on PYTHONPATH, e.g. PYTHONPATH=../.. python benchmark.py.
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = "bench-results"
+SCHEMA_VERSION = 1
+
+
+def host_fingerprint() -> Dict[str, object]:
+    """
+    Description of the machine a run was made on.
+
+    Returns:
+        Host name, OS, CPU model and count, memory size and Python version.
+    """
+    memory = None
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        pass
+
+    processor = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    processor = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    return {
+        "node": platform.node(),
+        "system": f"{platform.system()} {platform.release()}",
+        "machine": platform.machine(),
+        "processor": processor,
+        "cpu_count": os.cpu_count(),
+        "memory_bytes": memory,
+        "python": platform.python_version(),
+    }
+
+
+def git_revision(path: str = ".") -> Dict[str, object]:
+    """
+    Git revision of the working tree containing path.
+
+    Args:
+        path: Any path inside the repository.
+
+    Returns:
+        Commit hash and whether there are uncommitted changes; None values outside git.
+    """
+    directory = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directory,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directory,
+                                capture_output=True, text=True, check=True).stdout
+        return {"revision": revision, "dirty": bool(status.strip())}
+    except (OSError, subprocess.CalledProcessError):
+        return {"revision": None, "dirty": None}
+
+
+def _config_key(config: Dict[str, object]) -> str:
+    return json.dumps(config, sort_keys=True)
+
+
+class BenchRun:
+    """
+    Results of one harness run in the common format.
+
+    Args:
+        harness: Name of the harness, e.g. task3/task1.
+        source: Path inside the repository used to find the git revision.
+    """
+
+    def __init__(self, harness: str, source: str = "."):
+        self.data = {
+            "schema": SCHEMA,
+            "version": SCHEMA_VERSION,
+            "harness": harness,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "host": host_fingerprint(),
+            "git": git_revision(source),
+            "metrics": {},
+            "records": [],
+        }
+        self._records: Dict[str, Dict[str, object]] = {}
+
+    def describe(self, metric: str, unit: str, better: str = "lower", gate: bool = True) -> None:
+        """
+        Declare the unit of a metric and whether lower or higher values are better.
+
+        Args:
+            metric: Metric name.
+            unit: Unit, e.g. ms.
+            better: "lower" or "higher".
+            gate: Whether a regression of the metric fails the comparison; False
+                for informational metrics dominated by host noise.
+        """
+        if better not in ("lower", "higher"):
+            raise ValueError("better must be 'lower' or 'higher'")
+        self.data["metrics"][metric] = {"unit": unit, "better": better, "gate": gate}
+
+    def add_trial(self, config: Dict[str, object], **metrics: Optional[float]) -> None:
+        """
+        Append one trial of a configuration. None values are skipped.
+
+        Args:
+            config: Parameters of the configuration, JSON-serializable.
+            **metrics: Measured values by metric name.
+        """
+        key = _config_key(config)
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = {"config": dict(config), "metrics": {}}
+            self.data["records"].append(record)
+        for name, value in metrics.items():
+            if value is not None:
+                record["metrics"].setdefault(name, []).append(float(value))
+
+    def add_trials(self, config: Dict[str, object], metric: str, values: Iterable[Optional[float]]) -> None:
+        """Append several trials of one metric of a configuration."""
+        for value in values:
+            self.add_trial(config, **{metric: value})
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.data, file, indent=1)
+        print(f"Results written to {path}")
+
+
+def load_run(path: str) -> Dict[str, object]:
+    """
+    Read a run and check its schema.
+
+    Args:
+        path: Path to the JSON file.
+
+    Returns:
+        The run document.
+
+    Raises:
+        ValueError: If the file is not a supported bench-results document.
+    """
+    with open(path) as file:
+        data = json.load(file)
+    if data.get("schema") != SCHEMA or data.get("version", 0) > SCHEMA_VERSION:
+        raise ValueError(f"{path} is not a {SCHEMA} document of version <= {SCHEMA_VERSION}")
+    return data
+
+
+@lru_cache(maxsize=None)
+def _u_counts(m: int, n: int) -> Tuple[int, ...]:
+    """Number of arrangements of m and n values giving each U = 0..m*n, without ties."""
+    if m == 0 or n == 0:
+        return (1,)
+    # The largest value belongs to the first sample (adds n to U) or to the second
+    with_first = _u_counts(m - 1, n)
+    with_second = _u_counts(m, n - 1)
+    counts = [0] * (m * n + 1)
+    for u, count in enumerate(with_first):
+        counts[u + n] += count
+    for u, count in enumerate(with_second):
+        counts[u] += count
+    return tuple(counts)
+
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """
+    One-sided Mann-Whitney U test that current values tend to be greater than baseline ones.
+
+    Exact for small samples without ties, normal approximation with tie
+    correction otherwise.
+
+    Args:
+        current: Values of the new run.
+        baseline: Values of the baseline run.
+
+    Returns:
+        The p-value.
+    """
+    m, n = len(current), len(baseline)
+    if m == 0 or n == 0:
+        return math.nan
+    u = sum(1.0 if c > b else 0.5 if c == b else 0.0 for c, b in itertools.product(current, baseline))
+
+    values = current + baseline
+    ties = len(values) != len(set(values))
+    if not ties and m * n <= 400:
+        counts = _u_counts(m, n)
+        return sum(counts[math.ceil(u):]) / sum(counts)
+
+    tie_sizes = [values.count(v) for v in set(values)]
+    variance = m * n / 12 * ((m + n + 1) - sum(t ** 3 - t for t in tie_sizes) / ((m + n) * (m + n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - m * n / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def holm_adjust(p_values: List[float]) -> List[float]:
+    """
+    Holm-Bonferroni adjusted p-values, controlling the family-wise error rate.
+
+    Args:
+        p_values: Raw p-values of the family; NaN values are not counted.
+
+    Returns:
+        Adjusted p-values in the same order, NaN where the raw value is NaN.
+    """
+    order = sorted((i for i, p in enumerate(p_values) if not math.isnan(p)), key=lambda i: p_values[i])
+    adjusted = [math.nan] * len(p_values)
+    running = 0.0
+    for rank, i in enumerate(order):
+        running = max(running, min(1.0, (len(order) - rank) * p_values[i]))
+        adjusted[i] = running
+    return adjusted
+
+
+def smallest_p_value(m: int, n: int) -> float:
+    """
+    Smallest p-value the one-sided Mann-Whitney test can give for samples of sizes m and n.
+
+    Reached when the samples are fully separated without ties; the normal
+    approximation used for large samples only goes lower.
+    """
+    if m == 0 or n == 0:
+        return math.nan
+    return 1 / math.comb(m + n, m)
+
+
+def compare_runs(baseline: Dict[str, object], current: Dict[str, object], alpha: float = 0.05,
+                 threshold: float = 0.05,
+                 metrics: Optional[List[str]] = None) -> List[Dict[str, object]]:
+    """
+    Test every metric of the configurations present in both runs for a regression.
+
+    A metric regresses when the one-sided test is significant at alpha and its
+    median moved in the bad direction by more than threshold. The p-values of
+    the gated metrics of a configuration are Holm-adjusted as one family,
+    separately for regressions and improvements, so the error rate is
+    controlled per configuration and the trials a configuration needs do not
+    grow with the size of the sweep. A gated comparison whose trials are too
+    few to be significant after the adjustment, whatever the values, is
+    inconclusive. Informational metrics keep their raw p-values and never
+    regress.
+
+    Args:
+        baseline: Baseline run document.
+        current: New run document.
+        alpha: Significance level.
+        threshold: Minimal relative change of the median that counts.
+        metrics: Metrics to compare, all shared metrics by default.
+
+    Returns:
+        One row per configuration and metric with medians, ratio, p-value,
+        verdict (slower, faster, same or inconclusive) and whether the metric is gated.
+    """
+    info = {**baseline.get("metrics", {}), **current.get("metrics", {})}
+    baseline_records = {_config_key(r["config"]): r for r in baseline["records"]}
+    rows, tests = [], []
+    for record in current["records"]:
+        base = baseline_records.get(_config_key(record["config"]))
+        if base is None:
+            continue
+        for metric, values in record["metrics"].items():
+            if metrics and metric not in metrics or not base["metrics"].get(metric) or not values:
+                continue
+            base_values = base["metrics"][metric]
+            higher_is_better = info.get(metric, {}).get("better") == "higher"
+            if higher_is_better:
+                p_worse = mann_whitney_greater(base_values, values)
+                p_better = mann_whitney_greater(values, base_values)
+            else:
+                p_worse = mann_whitney_greater(values, base_values)
+                p_better = mann_whitney_greater(base_values, values)
+
+            base_median, median = statistics.median(base_values), statistics.median(values)
+            ratio = median / base_median if base_median else 1.0 if median == base_median else math.inf
+            change = (1 / ratio if ratio else math.inf) if higher_is_better else ratio
+            rows.append({
+                "config": record["config"], "metric": metric,
+                "baseline": base_median, "current": median, "ratio": ratio,
+                "gate": info.get(metric, {}).get("gate", True),
+                "trials": (len(base_values), len(values)),
+            })
+            tests.append((p_worse, p_better, change))
+
+    families: Dict[str, List[int]] = {}
+    for i, row in enumerate(rows):
+        if row["gate"]:
+            families.setdefault(_config_key(row["config"]), []).append(i)
+    adjusted = {}
+    for family in families.values():
+        worse = holm_adjust([tests[i][0] for i in family])
+        better = holm_adjust([tests[i][1] for i in family])
+        for i, p_worse, p_better in zip(family, worse, better):
+            adjusted[i] = (p_worse, p_better, len(family))
+
+    for i, (row, (p_worse, p_better, change)) in enumerate(zip(rows, tests)):
+        inconclusive = False
+        if row["gate"]:
+            p_worse, p_better, family_size = adjusted[i]
+            inconclusive = family_size * smallest_p_value(*row["trials"]) >= alpha
+        if inconclusive:
+            row["verdict"] = "inconclusive"
+        elif p_worse < alpha and change > 1 + threshold:
+            row["verdict"] = "slower"
+        elif p_better < alpha and change < 1 - threshold:
+            row["verdict"] = "faster"
+        else:
+            row["verdict"] = "same"
+        row["p"] = min(p_worse, p_better)
+    return rows
+
+
+def main() -> None:
+    """
+    Entry point of the script. Compares a run with a baseline and exits
+    with 1 if any metric regressed significantly, or with 3 if some gated
+    comparison has too few trials to tell.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark results in the common format.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compare = subparsers.add_parser("compare", help="Compare a run with a baseline.")
+    compare.add_argument("baseline", type=str, help="Baseline results JSON.")
+    compare.add_argument("current", type=str, help="New results JSON.")
+    compare.add_argument("--alpha", type=float, default=0.05, help="Significance level of the test.")
+    compare.add_argument("--threshold", type=float, default=0.05,
+                         help="Minimal relative change of the median treated as a regression.")
+    compare.add_argument("--metric", action="append", default=None, help="Metric to compare, may repeat.")
+
+    args = parser.parse_args()
+
+    baseline, current = load_run(args.baseline), load_run(args.current)
+    if baseline["harness"] != current["harness"]:
+        print(f"Warning: comparing {current['harness']} with a {baseline['harness']} baseline.")
+    if baseline["host"] != current["host"]:
+        print("Warning: the runs were made on different hosts.")
+
+    rows = compare_runs(baseline, current, args.alpha, args.threshold, args.metric)
+    if not rows:
+        print("No common configurations and metrics to compare.")
+        sys.exit(2)
+
+    regressions = inconclusive = 0
+    for row in rows:
+        config = ", ".join(f"{k}={v}" for k, v in row["config"].items())
+        if row["gate"]:
+            mark = {"slower": "REGRESSION", "faster": "improved", "same": "ok",
+                    "inconclusive": "inconclusive"}[row["verdict"]]
+        else:
+            mark = {"slower": "worse", "faster": "better", "same": "ok"}[row["verdict"]] + " (info)"
+        print(f"{mark:>13}  {row['metric']:<20} {config:<50} "
+              f"{row['baseline']:.4g} -> {row['current']:.4g} ({row['ratio']:.3f}x, p={row['p']:.3g}, "
+              f"n={row['trials'][0]}/{row['trials'][1]})")
+        regressions += row["gate"] and row["verdict"] == "slower"
+        inconclusive += row["verdict"] == "inconclusive"
+
+    print(f"\n{regressions} significant regressions in {sum(row['gate'] for row in rows)} gated comparisons "
+          f"(baseline {baseline['git']['revision']}, current {current['git']['revision']}).")
+    if inconclusive:
+        print(f"{inconclusive} gated comparisons are inconclusive: too few trials to reach significance "
+              f"at alpha={args.alpha}, rerun with more trials.")
+    sys.exit(1 if regressions else 3 if inconclusive else 0)
+
+
+if __name__ == "__main__":
+    main()
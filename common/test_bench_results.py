@@ -0,0 +1,146 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from common.bench_results import (BenchRun, compare_runs, holm_adjust, load_run, mann_whitney_greater,
+                                  smallest_p_value)
+
+
+def permutation_p(current, baseline):
+    """Exact one-sided p-value by enumerating all splits of the pooled values."""
+    pooled = current + baseline
+
+    def u(first, second):
+        return sum(1.0 if a > b else 0.5 if a == b else 0.0 for a, b in itertools.product(first, second))
+
+    observed = u(current, baseline)
+    splits = list(itertools.combinations(range(len(pooled)), len(current)))
+    extreme = 0
+    for chosen in splits:
+        first = [pooled[i] for i in chosen]
+        second = [pooled[i] for i in range(len(pooled)) if i not in chosen]
+        extreme += u(first, second) >= observed
+    return extreme / len(splits)
+
+
+def make_run(records, gate=True):
+    run = BenchRun("test")
+    run.describe("time_ms", "ms")
+    run.describe("nvcsw", "count", gate=gate)
+    for config, metrics in records.items():
+        for name, values in metrics.items():
+            run.add_trials({"config": config}, name, values)
+    return run.data
+
+
+def test_mann_whitney_matches_permutation_test():
+    rng = random.Random(1)
+    for _ in range(20):
+        current = [rng.uniform(0, 10) for _ in range(5)]
+        baseline = [rng.uniform(0, 10) for _ in range(4)]
+        assert mann_whitney_greater(current, baseline) == pytest.approx(permutation_p(current, baseline))
+
+
+def test_mann_whitney_separated_samples():
+    assert mann_whitney_greater([5, 6, 7], [1, 2, 3]) == pytest.approx(1 / 20)
+    assert mann_whitney_greater([1, 2, 3], [5, 6, 7]) == 1.0
+    assert math.isnan(mann_whitney_greater([], [1.0]))
+
+
+def test_mann_whitney_normal_approximation_with_ties():
+    baseline = [10.0] * 15 + [11.0] * 15
+    assert mann_whitney_greater([12.0] * 30, baseline) < 1e-6
+    assert mann_whitney_greater([10.0] * 15 + [11.0] * 15, baseline) > 0.4
+
+
+def test_holm_adjust():
+    adjusted = holm_adjust([0.01, 0.04, math.nan, 0.03])
+
+    assert adjusted[0] == pytest.approx(0.03)
+    assert adjusted[3] == pytest.approx(0.06)
+    assert adjusted[1] == pytest.approx(0.06)
+    assert math.isnan(adjusted[2])
+
+
+def test_compare_flags_slowdown():
+    rng = random.Random(2)
+    base = [100 + rng.gauss(0, 1) for _ in range(10)]
+    baseline = make_run({"a": {"time_ms": base}})
+    current = make_run({"a": {"time_ms": [1.2 * t for t in base]}})
+
+    (row,) = compare_runs(baseline, current)
+
+    assert row["verdict"] == "slower"
+    assert row["ratio"] == pytest.approx(1.2, rel=0.01)
+
+
+def test_compare_corrects_within_a_config():
+    # time_ms alone is significant (p = 7/252), but not among the four gated metrics of the config
+    base = {"time_ms": [1, 2, 3, 4, 5], **{name: [1, 2, 3, 4, 5] for name in ("user_ms", "sys_ms", "maxrss_kb")}}
+    baseline = make_run({"a": base})
+    current = make_run({"a": {**base, "time_ms": [3.5, 4.5, 5.5, 6, 7]}})
+
+    rows = {row["metric"]: row for row in compare_runs(baseline, current)}
+
+    assert mann_whitney_greater([3.5, 4.5, 5.5, 6, 7], [1, 2, 3, 4, 5]) < 0.05
+    assert rows["time_ms"]["verdict"] == "same"
+    assert rows["time_ms"]["p"] == pytest.approx(4 * 7 / 252)
+
+
+def test_compare_flags_slowdown_in_a_large_sweep():
+    # Five trials of four metrics per config are enough however many configs the sweep has
+    metrics = ("time_ms", "user_ms", "sys_ms", "maxrss_kb")
+    rng = random.Random(3)
+    base = {str(i): {name: [100 + rng.gauss(0, 1) for _ in range(5)] for name in metrics} for i in range(80)}
+    baseline = make_run(base)
+    current = make_run({config: {name: [3 * v for v in values] for name, values in record.items()}
+                        for config, record in base.items()})
+
+    rows = compare_runs(baseline, current)
+
+    assert len(rows) == 320
+    assert all(row["verdict"] == "slower" for row in rows)
+
+
+@pytest.mark.parametrize("trials", [1, 3])
+def test_too_few_trials_are_inconclusive(trials):
+    baseline = make_run({"a": {"time_ms": [1.0 + i for i in range(trials)]}})
+    current = make_run({"a": {"time_ms": [10.0 + i for i in range(trials)]}})
+
+    (row,) = compare_runs(baseline, current)
+
+    assert row["verdict"] == "inconclusive"
+
+
+def test_smallest_p_value():
+    assert smallest_p_value(5, 5) == pytest.approx(1 / 252)
+    assert smallest_p_value(1, 1) == 0.5
+    assert mann_whitney_greater([6, 7, 8, 9, 10], [1, 2, 3, 4, 5]) == pytest.approx(smallest_p_value(5, 5))
+
+
+def test_informational_metrics_never_regress():
+    baseline = make_run({"a": {"time_ms": [1.0, 1.1, 1.2, 1.3], "nvcsw": [10, 11, 12, 13]}}, gate=False)
+    current = make_run({"a": {"time_ms": [1.0, 1.1, 1.2, 1.3], "nvcsw": [50, 51, 52, 53]}}, gate=False)
+
+    rows = {row["metric"]: row for row in compare_runs(baseline, current)}
+
+    assert rows["time_ms"]["gate"] and rows["time_ms"]["verdict"] == "same"
+    assert not rows["nvcsw"]["gate"]
+    assert rows["nvcsw"]["verdict"] == "slower"
+
+
+def test_save_and_load(tmp_path):
+    run = BenchRun("test")
+    run.describe("rate", "1/s", better="higher")
+    run.add_trial({"n": 1}, rate=5.0, missing=None)
+    path = tmp_path / "run.json"
+    run.save(str(path))
+
+    data = load_run(str(path))
+
+    assert data["records"] == [{"config": {"n": 1}, "metrics": {"rate": [5.0]}}]
+    assert data["metrics"]["rate"] == {"unit": "1/s", "better": "higher", "gate": True}
+    with pytest.raises(ValueError):
+        run.describe("rate", "1/s", better="faster")
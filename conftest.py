@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# task4 and task5 open log/app.log on import; set before any test module is imported,
+# spawned worker processes inherit it through the environment
+os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="pytest-log-")
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+analyze.py
+
+This script reads the CSV produced by benchmark.py and reports, for each
+matrix size and thread container, speedup and parallel efficiency relative
+to NTHREADS=1, the Amdahl and Gustafson serial fractions and the thread
+count where scaling stops. Optionally renders the curves to an image.
+"""
+
+import argparse
+import csv
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+Curve = List[Tuple[int, float]]
+
+
+def load_results(csv_path: str, metric: str) -> Dict[Tuple[int, int], Curve]:
+    """
+    Read sweep results grouped by configuration.
+
+    Args:
+        csv_path: Path to the CSV written by benchmark.py.
+        metric: Timing column to analyze, e.g. AvgTime_ms.
+
+    Returns:
+        Mapping (matrix_size, container) -> [(threads, time_ms)] sorted by threads.
+    """
+    curves: Dict[Tuple[int, int], Curve] = defaultdict(list)
+    with open(csv_path, newline="") as file:
+        for row in csv.DictReader(file):
+            if row.get(metric):
+                curves[int(row["MatrixSize"]), int(row["Container"])].append(
+                    (int(row["Threads"]), float(row[metric])))
+    return {key: sorted(curve) for key, curve in sorted(curves.items())}
+
+
+def fit_amdahl(points: List[Tuple[int, float]]) -> Optional[float]:
+    """
+    Least-squares serial fraction of Amdahl's law 1/S = s + (1 - s)/p.
+
+    With x = 1 - 1/p and y = 1/S - 1/p the law is y = s * x, so s = sum(xy) / sum(x^2).
+
+    Args:
+        points: (threads, speedup) pairs.
+
+    Returns:
+        The serial fraction, or None without points above one thread.
+    """
+    xs = [1 - 1 / p for p, _ in points]
+    ys = [1 / speedup - 1 / p for p, speedup in points]
+    denominator = sum(x * x for x in xs)
+    if denominator == 0:
+        return None
+    return sum(x * y for x, y in zip(xs, ys)) / denominator
+
+
+def fit_gustafson(points: List[Tuple[int, float]]) -> Optional[float]:
+    """
+    Least-squares serial fraction of Gustafson's law S = p - s * (p - 1).
+
+    Args:
+        points: (threads, speedup) pairs.
+
+    Returns:
+        The serial fraction, or None without points above one thread.
+    """
+    xs = [p - 1 for p, _ in points]
+    ys = [p - speedup for p, speedup in points]
+    denominator = sum(x * x for x in xs)
+    if denominator == 0:
+        return None
+    return sum(x * y for x, y in zip(xs, ys)) / denominator
+
+
+def scaling_limit(points: List[Tuple[int, float]], min_gain: float) -> Optional[int]:
+    """
+    Last thread count after which adding threads stops paying off.
+
+    Args:
+        points: (threads, speedup) pairs sorted by threads.
+        min_gain: Minimal relative speedup gain expected from the next thread count.
+
+    Returns:
+        The thread count before the first step gaining less than min_gain,
+        or None if every step scales.
+    """
+    for (p_prev, s_prev), (_, s_next) in zip(points, points[1:]):
+        if s_next < s_prev * (1 + min_gain):
+            return p_prev
+    return None
+
+
+def analyze_curve(curve: Curve, min_gain: float) -> Optional[Dict[str, object]]:
+    """
+    Speedup, efficiency and fitted serial fractions of one configuration.
+
+    Args:
+        curve: [(threads, time_ms)] sorted by threads.
+        min_gain: See scaling_limit().
+
+    Returns:
+        Report of the curve, or None if it has no NTHREADS=1 baseline.
+    """
+    times = dict(curve)
+    if 1 not in times:
+        return None
+    points = [(p, times[1] / t) for p, t in curve]
+    fitted = [(p, s) for p, s in points if p > 1]
+    return {
+        "points": [(p, s, s / p) for p, s in points],
+        "amdahl": fit_amdahl(fitted),
+        "gustafson": fit_gustafson(fitted),
+        "limit": scaling_limit(points, min_gain),
+        "best": max(points, key=lambda point: point[1])[0],
+    }
+
+
+def plot_reports(reports: Dict[Tuple[int, int], Dict[str, object]], path: str) -> None:
+    """
+    Render speedup and efficiency curves with the Amdahl fit to an image.
+
+    Args:
+        reports: Reports from analyze_curve() keyed by (matrix_size, container).
+        path: Output image path.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, (ax_speedup, ax_efficiency) = plt.subplots(1, 2, figsize=(12, 5))
+    max_threads = max(p for report in reports.values() for p, _, _ in report["points"])
+    ax_speedup.plot([1, max_threads], [1, max_threads], "k:", label="ideal")
+    for (matrix_size, container), report in reports.items():
+        threads = [p for p, _, _ in report["points"]]
+        label = f"N={matrix_size}, container {container}"
+        line, = ax_speedup.plot(threads, [s for _, s, _ in report["points"]], "o-", label=label)
+        if report["amdahl"] is not None:
+            serial = report["amdahl"]
+            ax_speedup.plot(threads, [1 / (serial + (1 - serial) / p) for p in threads], "--",
+                            color=line.get_color(), alpha=0.5)
+        ax_efficiency.plot(threads, [e for _, _, e in report["points"]], "o-", label=label)
+
+    for ax, title in ((ax_speedup, "Speedup (dashed: Amdahl fit)"), (ax_efficiency, "Parallel efficiency")):
+        ax.set_xscale("log", base=2)
+        ax.set_xlabel("Threads")
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+    ax_efficiency.set_ylim(0, 1.1)
+    ax_speedup.legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def main() -> None:
+    """
+    Entry point of the script. Parses arguments, prints the scaling report
+    and optionally saves the plot.
+    """
+    parser = argparse.ArgumentParser(description="Scaling analysis of benchmark.py results.")
+    parser.add_argument("--csv", type=str, default="results.csv", help="Path to the benchmark CSV file.")
+    parser.add_argument("--metric", type=str, default="AvgTime_ms",
+                        help="Timing column to analyze, e.g. MedianTime_ms or MinTime_ms.")
+    parser.add_argument("--min_gain", type=float, default=0.05,
+                        help="Relative speedup gain below which scaling is considered stopped.")
+    parser.add_argument("--plot", type=str, default=None, help="Save speedup/efficiency curves to this image.")
+
+    args = parser.parse_args()
+
+    reports = {}
+    for (matrix_size, container), curve in load_results(args.csv, args.metric).items():
+        report = analyze_curve(curve, args.min_gain)
+        if report is None:
+            print(f"\nMATRIX_SIZE={matrix_size}, CONTAINER={container}: no NTHREADS=1 baseline, skipped.")
+            continue
+        reports[matrix_size, container] = report
+
+        print(f"\nMATRIX_SIZE={matrix_size}, CONTAINER={container}")
+        print(f"{'Threads':>8} {'Speedup':>9} {'Efficiency':>11}")
+        for p, speedup, efficiency in report["points"]:
+            print(f"{p:>8} {speedup:>9.2f} {efficiency:>11.2f}")
+        if report["amdahl"] is not None:
+            serial = report["amdahl"]
+            bound = f"{1 / serial:.1f}x" if serial > 0 else "unbounded"
+            print(f"Amdahl serial fraction {serial:.4f} (max speedup {bound}), "
+                  f"Gustafson serial fraction {report['gustafson']:.4f}")
+        if report["limit"] is not None:
+            print(f"Scaling stops after {report['limit']} threads (best: {report['best']} threads).")
+        else:
+            print(f"Scales up to {report['best']} threads.")
+
+    if args.plot and reports:
+        try:
+            plot_reports(reports, args.plot)
+            print(f"\nPlot saved to {args.plot}")
+        except ImportError:
+            print("\nmatplotlib is not installed, plot skipped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,84 @@ benchmark.py
 
 This script compiles and runs a C++ program with various compilation flags,
 collects execution time, and saves performance metrics to a CSV file.
+
+Run it with the repository root on PYTHONPATH for common.bench_results:
+
+    PYTHONPATH=../.. python benchmark.py
 """
 
 import argparse
 import csv
+import hashlib
+import glob
 import itertools
+import math
+import os
+import signal
+import statistics
 import subprocess
-from typing import List, Tuple
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from common.bench_results import BenchRun
+from results_store import RUSAGE_FIELDS, ResultsStore, compiler_version, source_hash
+from search import confidence_report, successive_halving
+
+Config = Tuple[int, int, int]
+
+# Two-sided 95% Student t critical values for 1..30 degrees of freedom
+T_CRITICAL_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+
+def compile_flags(matrix_size: int, threads: int, container: int) -> List[str]:
+    """
+    Compiler flags for one configuration.
+
+    Args:
+        matrix_size: Size of the matrix to define via macro.
+        threads: Number of threads to define via macro.
+        container: ID of the thread container type to define via macro.
+
+    Returns:
+        The g++ command without output and source arguments.
+    """
+    return [
+        "g++", "-std=c++20", f"-DMATRIX_SIZE={matrix_size}",
+        f"-DNTHREADS={threads}", f"-DTHREAD_CONTAINER={container}",
+        "-O2",  # Optimization flag
+    ]
+
+
+def binary_path(cache_dir: str, source: str, output: str,
+                matrix_size: int, threads: int, container: int) -> str:
+    """
+    Path of the cached executable for a configuration.
+
+    The name contains a hash of the source text and the compiler flags,
+    so any change to either produces a new binary.
+
+    Args:
+        cache_dir: Directory with cached executables.
+        source: Path to the C++ source file.
+        output: Base name of the output executable.
+        matrix_size: Size of the matrix to define via macro.
+        threads: Number of threads to define via macro.
+        container: ID of the thread container type to define via macro.
+
+    Returns:
+        Path to the executable inside cache_dir.
+    """
+    digest = hashlib.sha256()
+    with open(source, "rb") as file:
+        digest.update(file.read())
+    digest.update("\0".join(compile_flags(matrix_size, threads, container)).encode())
+    return os.path.join(cache_dir, f"{output}_{digest.hexdigest()[:16]}")
 
 
 def compile_program(source: str, output: str,
@@ -28,12 +99,9 @@ def compile_program(source: str, output: str,
     Returns:
         True if compilation was successful, False otherwise.
     """
-    compile_cmd = [
-        "g++", "-std=c++20", f"-DMATRIX_SIZE={matrix_size}",
-        f"-DNTHREADS={threads}", f"-DTHREAD_CONTAINER={container}",
-        "-O2",  # Optimization flag
-        "-o", output, source
-    ]
+    # Build under a temporary name so an interrupted build never looks cached
+    tmp_output = f"{output}.tmp{os.getpid()}"
+    compile_cmd = compile_flags(matrix_size, threads, container) + ["-o", tmp_output, source]
 
     print(f"Compiling: {' '.join(compile_cmd)}")
     result = subprocess.run(compile_cmd, capture_output=True, text=True)
@@ -42,82 +110,594 @@ def compile_program(source: str, output: str,
         print(result.stderr)
         return False
 
+    os.replace(tmp_output, output)
     return True
 
 
-def run_program(executable: str) -> Tuple[bool, float]:
+def compile_all(source: str, output: str, cache_dir: str,
+                configs: List[Config], jobs: Optional[int] = None) -> Dict[Config, str]:
+    """
+    Compile every configuration up front in a process pool.
+
+    Configurations whose binary is already in the cache are not rebuilt.
+
+    Args:
+        source: Path to the C++ source file.
+        output: Base name of the output executables.
+        cache_dir: Directory with cached executables.
+        configs: (matrix_size, threads, container) tuples.
+        jobs: Number of parallel compiler processes, os.cpu_count() by default.
+
+    Returns:
+        Mapping from configuration to executable path, only for successful builds.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    binaries = {config: binary_path(cache_dir, source, output, *config) for config in configs}
+    missing = [config for config, path in binaries.items() if not os.path.isfile(path)]
+    print(f"Binaries: {len(configs) - len(missing)} cached, {len(missing)} to compile.")
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {config: pool.submit(compile_program, source, binaries[config], *config)
+                   for config in missing}
+        failed = {config for config, future in futures.items() if not future.result()}
+
+    return {config: path for config, path in binaries.items() if config not in failed}
+
+
+class RunResult(NamedTuple):
+    """Outcome of one run: timing from the program output and rusage of the child."""
+    success: bool
+    time_ms: float
+    usage: Optional[Dict[str, float]] = None
+
+
+def _rusage_fields(usage) -> Dict[str, float]:
+    """
+    Convert a resource.struct_rusage to the fields stored with a trial.
+
+    Args:
+        usage: Resource usage returned by os.wait4.
+
+    Returns:
+        Values keyed by the names in results_store.RUSAGE_FIELDS.
+    """
+    return {
+        "user_ms": usage.ru_utime * 1000,
+        "sys_ms": usage.ru_stime * 1000,
+        "maxrss_kb": usage.ru_maxrss,  # kilobytes on Linux
+        "nvcsw": usage.ru_nvcsw,
+        "nivcsw": usage.ru_nivcsw,
+        "minflt": usage.ru_minflt,
+        "majflt": usage.ru_majflt,
+    }
+
+
+def run_program(executable: str, timeout: float = 600) -> RunResult:
     """
     Run the compiled program and extract execution time from its output.
 
+    The child is reaped with os.wait4, so its user and system time, maximal
+    resident set size, context switches and page faults are captured as well.
+
     Args:
         executable: Path to the compiled executable.
+        timeout: Seconds before the program is killed.
 
     Returns:
-        A tuple (success flag, execution time in milliseconds).
+        The run result; usage is None where os.wait4 is not available.
     """
-    try:
-        result = subprocess.run([f"./{executable}"], capture_output=True, text=True, timeout=600)
-        if result.returncode != 0:
-            print("Execution failed:")
-            print(result.stderr)
-            return False, 0.0
+    proc = subprocess.Popen([os.path.abspath(executable)], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, text=True)
+    output = {}
+
+    def read(name, stream):
+        output[name] = stream.read()
 
-        for line in result.stdout.splitlines():
-            if "Best calculations took" in line:
-                time_str = line.strip().split()[-2]
-                return True, float(time_str)
+    readers = [threading.Thread(target=read, args=(name, stream), daemon=True)
+               for name, stream in (("stdout", proc.stdout), ("stderr", proc.stderr))]
+    for reader in readers:
+        reader.start()
+
+    # The timer must not signal the pid once the child is reaped: it may belong to another process by then
+    lock = threading.Lock()
+    state = {"exited": False, "timed_out": False}
+
+    def kill():
+        with lock:
+            if state["exited"]:
+                return
+            state["timed_out"] = True
+            try:
+                if hasattr(os, "wait4"):
+                    # Not proc.kill(): its poll() would reap the child behind os.wait4
+                    os.kill(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+            except ProcessLookupError:
+                pass
 
-        return False, 0.0
+    def disarm():
+        with lock:
+            state["exited"] = True
+            killer.cancel()
 
-    except subprocess.TimeoutExpired:
+    killer = threading.Timer(timeout, kill)
+    killer.start()
+
+    usage = None
+    try:
+        if hasattr(os, "wait4"):
+            if hasattr(os, "waitid"):
+                # Wait for the exit without reaping, the pid stays reserved until the timer is disarmed
+                os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+                disarm()
+                _, status, rusage = os.wait4(proc.pid, 0)
+            else:
+                # No waitid (e.g. macOS): poll and reap under the lock, so the timer stays
+                # armed until the child is gone and never signals a reaped pid
+                delay = 0.001
+                while True:
+                    with lock:
+                        pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+                        if pid:
+                            state["exited"] = True
+                            break
+                    time.sleep(delay)
+                    delay = min(2 * delay, 0.05)
+                disarm()
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            usage = _rusage_fields(rusage)
+        else:
+            proc.wait()
+    finally:
+        disarm()
+        timed_out = state["timed_out"]
+        for reader in readers:
+            reader.join()
+        proc.stdout.close()
+        proc.stderr.close()
+
+    if timed_out:
         print("Timeout.")
-        return False, 0.0
+        return RunResult(False, 0.0, usage)
+    if proc.returncode != 0:
+        print("Execution failed:")
+        print(output.get("stderr", ""))
+        return RunResult(False, 0.0, usage)
 
+    for line in output.get("stdout", "").splitlines():
+        if "Best calculations took" in line:
+            time_str = line.strip().split()[-2]
+            return RunResult(True, float(time_str), usage)
 
-def main() -> None:
+    return RunResult(False, 0.0, usage)
+
+
+def t_critical(df: int) -> float:
     """
-    Entry point of the script. Parses arguments, runs benchmarks,
-    and writes results to a CSV file.
+    Two-sided 95% critical value of Student's t distribution.
+
+    Args:
+        df: Degrees of freedom.
+
+    Returns:
+        The critical value; the normal 1.96 beyond the table.
     """
-    parser = argparse.ArgumentParser(description="Benchmark a C++ program with various flags.")
-    parser.add_argument("--source", type=str, default="task1.cpp", help="Path to the C++ source file.")
-    parser.add_argument("--output", type=str, default="task1", help="Name of the output executable.")
-    parser.add_argument("--trials", type=int, default=5, help="Number of trials per configuration.")
-    parser.add_argument("--csv", type=str, default="results.csv", help="Path to the output CSV file.")
+    if df < 1:
+        return math.inf
+    return T_CRITICAL_95[df - 1] if df <= len(T_CRITICAL_95) else 1.96
 
-    args = parser.parse_args()
 
-    matrix_sizes = [20000, 40000]
-    threads_list = [1, 2, 4, 7, 8, 16, 20, 40]
-    containers = [1, 2, 3, 4, 5]
+def reject_outliers(times: List[float]) -> Tuple[List[float], List[float]]:
+    """
+    Split trial times into kept values and outliers using Tukey's fences.
+
+    Args:
+        times: Trial times in milliseconds.
+
+    Returns:
+        A tuple (kept times, rejected times). Fewer than four times are kept as is.
+    """
+    if len(times) < 4:
+        return list(times), []
+    q1, _, q3 = statistics.quantiles(times, n=4, method="inclusive")
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    kept = [t for t in times if low <= t <= high]
+    rejected = [t for t in times if not low <= t <= high]
+    return kept, rejected
+
+
+def summarize(times: List[float]) -> Dict[str, float]:
+    """
+    Descriptive statistics of trial times.
+
+    Args:
+        times: Trial times in milliseconds, at least one.
 
-    with open(args.csv, mode="w", newline="") as file:
+    Returns:
+        Mean, median, standard deviation, minimum and 95% confidence half-width.
+    """
+    n = len(times)
+    mean = statistics.fmean(times)
+    stdev = statistics.stdev(times) if n > 1 else 0.0
+    return {
+        "mean": mean,
+        "median": statistics.median(times),
+        "stdev": stdev,
+        "min": min(times),
+        "ci95": t_critical(n - 1) * stdev / math.sqrt(n) if n > 1 else math.inf,
+    }
+
+
+def host_state() -> Dict[str, object]:
+    """
+    Snapshot of CPU frequency scaling and load before a measurement.
+
+    Returns:
+        Governor of cpu0, mean current frequency in MHz and 1-minute load average.
+        Values that the platform does not expose are None.
+    """
+    governor = None
+    try:
+        with open("/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor") as file:
+            governor = file.read().strip()
+    except OSError:
+        pass
+
+    freqs = []
+    for path in glob.glob("/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq"):
+        try:
+            with open(path) as file:
+                freqs.append(int(file.read()) / 1000)
+        except (OSError, ValueError):
+            pass
+
+    try:
+        load = os.getloadavg()[0]
+    except OSError:
+        load = None
+
+    return {
+        "governor": governor,
+        "freq_mhz": round(statistics.fmean(freqs), 1) if freqs else None,
+        "load": load,
+    }
+
+
+def parse_cpus(spec: str) -> List[int]:
+    """
+    Parse a CPU list like "0-3,8,10-11".
+
+    Args:
+        spec: Comma-separated CPU numbers and ranges.
+
+    Returns:
+        Sorted CPU numbers.
+    """
+    cpus = set()
+    for part in spec.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.update(range(int(first), int(last) + 1))
+        elif part:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def default_threads(cpus: int) -> List[int]:
+    """
+    Thread counts to sweep on a machine with the given number of CPUs.
+
+    Args:
+        cpus: Number of CPUs available to the benchmark.
+
+    Returns:
+        Powers of two below cpus, cpus itself and 2 * cpus to show oversubscription.
+    """
+    threads = {1, cpus, 2 * cpus}
+    p = 2
+    while p < cpus:
+        threads.add(p)
+        p *= 2
+    return sorted(threads)
+
+
+def measure_config(executable: str, warmup: int, min_trials: int, max_trials: int,
+                   ci_target: float, max_failures: int, previous: Optional[List[float]] = None,
+                   on_trial: Optional[Callable[[RunResult, bool], None]] = None) -> Optional[Dict[str, float]]:
+    """
+    Run warm-up runs, then trials until the 95% confidence interval is tight enough.
+
+    Trials stop once at least min_trials succeeded and the confidence half-width
+    of the outlier-free times is within ci_target of their mean, or at max_trials.
+    Trials of an interrupted run passed in previous count towards both limits.
+
+    Args:
+        executable: Path to the compiled executable.
+        warmup: Number of discarded warm-up runs.
+        min_trials: Minimal number of successful trials.
+        max_trials: Maximal number of successful trials.
+        ci_target: Target confidence half-width relative to the mean.
+        max_failures: Number of failed runs tolerated before giving up.
+        previous: Times of trials already measured for this configuration.
+        on_trial: Called as on_trial(result, warmup) after every run.
+
+    Returns:
+        Statistics of the kept trials with trial, outlier and failure counts,
+        or None if no trial succeeded.
+    """
+    for i in range(warmup):
+        print(f"Warm-up {i + 1}...", end=' ')
+        result = run_program(executable)
+        print(f"{result.time_ms:.4f} ms" if result.success else "Failed.")
+        if on_trial is not None:
+            on_trial(result, True)
+
+    times: List[float] = list(previous or [])
+    failures = 0
+    while len(times) < max_trials and failures <= max_failures:
+        if len(times) >= min_trials:
+            stats = summarize(reject_outliers(times)[0])
+            if stats["ci95"] <= ci_target * stats["mean"]:
+                break
+
+        print(f"Trial {len(times) + 1}...", end=' ')
+        result = run_program(executable)
+        if on_trial is not None:
+            on_trial(result, False)
+        if not result.success:
+            print("Failed.")
+            failures += 1
+            continue
+
+        if result.usage is not None:
+            print(f"{result.time_ms:.4f} ms (user {result.usage['user_ms']:.1f} ms, "
+                  f"sys {result.usage['sys_ms']:.1f} ms, {result.usage['nivcsw']} involuntary switches)")
+        else:
+            print(f"{result.time_ms:.4f} ms")
+        times.append(result.time_ms)
+
+    if not times:
+        return None
+
+    kept, rejected = reject_outliers(times)
+    stats = summarize(kept)
+    stats.update(trials=len(times), outliers=len(rejected), failures=failures)
+    return stats
+
+
+def export_csv(store: ResultsStore, csv_path: str) -> int:
+    """
+    Write the measured configurations of the store in the sweep CSV format.
+
+    Args:
+        store: Results store of the current source, compiler and host.
+        csv_path: Path to the output CSV file.
+
+    Returns:
+        Number of exported configurations.
+    """
+    rows = store.done_configs()
+    with open(csv_path, mode="w", newline="") as file:
         writer = csv.writer(file)
-        writer.writerow(["MatrixSize", "Threads", "Container", "AvgTime_ms"])
+        writer.writerow(["MatrixSize", "Threads", "Container", "AvgTime_ms",
+                         "MedianTime_ms", "StdTime_ms", "MinTime_ms", "CI95_ms",
+                         "Trials", "Outliers", "Governor", "FreqMHz", "LoadAvg",
+                         "UserTime_ms", "SysTime_ms", "MaxRSS_KB", "VolCtxSwitches",
+                         "InvolCtxSwitches", "MinorFaults", "MajorFaults"])
+        for config, state in rows:
+            times = store.trial_times(config)
+            kept, rejected = reject_outliers(times)
+            stats = summarize(kept)
+            # Resource usage is averaged over all measured trials, outliers included
+            usage = store.trial_usage(config)
+            means = [round(statistics.fmean(values), 4) if values else None
+                     for values in ([u[field] for u in usage if u[field] is not None]
+                                    for field in RUSAGE_FIELDS)]
+            writer.writerow([*config, round(stats["mean"], 4),
+                             round(stats["median"], 4), round(stats["stdev"], 4),
+                             round(stats["min"], 4), round(stats["ci95"], 4),
+                             len(times), len(rejected),
+                             state["governor"], state["freq_mhz"], state["load"], *means])
+    return len(rows)
+
 
-        for matrix_size, threads, container in itertools.product(matrix_sizes, threads_list, containers):
-            print(f"\nTesting: MATRIX_SIZE={matrix_size}, NTHREADS={threads}, CONTAINER={container}")
+def export_json(store: ResultsStore, json_path: str, source: str) -> None:
+    """
+    Write every measured trial of the store in the common results format.
+
+    Args:
+        store: Results store of the current source, compiler and host.
+        json_path: Path to the output JSON file.
+        source: Path to the C++ source file, used to find the git revision.
+    """
+    run = BenchRun("task3/task1", source)
+    run.describe("time_ms", "ms")
+    for field in RUSAGE_FIELDS:
+        # Context switches and page faults follow the host load rather than the code
+        run.describe(field, {"user_ms": "ms", "sys_ms": "ms", "maxrss_kb": "KB"}.get(field, "count"),
+                     gate=field in ("user_ms", "sys_ms", "maxrss_kb"))
+    for config, _ in store.done_configs():
+        key = dict(zip(("matrix_size", "threads", "container"), config))
+        for time_ms, usage in zip(store.trial_times(config), store.trial_usage(config)):
+            run.add_trial(key, time_ms=time_ms, **usage)
+    run.save(json_path)
 
-            if not compile_program(args.source, args.output, matrix_size, threads, container):
-                continue
 
-            times: List[float] = []
+def run_sweep(args: argparse.Namespace, store: ResultsStore, configs: List[Config]) -> None:
+    """
+    Measure every configuration that is not in the store yet.
 
-            for trial in range(args.trials):
-                print(f"Trial {trial + 1}...", end=' ')
-                success, elapsed = run_program(args.output)
-                if success:
-                    print(f"{elapsed:.4f} ms")
-                    times.append(elapsed)
-                else:
-                    print("Failed.")
-                    break
+    Args:
+        args: Parsed command line arguments.
+        store: Results store of the current source, compiler and host.
+        configs: (matrix_size, threads, container) tuples.
+    """
+    pending = [config for config in configs if not store.is_done(config)]
+    print(f"Configurations: {len(configs) - len(pending)} already measured, {len(pending)} to run.")
+    binaries = compile_all(args.source, args.output, args.cache_dir, pending, args.jobs)
+
+    for config in pending:
+        matrix_size, threads, container = config
+        print(f"\nTesting: MATRIX_SIZE={matrix_size}, NTHREADS={threads}, CONTAINER={container}")
+
+        executable = binaries.get(config)
+        if executable is None:
+            continue
+
+        previous = store.trial_times(config)
+        if previous:
+            print(f"Resuming after {len(previous)} recorded trials.")
+        store.start(config, host_state())
+        stats = measure_config(executable, args.warmup, args.min_trials, args.trials,
+                               args.ci_target, args.max_failures, previous,
+                               lambda result, warmup: store.record_trial(config, result.success,
+                                                                         result.time_ms, warmup,
+                                                                         result.usage))
+
+        if stats is not None:
+            store.finish(config, "done")
+            print(f"Mean {stats['mean']:.4f} ms, median {stats['median']:.4f} ms, "
+                  f"CI95 ±{stats['ci95']:.4f} ms over {stats['trials']} trials "
+                  f"({stats['outliers']} outliers)")
+        else:
+            store.finish(config, "failed")
+            print("Не удалось получить результаты для этой конфигурации.")
+
+
+def run_search(args: argparse.Namespace, store: ResultsStore, configs: List[Config]) -> None:
+    """
+    Find the fastest thread count and container for each matrix size by successive halving.
+
+    Trials already in the store count towards the search, and every new run is
+    recorded there. A configuration that got the full --trials is stored as done;
+    one eliminated earlier is stored as pruned, so it is not exported and a later
+    full sweep continues it from its trials.
+
+    Args:
+        args: Parsed command line arguments.
+        store: Results store of the current source, compiler and host.
+        configs: (matrix_size, threads, container) tuples.
+    """
+    binaries = compile_all(args.source, args.output, args.cache_dir, configs, args.jobs)
+
+    for matrix_size in sorted({config[0] for config in configs}):
+        candidates = [config for config in configs if config[0] == matrix_size and config in binaries]
+        if not candidates:
+            continue
+        print(f"\nSearching MATRIX_SIZE={matrix_size} over {len(candidates)} configurations.")
+        warmed = set()
 
-            if times:
-                avg_time = sum(times) / len(times)
-                writer.writerow([matrix_size, threads, container, round(avg_time, 4)])
+        def run(config: Config) -> Optional[float]:
+            executable = binaries[config]
+            if config not in warmed:
+                warmed.add(config)
+                if not store.is_done(config):
+                    store.start(config, host_state())
+                for _ in range(args.warmup):
+                    result = run_program(executable)
+                    store.record_trial(config, result.success, result.time_ms, True, result.usage)
+
+            print(f"NTHREADS={config[1]}, CONTAINER={config[2]}...", end=' ')
+            result = run_program(executable)
+            store.record_trial(config, result.success, result.time_ms, False, result.usage)
+            print(f"{result.time_ms:.4f} ms" if result.success else "Failed.")
+            return result.time_ms if result.success else None
+
+        result = successive_halving(candidates, run, args.eta, args.min_trials, args.trials, args.budget,
+                                    {config: store.trial_times(config) for config in candidates})
+        # Only fully measured configurations are exported like swept ones
+        for config in warmed:
+            if store.is_done(config) or len(result.times[config]) >= args.trials:
+                store.finish(config, "done")
             else:
-                print("Не удалось получить результаты для этой конфигурации.")
+                store.finish(config, "pruned" if result.times[config] else "failed")
+        report = confidence_report(result)
+
+        print(f"\nRounds (configurations x trials): "
+              f"{', '.join(f'{n} x {trials}' for n, trials in result.rounds)}")
+        print(f"Runs: {result.runs} (a full sweep makes {len(candidates) * args.min_trials} "
+              f"to {len(candidates) * args.trials} runs).")
+        _, threads, container = result.best
+        low, high = report["ci95"]
+        print(f"Best: NTHREADS={threads}, CONTAINER={container}, median {report['median']:.4f} ms "
+              f"(95% bootstrap CI {low:.4f}..{high:.4f} ms)")
+        if report["runner_up"] is not None:
+            _, threads, container = report["runner_up"]
+            print(f"Faster than runner-up NTHREADS={threads}, CONTAINER={container} "
+                  f"in {100 * report['p_best']:.1f}% of bootstrap resamples.")
+
+
+def main() -> None:
+    """
+    Entry point of the script. Parses arguments, runs the sweep or the search,
+    records every trial in the results store and exports them to a CSV file.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark a C++ program with various flags.")
+    parser.add_argument("--source", type=str, default="task1.cpp", help="Path to the C++ source file.")
+    parser.add_argument("--output", type=str, default="task1", help="Base name of the output executables.")
+    parser.add_argument("--cache_dir", type=str, default=os.path.join("build", "cache"),
+                        help="Directory with cached executables.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of parallel compilations.")
+    parser.add_argument("--trials", type=int, default=20, help="Maximal number of trials per configuration.")
+    parser.add_argument("--min_trials", type=int, default=5, help="Minimal number of trials per configuration.")
+    parser.add_argument("--warmup", type=int, default=1, help="Number of discarded warm-up runs.")
+    parser.add_argument("--ci_target", type=float, default=0.02,
+                        help="Stop when the 95%% CI half-width is within this fraction of the mean.")
+    parser.add_argument("--max_failures", type=int, default=2, help="Failed runs tolerated per configuration.")
+    parser.add_argument("--cpus", type=str, default=None,
+                        help="CPUs to pin the benchmark and its children to, e.g. 0-19.")
+    parser.add_argument("--threads", type=str, default=None,
+                        help="Comma-separated thread counts; derived from the available CPUs by default.")
+    parser.add_argument("--mode", choices=["sweep", "search"], default="sweep",
+                        help="Measure every configuration or search for the fastest one by successive halving.")
+    parser.add_argument("--eta", type=int, default=3,
+                        help="Search: keep the best 1/eta configurations after every round.")
+    parser.add_argument("--budget", type=int, default=None,
+                        help="Search: maximal number of runs per matrix size.")
+    parser.add_argument("--db", type=str, default="results.sqlite",
+                        help="SQLite results store; an interrupted sweep resumes from it.")
+    parser.add_argument("--export_csv", action="store_true",
+                        help="Only export measured results from the store to the CSV file.")
+    parser.add_argument("--csv", type=str, default="results.csv", help="Path to the output CSV file.")
+    parser.add_argument("--json", type=str, default="results.json",
+                        help="Path to the output JSON file in the common format of common/bench_results.py.")
+
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db, source_hash(args.source), compiler_version())
+    if args.export_csv:
+        print(f"Exported {export_csv(store, args.csv)} configurations to {args.csv}")
+        export_json(store, args.json, args.source)
+        store.close()
+        return
+
+    if args.cpus:
+        # Children inherit the affinity of the harness
+        os.sched_setaffinity(0, parse_cpus(args.cpus))
+    if hasattr(os, "sched_getaffinity"):
+        print(f"Pinned to CPUs: {sorted(os.sched_getaffinity(0))}")
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    matrix_sizes = [20000, 40000]
+    if args.threads:
+        threads_list = [int(t) for t in args.threads.split(",")]
+    else:
+        threads_list = default_threads(cpus)
+    containers = [1, 2, 3, 4, 5]
+
+    configs = list(itertools.product(matrix_sizes, threads_list, containers))
+    try:
+        if args.mode == "search":
+            run_search(args, store, configs)
+        else:
+            run_sweep(args, store, configs)
+    finally:
+        print(f"Exported {export_csv(store, args.csv)} configurations to {args.csv}")
+        export_json(store, args.json, args.source)
+        store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,226 @@
+"""
+results_store.py
+
+Persistent SQLite store for sweep results. Every trial is committed as soon
+as it finishes, so an interrupted sweep can be resumed without repeating
+configurations that were already measured.
+"""
+
+import hashlib
+import platform
+import sqlite3
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+Config = Tuple[int, int, int]
+
+# Child resource usage stored with every trial, see benchmark.run_program()
+RUSAGE_FIELDS = ("user_ms", "sys_ms", "maxrss_kb", "nvcsw", "nivcsw", "minflt", "majflt")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    id INTEGER PRIMARY KEY,
+    matrix_size INTEGER NOT NULL,
+    threads INTEGER NOT NULL,
+    container INTEGER NOT NULL,
+    source_hash TEXT NOT NULL,
+    compiler TEXT NOT NULL,
+    host TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    governor TEXT,
+    freq_mhz REAL,
+    load REAL,
+    UNIQUE (matrix_size, threads, container, source_hash, compiler, host)
+);
+CREATE TABLE IF NOT EXISTS trials (
+    id INTEGER PRIMARY KEY,
+    config_id INTEGER NOT NULL REFERENCES configs (id),
+    success INTEGER NOT NULL,
+    warmup INTEGER NOT NULL,
+    time_ms REAL,
+    created REAL NOT NULL
+);
+"""
+
+# Columns added after the first schema; older stores are migrated on open
+MIGRATIONS = {
+    "trials": [("user_ms", "REAL"), ("sys_ms", "REAL"), ("maxrss_kb", "INTEGER"),
+               ("nvcsw", "INTEGER"), ("nivcsw", "INTEGER"), ("minflt", "INTEGER"),
+               ("majflt", "INTEGER")],
+}
+
+
+def source_hash(source: str) -> str:
+    """
+    Hash of the benchmarked source file.
+
+    Args:
+        source: Path to the C++ source file.
+
+    Returns:
+        First 16 hex digits of the SHA-256 of the file.
+    """
+    with open(source, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()[:16]
+
+
+def compiler_version(compiler: str = "g++") -> str:
+    """
+    First line of the compiler's --version output.
+
+    Args:
+        compiler: Compiler executable.
+
+    Returns:
+        The version line, or the compiler name if it cannot be queried.
+    """
+    try:
+        result = subprocess.run([compiler, "--version"], capture_output=True, text=True)
+        return result.stdout.splitlines()[0].strip()
+    except (OSError, IndexError):
+        return compiler
+
+
+class ResultsStore:
+    """
+    Sweep results keyed by configuration, source hash, compiler version and host.
+
+    Args:
+        path: Path to the SQLite database file.
+        source_digest: Hash of the benchmarked source, see source_hash().
+        compiler: Compiler version, see compiler_version().
+        host: Host name, platform.node() by default.
+    """
+
+    def __init__(self, path: str, source_digest: str, compiler: str, host: Optional[str] = None):
+        self.key = (source_digest, compiler, host or platform.node())
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        self._migrate()
+        self._ids: Dict[Config, int] = {}
+
+    def _migrate(self) -> None:
+        with self._db:
+            for table, columns in MIGRATIONS.items():
+                existing = {row[1] for row in self._db.execute(f"PRAGMA table_info({table})")}
+                for name, sql_type in columns:
+                    if name not in existing:
+                        self._db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _config_id(self, config: Config) -> Optional[int]:
+        if config not in self._ids:
+            row = self._db.execute(
+                "SELECT id FROM configs WHERE matrix_size = ? AND threads = ? AND container = ?"
+                " AND source_hash = ? AND compiler = ? AND host = ?",
+                (*config, *self.key)).fetchone()
+            if row is None:
+                return None
+            self._ids[config] = row[0]
+        return self._ids[config]
+
+    def status(self, config: Config) -> Optional[str]:
+        """
+        Args:
+            config: (matrix_size, threads, container).
+
+        Returns:
+            'running', 'done', 'pruned' (eliminated by the search before its full
+            trials), 'failed' or None if the config was never started.
+        """
+        config_id = self._config_id(config)
+        if config_id is None:
+            return None
+        return self._db.execute("SELECT status FROM configs WHERE id = ?", (config_id,)).fetchone()[0]
+
+    def is_done(self, config: Config) -> bool:
+        return self.status(config) == "done"
+
+    def start(self, config: Config, state: Dict[str, object]) -> None:
+        """
+        Register a configuration before its trials, with the host state at that moment.
+
+        Args:
+            config: (matrix_size, threads, container).
+            state: Host state from benchmark.host_state().
+        """
+        with self._db:
+            if self._config_id(config) is None:
+                self._db.execute(
+                    "INSERT INTO configs (matrix_size, threads, container, source_hash, compiler, host)"
+                    " VALUES (?, ?, ?, ?, ?, ?)", (*config, *self.key))
+            self._db.execute(
+                "UPDATE configs SET status = 'running', governor = ?, freq_mhz = ?, load = ? WHERE id = ?",
+                (state["governor"], state["freq_mhz"], state["load"], self._config_id(config)))
+
+    def record_trial(self, config: Config, success: bool, time_ms: float, warmup: bool = False,
+                     usage: Optional[Dict[str, float]] = None) -> None:
+        """
+        Commit one trial immediately.
+
+        Args:
+            config: (matrix_size, threads, container).
+            success: Whether the run produced a timing.
+            time_ms: Timing reported by the program.
+            warmup: Whether the run was a discarded warm-up run.
+            usage: Child resource usage keyed by RUSAGE_FIELDS, if available.
+        """
+        usage = usage or {}
+        with self._db:
+            self._db.execute(
+                f"INSERT INTO trials (config_id, success, warmup, time_ms, created, {', '.join(RUSAGE_FIELDS)})"
+                f" VALUES (?, ?, ?, ?, ?{', ?' * len(RUSAGE_FIELDS)})",
+                (self._config_id(config), int(success), int(warmup), time_ms if success else None, time.time(),
+                 *(usage.get(field) for field in RUSAGE_FIELDS)))
+
+    def finish(self, config: Config, status: str) -> None:
+        with self._db:
+            self._db.execute("UPDATE configs SET status = ? WHERE id = ?", (status, self._config_id(config)))
+
+    def trial_times(self, config: Config) -> List[float]:
+        """
+        Args:
+            config: (matrix_size, threads, container).
+
+        Returns:
+            Times of the successful measured (non warm-up) trials, in order.
+        """
+        config_id = self._config_id(config)
+        if config_id is None:
+            return []
+        rows = self._db.execute(
+            "SELECT time_ms FROM trials WHERE config_id = ? AND success = 1 AND warmup = 0 ORDER BY id",
+            (config_id,))
+        return [row[0] for row in rows]
+
+    def trial_usage(self, config: Config) -> List[Dict[str, Optional[float]]]:
+        """
+        Args:
+            config: (matrix_size, threads, container).
+
+        Returns:
+            Resource usage of the successful measured trials keyed by RUSAGE_FIELDS,
+            None where it was not captured.
+        """
+        config_id = self._config_id(config)
+        if config_id is None:
+            return []
+        rows = self._db.execute(
+            f"SELECT {', '.join(RUSAGE_FIELDS)} FROM trials"
+            " WHERE config_id = ? AND success = 1 AND warmup = 0 ORDER BY id", (config_id,))
+        return [dict(zip(RUSAGE_FIELDS, row)) for row in rows]
+
+    def done_configs(self) -> List[Tuple[Config, Dict[str, object]]]:
+        """
+        Returns:
+            Measured configurations for the current key with their host state,
+            ordered by matrix size, threads and container.
+        """
+        rows = self._db.execute(
+            "SELECT matrix_size, threads, container, governor, freq_mhz, load FROM configs"
+            " WHERE status = 'done' AND source_hash = ? AND compiler = ? AND host = ?"
+            " ORDER BY matrix_size, threads, container", self.key)
+        return [((m, t, c), {"governor": g, "freq_mhz": f, "load": l}) for m, t, c, g, f, l in rows]
@@ -0,0 +1,140 @@
+"""
+search.py
+
+Successive-halving search for the fastest configuration. Every round gives
+the surviving candidates more trials and keeps the best 1/eta of them, so
+clearly slow thread counts and containers are dropped after a few runs and
+the budget goes to the top candidates.
+"""
+
+import math
+import random
+import statistics
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+
+class SearchResult(NamedTuple):
+    """Outcome of successive_halving()."""
+    best: Hashable
+    ranking: List[Hashable]  # by last round reached, then by median
+    times: Dict[Hashable, List[float]]
+    rounds: List[Tuple[int, int]]
+    runs: int
+
+
+def _score(times: List[float]) -> float:
+    return statistics.median(times) if times else math.inf
+
+
+def successive_halving(candidates: List[Hashable], run: Callable[[Hashable], Optional[float]],
+                       eta: int = 3, min_trials: int = 1, max_trials: Optional[int] = None,
+                       budget: Optional[int] = None, previous: Optional[Dict[Hashable, List[float]]] = None) -> SearchResult:
+    """
+    Find the candidate with the lowest median time.
+
+    Round r brings every surviving candidate to min_trials * eta**r trials,
+    at most max_trials, then keeps the ceil(n / eta) candidates with the
+    lowest median, until one candidate is left or the budget is spent.
+    With max_trials set no candidate gets more trials than in a full sweep,
+    so the search never makes more than len(candidates) * max_trials runs.
+
+    Args:
+        candidates: Configurations to choose from.
+        run: Runs one trial of a candidate, returns its time or None on failure.
+        eta: Elimination factor, at least 2.
+        min_trials: Trials per candidate in the first round.
+        max_trials: Maximal trials per candidate, None for no limit.
+        budget: Maximal number of runs; the last round is shortened to fit, None for no limit.
+        previous: Times already measured per candidate, counted as done trials.
+
+    Returns:
+        The best candidate, the ranking of all candidates, all times,
+        (candidates, trials per candidate) of each round and the number of runs made.
+    """
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    times = {candidate: list((previous or {}).get(candidate, [])) for candidate in candidates}
+    attempts = {candidate: len(times[candidate]) for candidate in candidates}
+    alive = list(candidates)
+    reached = {candidate: 0 for candidate in candidates}
+    rounds = []
+    runs = 0
+    target = min_trials if max_trials is None else min(min_trials, max_trials)
+
+    while alive:
+        if budget is not None:
+            cost = sum(max(0, target - attempts[c]) for c in alive)
+            if cost > budget - runs:
+                # Spread what is left of the budget evenly over the survivors
+                target = min(attempts[c] for c in alive) + (budget - runs) // len(alive)
+        rounds.append((len(alive), target))
+        for candidate in alive:
+            reached[candidate] = len(rounds)
+
+        for candidate in alive:
+            while attempts[candidate] < target:
+                attempts[candidate] += 1
+                runs += 1
+                elapsed = run(candidate)
+                if elapsed is not None:
+                    times[candidate].append(elapsed)
+
+        alive.sort(key=lambda c: _score(times[c]))
+        alive = alive[:math.ceil(len(alive) / eta)]
+        if len(alive) == 1 or (budget is not None and runs >= budget):
+            break
+        target = target * eta if max_trials is None else min(target * eta, max_trials)
+
+    ranking = sorted(candidates, key=lambda c: (-reached[c], _score(times[c])))
+    return SearchResult(ranking[0], ranking, times, rounds, runs)
+
+
+def bootstrap_medians(times: List[float], resamples: int, rng: random.Random) -> List[float]:
+    """
+    Medians of bootstrap resamples of the times.
+
+    Args:
+        times: Trial times, at least one.
+        resamples: Number of resamples.
+        rng: Random number generator.
+
+    Returns:
+        One median per resample.
+    """
+    return [statistics.median(rng.choices(times, k=len(times))) for _ in range(resamples)]
+
+
+def confidence_report(result: SearchResult, resamples: int = 2000, seed: int = 0) -> Dict[str, object]:
+    """
+    Bootstrap confidence of the search result.
+
+    Args:
+        result: Result of successive_halving().
+        resamples: Number of bootstrap resamples.
+        seed: Seed of the resampling, for reproducible reports.
+
+    Returns:
+        Median of the best candidate with its 95% bootstrap interval, the
+        runner-up (the best of the candidates eliminated last) and the share
+        of resamples where the best is faster than it.
+    """
+    rng = random.Random(seed)
+    best_times = result.times[result.best]
+    if not best_times:
+        return {"median": math.nan, "ci95": (math.nan, math.nan), "runner_up": None, "p_best": math.nan}
+
+    best_medians = bootstrap_medians(best_times, resamples, rng)
+    ordered = sorted(best_medians)
+    report = {
+        "median": statistics.median(best_times),
+        "ci95": (ordered[int(0.025 * resamples)], ordered[int(0.975 * resamples) - 1]),
+        "runner_up": None,
+        "p_best": math.nan,
+    }
+    runners = [c for c in result.ranking[1:] if result.times[c]]
+    if runners:
+        runner_up = runners[0]
+        runner_medians = bootstrap_medians(result.times[runner_up], resamples, rng)
+        wins = sum(b < r for b, r in zip(best_medians, runner_medians))
+        report.update(runner_up=runner_up, p_best=wins / resamples)
+    return report
@@ -0,0 +1,124 @@
+import argparse
+import math
+import os
+import time
+
+import pytest
+
+import benchmark
+from benchmark import RunResult, default_threads, parse_cpus, reject_outliers, run_program, summarize
+from results_store import ResultsStore
+
+
+def test_reject_outliers_drops_values_beyond_tukey_fences():
+    kept, rejected = reject_outliers([10.0, 10.1, 10.2, 9.9, 10.0, 25.0])
+
+    assert rejected == [25.0]
+    assert kept == [10.0, 10.1, 10.2, 9.9, 10.0]
+
+
+def test_reject_outliers_keeps_short_series():
+    assert reject_outliers([1.0, 100.0, 1000.0]) == ([1.0, 100.0, 1000.0], [])
+
+
+def test_summarize():
+    stats = summarize([10.0, 12.0, 14.0])
+
+    assert stats["mean"] == 12.0
+    assert stats["median"] == 12.0
+    assert stats["stdev"] == 2.0
+    assert stats["min"] == 10.0
+    # t(0.975, 2) = 4.303
+    assert stats["ci95"] == pytest.approx(4.303 * 2.0 / math.sqrt(3))
+
+
+def test_summarize_single_trial_has_no_interval():
+    stats = summarize([5.0])
+
+    assert stats["stdev"] == 0.0
+    assert stats["ci95"] == math.inf
+
+
+def test_parse_cpus():
+    assert parse_cpus("0-3,8,10-11") == [0, 1, 2, 3, 8, 10, 11]
+
+
+def test_default_threads():
+    assert default_threads(6) == [1, 2, 4, 6, 12]
+    assert default_threads(1) == [1, 2]
+
+
+def script(tmp_path, body):
+    path = tmp_path / "program.sh"
+    path.write_text("#!/bin/sh\n" + body + "\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture(params=["waitid", "wait4 only"])
+def wait_api(request, monkeypatch):
+    if request.param == "wait4 only":
+        monkeypatch.delattr(os, "waitid", raising=False)
+    return request.param
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="rusage needs os.wait4")
+def test_run_program_parses_time_and_usage(tmp_path, wait_api):
+    result = run_program(script(tmp_path, 'echo "Best calculations took 12.5 ms"'), timeout=30)
+
+    assert result.success and result.time_ms == 12.5
+    assert set(result.usage) >= {"user_ms", "sys_ms", "maxrss_kb"}
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="rusage needs os.wait4")
+def test_run_program_kills_a_hung_program(tmp_path, wait_api):
+    start = time.monotonic()
+    result = run_program(script(tmp_path, "exec sleep 30"), timeout=0.3)
+
+    assert not result.success
+    assert time.monotonic() - start < 10
+
+
+def test_run_program_reports_a_failure(tmp_path):
+    result = run_program(script(tmp_path, "echo broken >&2; exit 3"), timeout=30)
+
+    assert not result.success
+
+
+def fake_runs(monkeypatch, medians):
+    """Replace compilation and runs with fixed times per executable."""
+    runs = []
+
+    def run(executable, timeout=600):
+        runs.append(executable)
+        return RunResult(True, medians[executable], {})
+
+    monkeypatch.setattr(benchmark, "compile_all", lambda source, output, cache_dir, configs, jobs:
+                        {config: config for config in configs})
+    monkeypatch.setattr(benchmark, "run_program", run)
+    monkeypatch.setattr(benchmark, "host_state", lambda: {"governor": None, "freq_mhz": None, "load": None})
+    return runs
+
+
+def test_search_leaves_eliminated_configs_to_the_sweep(tmp_path, monkeypatch, capsys):
+    configs = [(100, threads, 0) for threads in (1, 2, 4, 8)]
+    runs = fake_runs(monkeypatch, {config: 10.0 * config[1] for config in configs})
+    args = argparse.Namespace(source="task1.cpp", output="task1", cache_dir="cache", jobs=1, warmup=0,
+                              eta=2, min_trials=2, trials=4, budget=None, ci_target=0.02, max_failures=2)
+    store = ResultsStore(str(tmp_path / "results.db"), "source", "g++", "host")
+
+    benchmark.run_search(args, store, configs)
+
+    # The last round gives the two fastest the full trials
+    assert [store.status(config) for config in configs] == ["done", "done", "pruned", "pruned"]
+    assert [config for config, _ in store.done_configs()] == configs[:2]
+
+    runs.clear()
+    benchmark.run_sweep(args, store, configs)
+
+    # The sweep resumes the pruned configurations from their trials and skips the done ones
+    assert set(runs) <= set(configs[2:])
+    assert "2 already measured, 2 to run" in capsys.readouterr().out
+    assert all(store.is_done(config) for config in configs)
+    assert all(len(store.trial_times(config)) >= args.min_trials for config in configs)
+    store.close()
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from search import confidence_report, successive_halving
+
+
+def noisy_runner(medians, seed=0):
+    rng = random.Random(seed)
+    calls = []
+
+    def run(candidate):
+        calls.append(candidate)
+        return medians[candidate] * rng.uniform(0.95, 1.05)
+
+    return run, calls
+
+
+def test_runs_stay_within_full_sweep():
+    # The sweep defaults: 40 configurations, 5 to 20 trials each
+    medians = {i: 100 + i for i in range(40)}
+    run, calls = noisy_runner(medians)
+
+    result = successive_halving(list(medians), run, eta=3, min_trials=5, max_trials=20)
+
+    assert result.runs == len(calls)
+    assert result.runs <= len(medians) * 20
+    assert all(len(times) <= 20 for times in result.times.values())
+    assert max(trials for _, trials in result.rounds) == 20
+    assert result.best in (0, 1)
+
+
+def test_without_cap_trials_grow_by_eta():
+    medians = {i: 100 + i for i in range(40)}
+    run, _ = noisy_runner(medians)
+
+    result = successive_halving(list(medians), run, eta=3, min_trials=5)
+
+    assert [trials for _, trials in result.rounds] == [5, 15, 45, 135]
+
+
+def test_budget_is_respected():
+    medians = {i: 100 + i for i in range(12)}
+    run, calls = noisy_runner(medians)
+
+    result = successive_halving(list(medians), run, eta=2, min_trials=2, max_trials=10, budget=40)
+
+    assert result.runs == len(calls) <= 40
+
+
+def test_previous_trials_count_as_done():
+    medians = {"a": 10, "b": 20}
+    run, calls = noisy_runner(medians)
+
+    result = successive_halving(["a", "b"], run, eta=2, min_trials=3, max_trials=3,
+                                previous={"a": [10.0, 10.0, 10.0]})
+
+    assert calls == ["b"] * 3
+    assert result.best == "a"
+    assert result.ranking == ["a", "b"]
+
+
+def test_failed_runs_rank_last():
+    result = successive_halving(["ok", "broken"], lambda c: 5.0 if c == "ok" else None,
+                                eta=2, min_trials=2, max_trials=4)
+
+    assert result.best == "ok"
+    assert result.times["broken"] == []
+
+
+def test_eta_must_eliminate():
+    with pytest.raises(ValueError):
+        successive_halving([1, 2], lambda c: 1.0, eta=1)
+
+
+def test_confidence_report_prefers_clear_winner():
+    result = successive_halving(["fast", "slow"], noisy_runner({"fast": 10, "slow": 20})[0],
+                                eta=2, min_trials=8, max_trials=8)
+
+    report = confidence_report(result, resamples=500)
+
+    low, high = report["ci95"]
+    assert low <= report["median"] <= high
+    assert report["runner_up"] == "slow"
+    assert report["p_best"] == 1.0
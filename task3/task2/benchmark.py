@@ -1,12 +1,19 @@
-import math
+import hashlib
+import io
 import os
+import shutil
 import subprocess
 import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
 
 import click
 import numpy as np
 import pandas as pd
 
+# Run with the repository root on PYTHONPATH, e.g. PYTHONPATH=../.. python benchmark.py
+from common.bench_results import BenchRun
+
 type_map = {
     'double': float,
     'int': int,
@@ -22,53 +29,445 @@ type_map = {
     'bool': bool
 }
 
+# Element-wise over arrays of arguments; the second argument is ignored by unary operations
 operation_map = {
-    'sqrt': lambda x: math.sqrt(x) if x >= 0 else np.nan,
-    'pow': lambda x, y: math.pow(x, y),
-    'sin': lambda x: math.sin(x)
+    'sqrt': lambda x, y: np.sqrt(np.where(x >= 0, x, np.nan)),
+    'pow': lambda x, y: np.power(x, y),
+    'sin': lambda x, y: np.sin(x)
 }
 
 
-def execute_and_compare(df):
+def cast_values(values: np.ndarray, value_type: type) -> np.ndarray:
+    """
+    Apply the C++ conversion to a numeric type element-wise.
+
+    :param values: Values as floats.
+    :param value_type: Python type of the C++ type from type_map.
+    :return: Truncated values for int, 0 or 1 for bool, the values themselves otherwise; NaN stays NaN.
+    """
+    if value_type is bool:
+        return np.where(np.isnan(values), np.nan, values != 0)
+    if value_type is int:
+        return np.trunc(values)
+    return values
+
+
+def expected_results(df: pd.DataFrame) -> np.ndarray:
+    """
+    Compute expected values for all tasks at once.
+
+    Rows are grouped by server type, client type and operation; each group is
+    computed with a single NumPy call. Arguments are cast to the client type and
+    results to the server type, as the C++ casts do.
+
+    :param df: DataFrame with task information.
+    :return: Array of expected values, NaN where the operation is undefined.
+    """
+    expected = np.full(len(df), np.nan)
+    arg1_all = df['arg1'].to_numpy(dtype=float)
+    arg2_all = df['arg2'].to_numpy(dtype=float)
+
+    for (t_server, t_client, operation), index in df.groupby(
+            ['TServer', 'TClient', 'Operation'], sort=False, observed=True).indices.items():
+        if operation not in operation_map or type_map.get(t_client) not in (int, float, bool):
+            continue
+        arg1 = cast_values(arg1_all[index], type_map[t_client])
+        arg2 = cast_values(arg2_all[index], type_map[t_client])
+
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            values = operation_map[operation](arg1, arg2)
+
+        expected[index] = cast_values(values, type_map.get(t_server))
+
+    return expected
+
+
+def print_report(summary: pd.DataFrame, mismatches: pd.DataFrame, total: int, mismatched: int,
+                 max_mismatches: int = 20) -> None:
     """
-    Compare the results of calculations with expected values.
+    Print the verification summary and the mismatching rows.
 
-    :param df: DataFrame with task information and results.
+    :param summary: Tasks, matched and mismatched counts per operation and server type.
+    :param mismatches: Mismatching rows with their expected values.
+    :param total: Number of verified results.
+    :param mismatched: Number of mismatching results, may exceed len(mismatches).
+    :param max_mismatches: Maximal number of mismatching rows to print.
     """
-    for index, row in df.iterrows():
-        t_server = row['TServer']
-        t_client = row['TClient']
-        operation = row['Operation']
-        arg1 = row['arg1']
-        arg2 = row['arg2']
-        expected_result = row['result']
+    print(summary.to_string())
+    if not mismatched:
+        print(f"\033[92mAll {total} results match ✅\033[0m")
+        return
+
+    print(f"\033[91m{mismatched} of {total} results mismatch 💩\033[0m")
+    for index, row in mismatches.head(max_mismatches).iterrows():
+        print(f"\033[91mRow {index}: Result mismatch 💩. Expected: {row['expected']:.4f}, "
+              f"Actual: {row['result']:.4f}\033[0m")
+    if mismatched > max_mismatches:
+        print(f"\033[91m... and {mismatched - max_mismatches} more\033[0m")
+
+
+TYPE_DTYPE = pd.CategoricalDtype(list(type_map))
+OPERATION_DTYPE = pd.CategoricalDtype(list(operation_map))
+TASK_DTYPES = {'task ID': 'int64', 'TServer': TYPE_DTYPE, 'TClient': TYPE_DTYPE,
+               'Operation': OPERATION_DTYPE, 'arg1': 'float64', 'arg2': 'float64'}
+RESULT_DTYPES = {'task ID': 'int64', 'result': 'float64'}
 
-        arg1 = type_map[t_client](arg1)
-        if not np.isnan(arg2):
-            arg2 = type_map[t_client](arg2)
+# Record of the on-disk task index, addressed by task ID; unknown names have code -1
+INDEX_DTYPE = np.dtype([
+    ('present', 'u1'),
+    ('TServer', 'i1'),
+    ('TClient', 'i1'),
+    ('Operation', 'i1'),
+    ('arg1', '<f8'),
+    ('arg2', '<f8'),
+])
 
-        if t_server == 'double':
-            if operation == 'pow':
-                result = operation_map[operation](arg1, arg2)
-            else:
-                result = operation_map[operation](arg1)
-        elif t_server == 'int':
-            if operation == 'pow':
-                result = int(operation_map[operation](arg1, arg2))
-            else:
-                result = int(operation_map[operation](arg1))
 
-        if abs(result - expected_result) <= 1e-4:
-            print(f"Row {index}: Result matches ✅. Expected: {expected_result:.4f}, Actual: {result:.4f}")
-        else:
-            print(
-                f"\033[91mRow {index}: Result mismatch 💩. Expected: {expected_result:.4f}, Actual: {result:.4f}\033[0m")
+class CsvFollower:
+    """
+    Reads rows appended to a CSV file since the previous call.
+
+    Only complete lines are parsed, so the file may still be written by another
+    process. At most chunk_bytes are read per call, which bounds memory use.
+    """
+
+    def __init__(self, path: str, dtype: dict, chunk_bytes: int = 16 << 20):
+        self.path = path
+        self.dtype = dtype
+        self.chunk_bytes = chunk_bytes
+        self._file = None
+        self._names = None
+        self._tail = b''
 
+    def read(self, final: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Parse the next chunk of complete rows.
 
-def build_with_cmake(cmakelists_dir: str, project_name: str) -> str:
+        :param final: The writer has finished, so a last line without newline is complete.
+        :return: DataFrame with the new rows, or None if there are none yet.
+        """
+        if self._file is None:
+            if not os.path.exists(self.path):
+                return None
+            self._file = open(self.path, 'rb')
+
+        new_data = self._file.read(self.chunk_bytes)
+        data = self._tail + new_data
+        at_end = final and len(new_data) < self.chunk_bytes
+        end = len(data) if at_end else data.rfind(b'\n') + 1
+        self._tail, data = data[end:], data[:end]
+
+        if self._names is None:
+            header_end = data.find(b'\n')
+            if header_end < 0:
+                self._tail = data + self._tail
+                return None
+            self._names = data[:header_end].decode().strip().split(',')
+            data = data[header_end + 1:]
+
+        if not data.strip():
+            return None
+        return pd.read_csv(io.BytesIO(data), names=self._names, header=None, dtype=self.dtype)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class StreamingVerifier:
+    """
+    Verifies results chunk by chunk against a task index kept in a memory-mapped file.
+
+    Tasks are stored at the position of their ID, so a result is joined with its
+    task by a direct lookup and neither file has to be sorted or held in memory.
+    Results whose task has not been read yet wait until it arrives, in either
+    order of the files.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, tolerance: float = 1e-4, max_mismatches: int = 20,
+                 capacity: int = 1 << 16):
+        self.index_path = index_path
+        self.tolerance = tolerance
+        self.max_mismatches = max_mismatches
+        self._capacity = capacity
+        self._index = None
+        self._pending = pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in RESULT_DTYPES.items()})
+        # The last row and column collect unknown operation and type names (code -1)
+        shape = (len(OPERATION_DTYPE.categories) + 1, len(TYPE_DTYPE.categories) + 1)
+        self._tasks = np.zeros(shape, dtype=np.int64)
+        self._matched = np.zeros(shape, dtype=np.int64)
+        self._mismatches = []
+        self.tasks = 0
+        self.verified = 0
+        self.mismatched = 0
+        self.orphaned = 0
+
+    def _grow(self, capacity: int) -> None:
+        if self._index is None:
+            self._index = np.memmap(self.index_path, dtype=INDEX_DTYPE, mode='w+', shape=(capacity,))
+            return
+        self._index.flush()
+        del self._index
+        with open(self.index_path, 'r+b') as file:
+            file.truncate(capacity * INDEX_DTYPE.itemsize)
+        self._index = np.memmap(self.index_path, dtype=INDEX_DTYPE, mode='r+', shape=(capacity,))
+
+    def add_tasks(self, chunk: pd.DataFrame) -> None:
+        ids = chunk['task ID'].to_numpy()
+        if self._index is None:
+            self._grow(max(self._capacity, int(ids.max()) + 1 if len(ids) else 0))
+        elif len(ids) and ids.max() >= len(self._index):
+            self._grow(max(2 * len(self._index), int(ids.max()) + 1))
+        records = np.zeros(len(ids), dtype=INDEX_DTYPE)
+        records['present'] = 1
+        for name in ('TServer', 'TClient', 'Operation'):
+            records[name] = chunk[name].cat.codes.to_numpy()
+        records['arg1'] = chunk['arg1'].to_numpy()
+        records['arg2'] = chunk['arg2'].to_numpy()
+        self._index[ids] = records
+        self.tasks += len(ids)
+        if len(self._pending):
+            self._verify_pending()
+
+    def add_results(self, chunk: pd.DataFrame) -> None:
+        self._pending = pd.concat([self._pending, chunk], ignore_index=True) if len(self._pending) else chunk
+        self._verify_pending()
+
+    def _verify_pending(self) -> None:
+        chunk = self._pending
+        ids = chunk['task ID'].to_numpy()
+        # Results may come before any task, e.g. when --stream reads the results file first
+        known = np.zeros(len(ids), dtype=bool)
+        if self._index is not None:
+            known = ids < len(self._index)
+            known[known] = self._index['present'][ids[known]] == 1
+        self._pending = chunk.loc[~known]
+        if known.any():
+            self.verify(ids[known], self._index[ids[known]], chunk['result'].to_numpy()[known])
+
+    def verify(self, ids: np.ndarray, tasks: np.ndarray, results: np.ndarray) -> None:
+        """
+        Verify results against their tasks and add them to the counts.
+
+        :param ids: Task IDs.
+        :param tasks: Structured array with TServer, TClient and Operation codes and arg1, arg2.
+        :param results: Results computed by the server.
+        """
+        df = pd.DataFrame({
+            'TServer': pd.Categorical.from_codes(tasks['TServer'], dtype=TYPE_DTYPE),
+            'TClient': pd.Categorical.from_codes(tasks['TClient'], dtype=TYPE_DTYPE),
+            'Operation': pd.Categorical.from_codes(tasks['Operation'], dtype=OPERATION_DTYPE),
+            'arg1': tasks['arg1'],
+            'arg2': tasks['arg2'],
+            'result': results,
+        }, index=pd.Index(ids, name='task ID'))
+
+        expected = expected_results(df)
+        matched = np.abs(expected - df['result'].to_numpy()) <= self.tolerance
+        cell = (tasks['Operation'], tasks['TServer'])
+        np.add.at(self._tasks, cell, 1)
+        np.add.at(self._matched, (cell[0][matched], cell[1][matched]), 1)
+        self.verified += len(df)
+        self.mismatched += int((~matched).sum())
+
+        kept = sum(len(m) for m in self._mismatches)
+        if kept < self.max_mismatches:
+            self._mismatches.append(df.loc[~matched].assign(expected=expected[~matched])
+                                    .head(self.max_mismatches - kept))
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending) + self.orphaned
+
+    def summary(self) -> pd.DataFrame:
+        operations = [*OPERATION_DTYPE.categories, '?']
+        types = [*TYPE_DTYPE.categories, '?']
+        rows = [(operations[o], types[t], self._tasks[o, t], self._matched[o, t])
+                for o, t in zip(*np.nonzero(self._tasks))]
+        summary = pd.DataFrame(rows, columns=['Operation', 'TServer', 'tasks', 'matched'])
+        summary = summary.set_index(['Operation', 'TServer']).sort_index()
+        summary['mismatched'] = summary['tasks'] - summary['matched']
+        return summary
+
+    def report(self) -> pd.DataFrame:
+        """
+        Print the summary and the first mismatching rows.
+
+        :return: DataFrame with the kept mismatching rows and their expected values.
+        :raises ValueError: If no result was verified.
+        """
+        if not self.verified:
+            raise ValueError(f"No results verified out of {self.tasks} tasks")
+        mismatches = pd.concat(self._mismatches) if self._mismatches else pd.DataFrame()
+        print_report(self.summary(), mismatches, self.verified, self.mismatched, self.max_mismatches)
+        if self.pending:
+            print(f"\033[91m{self.pending} results have no task information 💩\033[0m")
+        if self.tasks > self.verified:
+            print(f"\033[91m{self.tasks - self.verified} tasks have no result 💩\033[0m")
+        return mismatches
+
+    def close(self) -> None:
+        if self._index is not None:
+            self._index = None
+            os.remove(self.index_path)
+
+
+# Binary files written by task2 --binary: a header, then fixed-width little-endian records
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4')])
+BINARY_VERSION = 1
+TASK_RECORD_DTYPE = np.dtype([
+    ('task ID', '<u8'),
+    ('TServer', 'i1'),
+    ('TClient', 'i1'),
+    ('Operation', 'i1'),
+    ('pad', 'V5'),
+    ('arg1', '<f8'),
+    ('arg2', '<f8'),
+])
+RESULT_RECORD_DTYPE = np.dtype([('task ID', '<u8'), ('result', '<f8')])
+
+
+def open_records(path: str, magic: bytes, dtype: np.dtype) -> np.ndarray:
+    """
+    Open a binary task or result file without copying it.
+
+    :param path: Path to the file.
+    :param magic: Expected magic of the header.
+    :param dtype: Record dtype.
+    :return: Read-only memory-mapped array of the complete records.
+    :raises ValueError: If the header does not match the expected format.
+    """
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) != 1 or header['magic'][0] != magic or header['version'][0] != BINARY_VERSION \
+            or header['record_size'][0] != dtype.itemsize:
+        raise ValueError(f"{path} is not a version {BINARY_VERSION} {magic.decode()} file")
+
+    # A record being written at the moment is ignored
+    count = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // dtype.itemsize
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=HEADER_DTYPE.itemsize, shape=(count,))
+
+
+def verify_binary(tasks_path: str, results_path: str, tolerance: float = 1e-4, max_mismatches: int = 20,
+                  chunk_records: int = 1 << 20) -> pd.DataFrame:
+    """
+    Verify results of a binary run, reading both files through np.memmap.
+
+    :param tasks_path: Path to information_tasks.bin.
+    :param results_path: Path to tasks_results.bin.
+    :param tolerance: Maximal absolute difference treated as a match.
+    :param max_mismatches: Maximal number of mismatching rows to print.
+    :param chunk_records: Number of results verified at once.
+    :return: DataFrame with the first mismatching rows and their expected values.
+    :raises ValueError: If a header does not match the expected format or no result was verified.
+    """
+    tasks = open_records(tasks_path, b'TASKS', TASK_RECORD_DTYPE)
+    results = open_records(results_path, b'RESULTS', RESULT_RECORD_DTYPE)
+
+    # Results find their task by binary search over the task IDs, so memory grows with
+    # the number of tasks, not with the largest ID. The file is usually in ID order
+    # already; otherwise the sorted IDs and their positions are kept in memory.
+    task_ids = np.asarray(tasks['task ID'])
+    order = None
+    if np.any(task_ids[1:] < task_ids[:-1]):
+        order = np.argsort(task_ids, kind='stable')
+        task_ids = task_ids[order]
+
+    verifier = StreamingVerifier(tolerance=tolerance, max_mismatches=max_mismatches)
+    verifier.tasks = len(tasks)
+    for start in range(0, len(results), chunk_records):
+        chunk = results[start:start + chunk_records]
+        ids = chunk['task ID']
+        found = np.searchsorted(task_ids, ids)
+        known = found < len(task_ids)
+        known[known] = task_ids[found[known]] == ids[known]
+        verifier.orphaned += int((~known).sum())
+        if known.any():
+            found = found[known] if order is None else order[found[known]]
+            verifier.verify(ids[known].astype(np.int64), tasks[found], chunk['result'][known])
+    return verifier.report()
+
+
+def verify_streaming(tasks_csv: str, results_csv: str, index_path: str,
+                     running: Optional[Callable[[], bool]] = None, tolerance: float = 1e-4,
+                     max_mismatches: int = 20, chunk_bytes: int = 16 << 20,
+                     poll_interval: float = 0.2) -> pd.DataFrame:
+    """
+    Verify task results in chunks, optionally while they are still being written.
+
+    :param tasks_csv: Path to information_tasks.csv.
+    :param results_csv: Path to tasks_results.csv.
+    :param index_path: Path of the temporary on-disk task index.
+    :param running: Returns True while the writer is still running; None if the files are complete.
+    :param tolerance: Maximal absolute difference treated as a match.
+    :param max_mismatches: Maximal number of mismatching rows to print.
+    :param chunk_bytes: Maximal number of bytes read from a file at once.
+    :param poll_interval: Seconds to wait for new rows while the writer is running.
+    :return: DataFrame with the first mismatching rows and their expected values.
+    :raises FileNotFoundError: If a file does not exist once the writer has finished.
+    :raises ValueError: If no result was verified.
+    """
+    verifier = StreamingVerifier(index_path, tolerance, max_mismatches)
+    tasks = CsvFollower(tasks_csv, TASK_DTYPES, chunk_bytes)
+    results = CsvFollower(results_csv, RESULT_DTYPES, chunk_bytes)
+    try:
+        while True:
+            finished = running is None or not running()
+            progressed = False
+            # Tasks are read up to date first, so that new results find their task
+            chunk = tasks.read(finished)
+            while chunk is not None:
+                verifier.add_tasks(chunk)
+                progressed = True
+                chunk = tasks.read(finished)
+            chunk = results.read(finished)
+            if chunk is not None:
+                verifier.add_results(chunk)
+                progressed = True
+
+            if not progressed:
+                if finished:
+                    break
+                time.sleep(poll_interval)
+
+        for path in (tasks_csv, results_csv):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} not found")
+        return verifier.report()
+    finally:
+        tasks.close()
+        results.close()
+        verifier.close()
+
+
+def _run_build_step(command: List[str], cwd: str) -> None:
+    """Run a build command, showing its output only if it fails.
+    :param command: The command to run.
+    :param cwd: Working directory.
+    :raises subprocess.CalledProcessError: If the command fails.
+    """
+    result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(result.stderr)
+        raise subprocess.CalledProcessError(result.returncode, command)
+
+
+def build_with_cmake(cmakelists_dir: str, project_name: str, variant: str = "Release",
+                     options: Optional[Dict[str, str]] = None, jobs: Optional[int] = None) -> str:
     """Build CMake project and return path to the generated executable.
+
+    Each variant is built in its own directory build/<variant> with CMAKE_BUILD_TYPE
+    set to the variant name. Configure is skipped while CMakeLists.txt, the
+    generator and the options are the same as in the previous configure.
+    Ninja is used when available, otherwise Makefiles, both in parallel.
+
     :param cmakelists_dir: Path to CMakeLists directory.
     :param project_name: Name of the project.
+    :param variant: Build type, e.g. Release, RelWithDebInfo or Debug.
+    :param options: Extra cache entries passed to cmake as -DNAME=VALUE.
+    :param jobs: Number of parallel build jobs, os.cpu_count() by default.
     :return: The path to the generated executable.
     :raises FileNotFoundError: If the CMakeLists directory does not exist.
     :raises subprocess.CalledProcessError: If the CMakeLists executable does not exist.
@@ -77,24 +476,42 @@ def build_with_cmake(cmakelists_dir: str, project_name: str) -> str:
     if not os.path.isfile(cmakelists_path):
         raise FileNotFoundError(f"CMakeLists.txt not found in {cmakelists_dir}")
 
-    build_dir = os.path.join(cmakelists_dir, 'build')
+    build_dir = os.path.join(cmakelists_dir, 'build', variant)
     os.makedirs(build_dir, exist_ok=True)
 
+    generator = "Ninja" if shutil.which("ninja") else "Unix Makefiles"
+    definitions = {"CMAKE_BUILD_TYPE": variant, **(options or {})}
+    configure_cmd = ["cmake", "-S", os.path.abspath(cmakelists_dir), "-B", ".", "-G", generator,
+                     *[f"-D{name}={value}" for name, value in sorted(definitions.items())]]
+
+    with open(cmakelists_path, 'rb') as file:
+        digest = hashlib.sha256(file.read())
+    digest.update("\0".join(configure_cmd).encode())
+    stamp_path = os.path.join(build_dir, '.configure_stamp')
+    cache_path = os.path.join(build_dir, 'CMakeCache.txt')
+
+    stamp = None
+    if os.path.isfile(stamp_path):
+        with open(stamp_path) as file:
+            stamp = file.read()
+    cache = None
+    if os.path.isfile(cache_path):
+        with open(cache_path) as file:
+            cache = file.read()
+
     try:
-        subprocess.run(
-            ["cmake", "build", ".."],
-            check=True,
-            cwd=build_dir,
-            stdout=sys.stdout,
-            stderr=subprocess.STDOUT
-        )
-        subprocess.run(
-            ["make"],
-            check=True,
-            cwd=build_dir,
-            stdout=sys.stdout,
-            stderr=subprocess.STDOUT
-        )
+        if stamp != digest.hexdigest() or cache is None:
+            if cache is not None and f"CMAKE_GENERATOR:INTERNAL={generator}\n" not in cache:
+                # cmake refuses to switch the generator of a configured directory
+                os.remove(cache_path)
+                shutil.rmtree(os.path.join(build_dir, 'CMakeFiles'), ignore_errors=True)
+            print(f"Configuring {variant} build with {generator}...")
+            _run_build_step(configure_cmd, build_dir)
+            with open(stamp_path, 'w') as file:
+                file.write(digest.hexdigest())
+
+        _run_build_step(["cmake", "--build", ".", "--target", project_name,
+                         "--parallel", str(jobs or os.cpu_count() or 1)], build_dir)
     except subprocess.CalledProcessError as e:
         print(f"\033[91mBuild process failed with code {e.returncode} 😭\033[0m")
         print(f"Command: {e.cmd}")
@@ -106,9 +523,10 @@ def build_with_cmake(cmakelists_dir: str, project_name: str) -> str:
     return os.path.join(build_dir, project_name)
 
 
-def run_executable(target_name: str) -> None:
+def run_executable(target_name: str, args: Sequence[str] = ()) -> None:
     """Run the generated executable file.
     :param target_name: Name of the target executable.
+    :param args: Command line arguments of the executable.
     :raises FileNotFoundError: If the target executable does not exist.
     :raises subprocess.CalledProcessError: If the target executable does not exist.
     """
@@ -117,7 +535,7 @@ def run_executable(target_name: str) -> None:
 
     try:
         subprocess.run(
-            [f"./{os.path.basename(target_name)}"],
+            [f"./{os.path.basename(target_name)}", *args],
             check=True,
             cwd=os.path.dirname(target_name),
             stdout=sys.stdout,
@@ -129,6 +547,24 @@ def run_executable(target_name: str) -> None:
         raise
 
 
+def start_executable(target_name: str, args: Sequence[str] = ()) -> subprocess.Popen:
+    """Start the generated executable file without waiting for it.
+    :param target_name: Name of the target executable.
+    :param args: Command line arguments of the executable.
+    :return: The running process.
+    :raises FileNotFoundError: If the target executable does not exist.
+    """
+    if not os.path.isfile(target_name):
+        raise FileNotFoundError(f"Executable {target_name} not found")
+
+    return subprocess.Popen(
+        [f"./{os.path.basename(target_name)}", *args],
+        cwd=os.path.dirname(target_name),
+        stdout=sys.stdout,
+        stderr=subprocess.STDOUT
+    )
+
+
 def get_project_run_result_csv(table_name: str) -> pd.DataFrame:
     """
     Read a CSV file and return a DataFrame.
@@ -139,6 +575,53 @@ def get_project_run_result_csv(table_name: str) -> pd.DataFrame:
     return pd.read_csv(table_name)
 
 
+def run_and_verify(executable_path: str, stream: bool, chunk_mb: int, binary: bool) -> Dict[str, Optional[float]]:
+    """Run the executable once and verify its results.
+    :param executable_path: Path to the built executable.
+    :param stream: Verify results while the executable is still writing them.
+    :param chunk_mb: Size of the chunks read from the CSV files, MB.
+    :param binary: Exchange tasks and results as binary records instead of CSV.
+    :return: Execution, verification and total time of the run, s; None where not measured.
+    :raises subprocess.CalledProcessError: If the executable fails.
+    """
+    executable_dir = os.path.dirname(executable_path)
+    tasks_csv = os.path.join(executable_dir, "information_tasks.csv")
+    results_csv = os.path.join(executable_dir, "tasks_results.csv")
+
+    start = time.perf_counter()
+    process = None
+    execute_s = None
+    if stream:
+        # Results of a previous run must not be mistaken for new ones
+        for path in (tasks_csv, results_csv):
+            if os.path.exists(path):
+                os.remove(path)
+        process = start_executable(executable_path)
+    else:
+        run_executable(executable_path, ["--binary"] if binary else [])
+        execute_s = time.perf_counter() - start
+
+    verify_start = time.perf_counter()
+    if binary:
+        verify_binary(os.path.join(executable_dir, "information_tasks.bin"),
+                      os.path.join(executable_dir, "tasks_results.bin"))
+    else:
+        running = (lambda: process.poll() is None) if process is not None else None
+        verify_streaming(tasks_csv, results_csv, os.path.join(executable_dir, "tasks_index.bin"),
+                         running, chunk_bytes=chunk_mb << 20)
+
+    if process is not None and process.returncode != 0:
+        print(f"\033[91mExecution failed with code {process.returncode} 😭\033[0m")
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+
+    # With --stream verification overlaps the execution, so only the total time is comparable
+    return {
+        "execute_s": execute_s,
+        "verify_s": None if stream else time.perf_counter() - verify_start,
+        "total_s": time.perf_counter() - start,
+    }
+
+
 @click.command()
 @click.argument(
     "cmakelists_dir",
@@ -147,31 +630,49 @@ def get_project_run_result_csv(table_name: str) -> pd.DataFrame:
 @click.argument(
     "project_name", type=str,
     default="task2")
-def main(cmakelists_dir: str, project_name: str) -> None:
+@click.option("--stream", is_flag=True, help="Verify results while the executable is still writing them.")
+@click.option("--chunk_mb", default=16, type=int, help="Size of the chunks read from the CSV files, MB.")
+@click.option("--binary", is_flag=True, help="Exchange tasks and results as binary records instead of CSV.")
+@click.option("--variant", default="Release", help="CMake build type, built in build/<variant>.")
+@click.option("--runs", default=1, type=int, help="Number of runs, each one verified and timed; bench_results.py compare "
+                   "needs at least 4 to detect a regression.")
+@click.option("--json", "json_path", default="results.json",
+              help="Path to the output JSON file in the common format of common/bench_results.py.")
+def main(cmakelists_dir: str, project_name: str, stream: bool, chunk_mb: int, binary: bool, variant: str,
+         runs: int, json_path: str) -> None:
     """Command line interface for building and running CMake projects.
     :param cmakelists_dir: Path to CMakeLists directory.
     :param project_name: Name of the project.
+    :param stream: Verify results while the executable is still writing them.
+    :param chunk_mb: Size of the chunks read from the CSV files, MB.
+    :param binary: Exchange tasks and results as binary records instead of CSV.
+    :param variant: CMake build type, built in build/<variant>.
+    :param runs: Number of runs, each one verified and timed.
+    :param json_path: Path to the output JSON file with the timings of the runs.
     """
+    if stream and binary:
+        raise click.UsageError("--stream reads CSV files and cannot be combined with --binary")
+
     try:
-        executable_path = build_with_cmake(cmakelists_dir, project_name)
+        executable_path = build_with_cmake(cmakelists_dir, project_name, variant)
         print(f"\033[92mSuccessfully built: {executable_path} ✅\033[0m")
-
-        print(f"\nStarting execution of {project_name}...")
-        run_executable(executable_path)
-
     except Exception as e:
         print(f"\033[91mError: {str(e)} 😭\033[0m")
         sys.exit(1)
 
-    executable_dir = os.path.dirname(executable_path)
-
-    df_information_tasks = pd.read_csv(os.path.join(executable_dir, "information_tasks.csv"))
-    df_results_tasks = pd.read_csv(os.path.join(executable_dir, "tasks_results.csv"))
-
-    total_result = pd.merge(df_information_tasks, df_results_tasks, on="task ID")
-    total_result = total_result.reset_index(drop=True)
-
-    execute_and_compare(total_result)
+    bench_run = BenchRun("task3/task2", cmakelists_dir)
+    for metric in ("execute_s", "verify_s", "total_s"):
+        bench_run.describe(metric, "s")
+    config = {"variant": variant, "binary": binary, "stream": stream}
+    try:
+        for index in range(runs):
+            print(f"\nStarting execution of {project_name} ({index + 1}/{runs})...")
+            bench_run.add_trial(config, **run_and_verify(executable_path, stream, chunk_mb, binary))
+    except Exception as e:
+        print(f"\033[91mError: {str(e)} 😭\033[0m")
+        sys.exit(1)
+    finally:
+        bench_run.save(json_path)
 
 
 if __name__ == "__main__":
@@ -4,49 +4,50 @@
 #include <random>
 #include <string>
 #include <mutex>
-#include <fstream>
 #include "server.h"
-
-std::mutex outputMutex;
-
-void safePrint(std::ofstream& out, const std::string &message);
+#include "task_writer.h"
 
 std::string getTypeName(const std::type_info &type);
 
-template<typename Tserver, typename Tclient>
-std::string formatMessage(size_t taskId,const std::string& operationName, Tclient arg1, Tclient *arg2 = nullptr);
-
 template<typename Tclient, typename Tserver>
 class Client {
 public:
-    Client(std::ofstream& out);
+    Client(TaskWriter& out, int min_delay_ms = 1000, int max_delay_ms = 4000);
     virtual ~Client() = default;
     virtual size_t Client2ServerTask(Server<Tserver> &server) = 0;
 
 protected:
-    std::ofstream& out_;
+    TaskWriter& out_;
     std::mt19937 gen_;
-    Tclient GenerateRandom(Tclient min, Tclient max);
+    // One client object is shared by several client threads
+    std::mutex gen_mtx_;
+    int min_delay_ms_;
+    int max_delay_ms_;
+    template<typename U>
+    U GenerateRandom(U min, U max);
+    int GenerateDelay();
+    void WriteTask(size_t task_id, const std::string &operation, Tclient arg1);
+    void WriteTask(size_t task_id, const std::string &operation, Tclient arg1, Tclient arg2);
 };
 
 template<typename Tclient, typename Tserver>
 class SinClient : public Client<Tclient, Tserver> {
 public:
-    SinClient(std::ofstream& out);
+    SinClient(TaskWriter& out, int min_delay_ms = 1000, int max_delay_ms = 4000);
     size_t Client2ServerTask(Server<Tserver> &server) override;
 };
 
 template<typename Tclient, typename Tserver>
 class SqrtClient : public Client<Tclient, Tserver> {
 public:
-    SqrtClient(std::ofstream& out);
+    SqrtClient(TaskWriter& out, int min_delay_ms = 1000, int max_delay_ms = 4000);
     size_t Client2ServerTask(Server<Tserver> &server) override;
 };
 
 template<typename Tclient, typename Tserver>
 class PowClient : public Client<Tclient, Tserver> {
 public:
-    PowClient(std::ofstream& out);
+    PowClient(TaskWriter& out, int min_delay_ms = 1000, int max_delay_ms = 4000);
     size_t Client2ServerTask(Server<Tserver> &server) override;
 };
 
@@ -4,11 +4,6 @@
 #include "client.h"
 #include "functions.h"
 
-void safePrint(std::ofstream& out, const std::string &message) {
-    std::lock_guard<std::mutex> lock(outputMutex);
-    out << message << std::endl;
-}
-
 std::string getTypeName(const std::type_info &type) {
     std::string name = type.name();
     if (name == "d") return "double";
@@ -26,64 +21,73 @@ std::string getTypeName(const std::type_info &type) {
     return name;
 }
 
-template<typename Tserver, typename Tclient>
-std::string formatMessage(size_t taskId, const std::string& operationName, Tclient arg1, Tclient *arg2) {
-    std::string typeNameServer = getTypeName(typeid(Tserver));
-    std::string typeNameClient = getTypeName(typeid(Tclient));
+template<typename Tclient, typename Tserver>
+Client<Tclient, Tserver>::Client(TaskWriter& out, int min_delay_ms, int max_delay_ms)
+        : out_(out), gen_(std::random_device{}()), min_delay_ms_(min_delay_ms), max_delay_ms_(max_delay_ms) {}
 
-    if (arg2 != nullptr) {
-        return std::to_string(taskId) + "," + typeNameServer + "," + typeNameClient + operationName +
-               std::to_string(static_cast<double>(arg1)) + "," + std::to_string(static_cast<double>(*arg2));
+template<typename Tclient, typename Tserver>
+template<typename U>
+U Client<Tclient, Tserver>::GenerateRandom(U min, U max) {
+    std::lock_guard<std::mutex> lock(gen_mtx_);
+    if constexpr (std::is_integral_v<U>) {
+        std::uniform_int_distribution<U> dist(min, max);
+        return dist(gen_);
     } else {
-        return std::to_string(taskId) + "," + typeNameServer + "," + typeNameClient + operationName +
-               std::to_string(static_cast<double>(arg1));
+        std::uniform_real_distribution<U> dist(min, max);
+        return dist(gen_);
     }
 }
 
 template<typename Tclient, typename Tserver>
-Client<Tclient, Tserver>::Client(std::ofstream& out) : out_(out), gen_(std::random_device{}()) {}
+int Client<Tclient, Tserver>::GenerateDelay() {
+    return this->GenerateRandom(min_delay_ms_, max_delay_ms_);
+}
+
+template<typename Tclient, typename Tserver>
+void Client<Tclient, Tserver>::WriteTask(size_t task_id, const std::string &operation, Tclient arg1) {
+    out_.WriteTask(task_id, getTypeName(typeid(Tserver)), getTypeName(typeid(Tclient)), operation,
+                   static_cast<double>(arg1));
+}
 
 template<typename Tclient, typename Tserver>
-Tclient Client<Tclient, Tserver>::GenerateRandom(Tclient min, Tclient max) {
-    if constexpr (std::is_integral_v<Tclient>) {
-        std::uniform_int_distribution<Tclient> dist(min, max);
-        return dist(gen_);
-    } else {
-        std::uniform_real_distribution<Tclient> dist(min, max);
-        return dist(gen_);
-    }
+void Client<Tclient, Tserver>::WriteTask(size_t task_id, const std::string &operation, Tclient arg1, Tclient arg2) {
+    out_.WriteTask(task_id, getTypeName(typeid(Tserver)), getTypeName(typeid(Tclient)), operation,
+                   static_cast<double>(arg1), static_cast<double>(arg2));
 }
 
 template<typename Tclient, typename Tserver>
-SinClient<Tclient, Tserver>::SinClient(std::ofstream& out) : Client<Tclient, Tserver>(out) {}
+SinClient<Tclient, Tserver>::SinClient(TaskWriter& out, int min_delay_ms, int max_delay_ms)
+        : Client<Tclient, Tserver>(out, min_delay_ms, max_delay_ms) {}
 
 template<typename Tclient, typename Tserver>
 size_t SinClient<Tclient, Tserver>::Client2ServerTask(Server<Tserver> &server) {
     Tclient arg = this->GenerateRandom(Tclient(-10), Tclient(10));
-    int delay_ms = this->GenerateRandom(1000, 4000);
+    int delay_ms = this->GenerateDelay();
     size_t task_id = server.AddTask([arg, delay_ms] { return MathFunctions::FunSin(arg, delay_ms); });
 
-    safePrint(this->out_, formatMessage<Tserver, Tclient>(task_id,  ",sin,", arg));
+    this->WriteTask(task_id, "sin", arg);
 
     return task_id;
 }
 
 template<typename Tclient, typename Tserver>
-SqrtClient<Tclient, Tserver>::SqrtClient(std::ofstream& out) : Client<Tclient, Tserver>(out) {}
+SqrtClient<Tclient, Tserver>::SqrtClient(TaskWriter& out, int min_delay_ms, int max_delay_ms)
+        : Client<Tclient, Tserver>(out, min_delay_ms, max_delay_ms) {}
 
 template<typename Tclient, typename Tserver>
 size_t SqrtClient<Tclient, Tserver>::Client2ServerTask(Server<Tserver> &server) {
     Tclient arg = this->GenerateRandom(Tclient(0), Tclient(100));
-    int delay_ms = this->GenerateRandom(1000, 4000);
+    int delay_ms = this->GenerateDelay();
     size_t task_id = server.AddTask([arg, delay_ms] { return MathFunctions::FunSqrt(arg, delay_ms); });
 
-    safePrint(this->out_, formatMessage<Tserver, Tclient>(task_id, ",sqrt,", arg));
+    this->WriteTask(task_id, "sqrt", arg);
 
     return task_id;
 }
 
 template<typename Tclient, typename Tserver>
-PowClient<Tclient, Tserver>::PowClient(std::ofstream& out) : Client<Tclient, Tserver>(out) {}
+PowClient<Tclient, Tserver>::PowClient(TaskWriter& out, int min_delay_ms, int max_delay_ms)
+        : Client<Tclient, Tserver>(out, min_delay_ms, max_delay_ms) {}
 
 template<typename Tclient, typename Tserver>
 size_t PowClient<Tclient, Tserver>::Client2ServerTask(Server<Tserver> &server) {
@@ -91,10 +95,10 @@ size_t PowClient<Tclient, Tserver>::Client2ServerTask(Server<Tserver> &server) {
 
     Tclient y = x == 0 ? this->GenerateRandom(Tclient(0), Tclient(5))
                        : this->GenerateRandom(Tclient(-5), Tclient(5));
-    int delay_ms = this->GenerateRandom(1000, 4000);
+    int delay_ms = this->GenerateDelay();
     size_t task_id = server.AddTask([x, y, delay_ms] { return MathFunctions::FunPow(x, y, delay_ms); });
 
-    safePrint(this->out_, formatMessage<Tserver, Tclient>(task_id, ",pow,", x, &y));
+    this->WriteTask(task_id, "pow", x, y);
 
     return task_id;
 }
@@ -0,0 +1,148 @@
+import os
+import subprocess
+import time
+from typing import Dict, List
+
+import click
+import numpy as np
+import pandas as pd
+
+# Run with the repository root on PYTHONPATH, e.g. PYTHONPATH=../.. python loadtest.py
+from benchmark import build_with_cmake
+from common.bench_results import BenchRun
+
+# Columns of run_load() results stored as metrics, with their units and better direction
+METRICS = {
+    "Tasks_per_s": ("tasks/s", "higher"),
+    "Queue_wait_p50_ms": ("ms", "lower"),
+    "Queue_wait_p99_ms": ("ms", "lower"),
+    "Service_p50_ms": ("ms", "lower"),
+    "Service_p99_ms": ("ms", "lower"),
+    "Process_s": ("s", "lower"),
+}
+
+
+def run_load(executable_path: str, workers: int, clients: int, tasks: int, mix: str,
+             delay_ms: str) -> Dict[str, float]:
+    """
+    Run the server once and summarize the per-task timings.
+
+    :param executable_path: Path to the built executable.
+    :param workers: Number of server workers.
+    :param clients: Number of client threads.
+    :param tasks: Number of tasks submitted by each client thread.
+    :param mix: Task mix, e.g. sin=1,sqrt=1,pow=1.
+    :param delay_ms: Task delay in milliseconds, MIN or MIN:MAX.
+    :return: Throughput, queue-wait and service-time percentiles of the run.
+    """
+    executable_dir = os.path.dirname(executable_path)
+    timing_csv = f"timing_{workers}.csv"
+    command = [f"./{os.path.basename(executable_path)}",
+               "--workers", str(workers), "--clients", str(clients), "--tasks", str(tasks),
+               "--mix", mix, "--delay_ms", delay_ms, "--timing", timing_csv]
+
+    start = time.perf_counter()
+    subprocess.run(command, check=True, cwd=executable_dir, stdout=subprocess.DEVNULL)
+    process_s = time.perf_counter() - start
+
+    timing = pd.read_csv(os.path.join(executable_dir, timing_csv))
+    submit = timing['submit_us'].to_numpy()
+    queue_wait_ms = (timing['start_us'].to_numpy() - submit) / 1000
+    service_ms = (timing['finish_us'].to_numpy() - timing['start_us'].to_numpy()) / 1000
+    wall_s = (timing['finish_us'].max() - submit.min()) / 1e6
+
+    return {
+        "Workers": workers,
+        "Tasks": len(timing),
+        "Tasks_per_s": len(timing) / wall_s if wall_s > 0 else float("nan"),
+        "Queue_wait_p50_ms": float(np.percentile(queue_wait_ms, 50)),
+        "Queue_wait_p99_ms": float(np.percentile(queue_wait_ms, 99)),
+        "Service_p50_ms": float(np.percentile(service_ms, 50)),
+        "Service_p99_ms": float(np.percentile(service_ms, 99)),
+        "Process_s": process_s,
+    }
+
+
+def plot_results(results: List[Dict[str, float]], path: str) -> None:
+    """
+    Plot throughput and latency percentiles against the number of workers.
+
+    :param results: Results of run_load() for increasing worker counts; repeated runs are reduced to medians.
+    :param path: Output image path.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    df = pd.DataFrame(results).groupby("Workers", as_index=False).median(numeric_only=True)
+    fig, (ax_throughput, ax_latency) = plt.subplots(1, 2, figsize=(12, 5))
+    ax_throughput.plot(df["Workers"], df["Tasks_per_s"], "o-")
+    ax_throughput.set_ylabel("tasks/s")
+    for column in ["Queue_wait_p50_ms", "Queue_wait_p99_ms", "Service_p50_ms", "Service_p99_ms"]:
+        ax_latency.plot(df["Workers"], df[column], "o-", label=column)
+    ax_latency.set_ylabel("ms")
+    ax_latency.set_yscale("log")
+    ax_latency.legend()
+    for ax in (ax_throughput, ax_latency):
+        ax.set_xlabel("Workers")
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+@click.command()
+@click.argument(
+    "cmakelists_dir",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=os.path.dirname(os.path.abspath(__file__)))
+@click.argument("project_name", type=str, default="task2")
+@click.option("--workers", default="1,2,4,8,16", help="Numbers of server workers, comma-separated.")
+@click.option("--clients", default=30, type=int, help="Number of client threads.")
+@click.option("--tasks", default=100, type=int, help="Tasks submitted by each client thread.")
+@click.option("--mix", default="sin=1,sqrt=1,pow=1", help="Task mix as operation=weight pairs.")
+@click.option("--delay_ms", default="10", help="Task delay in milliseconds, MIN or MIN:MAX.")
+@click.option("--csv", "csv_path", default="loadtest_results.csv", help="Path to the output CSV file.")
+@click.option("--plot", default=None, help="Save throughput and latency curves to this image.")
+@click.option("--variant", default="Release", help="CMake build type, built in build/<variant>.")
+@click.option("--repeat", default=1, type=int, help="Runs per worker count; bench_results.py compare needs at least 5 "
+                   "to detect a regression.")
+@click.option("--json", "json_path", default="loadtest_results.json",
+              help="Path to the output JSON file in the common format of common/bench_results.py.")
+def main(cmakelists_dir: str, project_name: str, workers: str, clients: int, tasks: int, mix: str,
+         delay_ms: str, csv_path: str, plot: str, variant: str, repeat: int, json_path: str) -> None:
+    """Load test of the task server: throughput and latency as the worker count grows."""
+    executable_path = build_with_cmake(cmakelists_dir, project_name, variant)
+
+    run = BenchRun("task3/task2/loadtest", cmakelists_dir)
+    for metric, (unit, better) in METRICS.items():
+        run.describe(metric, unit, better)
+
+    results = []
+    for count in [int(w) for w in workers.split(",")]:
+        config = {"workers": count, "clients": clients, "tasks": tasks, "mix": mix,
+                  "delay_ms": delay_ms, "variant": variant}
+        for index in range(repeat):
+            result = run_load(executable_path, count, clients, tasks, mix, delay_ms)
+            result["Run"] = index + 1
+            results.append(result)
+            run.add_trial(config, **{metric: result[metric] for metric in METRICS})
+            print(f"{count:>4} workers: {result['Tasks_per_s']:9.1f} tasks/s  "
+                  f"queue wait p50 {result['Queue_wait_p50_ms']:8.2f} p99 {result['Queue_wait_p99_ms']:8.2f} ms  "
+                  f"service p50 {result['Service_p50_ms']:8.2f} p99 {result['Service_p99_ms']:8.2f} ms  "
+                  f"process {result['Process_s']:.2f} s")
+
+    pd.DataFrame(results).to_csv(csv_path, index=False)
+    run.save(json_path)
+    if plot:
+        try:
+            plot_results(results, plot)
+        except ImportError:
+            print("matplotlib is not installed, plot skipped.")
+
+
+if __name__ == "__main__":
+    main()
+
+# Пример запуска:
+# python loadtest.py --workers 1,2,4,8,16 --clients 30 --tasks 100 --delay_ms 10
@@ -1,61 +1,140 @@
 #include <iostream>
 #include <fstream>
-#include <numeric>
+#include <map>
+#include <memory>
+#include <sstream>
+#include <string>
 #include "client.h"
 #include "functions.h"
 #include "server.h"
+#include "task_writer.h"
 
 
-int main() {
+struct Options {
+    size_t workers = 4;
+    size_t clients = 30;
+    size_t tasks = 1;
+    int min_delay_ms = 1000;
+    int max_delay_ms = 4000;
+    // Weights of sin, sqrt and pow tasks
+    std::map<std::string, size_t> mix = {{"sin", 1}, {"sqrt", 1}, {"pow", 1}};
+    std::string timing;
+    bool binary = false;
+};
 
-    std::ofstream file1("information_tasks.csv");
-    file1 << "task ID"<< "," << "TServer" << "," << "TClient" << "," <<"Operation" << "," << "arg1" << "," <<"arg2" << std::endl;
-    std::ofstream file2("tasks_results.csv");
-    file2 << "task ID"<< "," << "result" << std::endl;
+// Usage: task2 [--workers N] [--clients N] [--tasks N] [--mix sin=1,sqrt=1,pow=1]
+//              [--delay_ms MIN[:MAX]] [--timing timing.csv] [--binary]
+Options ParseOptions(int argc, char *argv[]) {
+    Options options;
+    for (int i = 1; i < argc; i += 2) {
+        std::string name = argv[i];
+        if (name == "--binary") {
+            options.binary = true;
+            --i;
+            continue;
+        }
+        if (i + 1 == argc) {
+            throw std::invalid_argument("Missing value of " + name);
+        }
+        std::string value = argv[i + 1];
+        if (name == "--workers") {
+            options.workers = std::stoul(value);
+        } else if (name == "--clients") {
+            options.clients = std::stoul(value);
+        } else if (name == "--tasks") {
+            options.tasks = std::stoul(value);
+        } else if (name == "--delay_ms") {
+            size_t colon = value.find(':');
+            options.min_delay_ms = std::stoi(value.substr(0, colon));
+            options.max_delay_ms = colon == std::string::npos ? options.min_delay_ms
+                                                              : std::stoi(value.substr(colon + 1));
+        } else if (name == "--mix") {
+            options.mix.clear();
+            std::stringstream items(value);
+            std::string item;
+            while (std::getline(items, item, ',')) {
+                size_t eq = item.find('=');
+                options.mix[item.substr(0, eq)] = eq == std::string::npos ? 1 : std::stoul(item.substr(eq + 1));
+            }
+        } else if (name == "--timing") {
+            options.timing = value;
+        } else {
+            throw std::invalid_argument("Unknown option " + name);
+        }
+    }
+    return options;
+}
+
+
+int main(int argc, char *argv[]) {
+    Options options;
+    try {
+        options = ParseOptions(argc, argv);
+    } catch (const std::exception &e) {
+        std::cerr << "Invalid arguments: " << e.what() << std::endl;
+        return 1;
+    }
+
+    std::unique_ptr<TaskWriter> writer;
+    if (options.binary) {
+        writer = std::make_unique<BinaryTaskWriter>("information_tasks.bin", "tasks_results.bin");
+    } else {
+        writer = std::make_unique<CsvTaskWriter>("information_tasks.csv", "tasks_results.csv");
+    }
 
-    Server<double> server(4);
+    Server<double> server(options.workers);
     server.Start();
-    SinClient<double, double> sin_client(file1);
-    SqrtClient<double, double> sqrt_client(file1);
-    PowClient<double, double> pow_client(file1);
+    SinClient<double, double> sin_client(*writer, options.min_delay_ms, options.max_delay_ms);
+    SqrtClient<double, double> sqrt_client(*writer, options.min_delay_ms, options.max_delay_ms);
+    PowClient<double, double> pow_client(*writer, options.min_delay_ms, options.max_delay_ms);
 
+    // The k-th task goes to pattern[k % size], so the mix is kept exactly, not on average
+    std::map<std::string, Client<double, double> *> clients = {
+            {"sin", &sin_client}, {"sqrt", &sqrt_client}, {"pow", &pow_client}};
+    std::vector<Client<double, double> *> pattern;
+    for (const auto &name: {"sin", "sqrt", "pow"}) {
+        for (size_t i = 0; i < options.mix[name]; ++i) {
+            pattern.push_back(clients[name]);
+        }
+    }
+    if (pattern.empty()) {
+        std::cerr << "Invalid arguments: empty task mix" << std::endl;
+        return 1;
+    }
 
-    auto client2ServerTask = [&](Client<double, double> &client, Server<double> &server) {
-        client.Client2ServerTask(server);
+    auto client2ServerTask = [&](size_t client_index, Server<double> &server) {
+        for (size_t j = 0; j < options.tasks; ++j) {
+            pattern[(client_index * options.tasks + j) % pattern.size()]->Client2ServerTask(server);
+        }
     };
 
     std::vector<std::thread> client_threads;
-    for (int i = 0; i < 10; ++i) {
-        client_threads.emplace_back(client2ServerTask, std::ref(sin_client), std::ref(server));
-        client_threads.emplace_back(client2ServerTask, std::ref(sqrt_client), std::ref(server));
-        client_threads.emplace_back(client2ServerTask, std::ref(pow_client), std::ref(server));
+    for (size_t i = 0; i < options.clients; ++i) {
+        client_threads.emplace_back(client2ServerTask, i, std::ref(server));
     }
 
     for (auto &thread: client_threads) {
         thread.join();
     }
 
-    int remainingTasks = server.GetTaskNumber();
-    std::vector<size_t> ids_tasks(remainingTasks);
-    std::iota(ids_tasks.begin(), ids_tasks.end(), 1);
-
-    while (remainingTasks>0) {
-        for (int i = 0; i < remainingTasks; ++i) {
-            try {
-                auto result = server.RequestResult(ids_tasks[i]);
-                if (result.has_value()) {
-                    file2 << ids_tasks[i] << "," << result.value() << std::endl;
-                    remainingTasks--;
-                    ids_tasks.erase(std::remove(ids_tasks.begin(), ids_tasks.end(), ids_tasks[i]), ids_tasks.end());
-
-                }
-            } catch (const std::exception &e) {
-                std::cerr << "Error for task " << ids_tasks[i] << ": " << e.what() << std::endl;
-                i++;
-            }
+    // Task IDs start at 0
+    size_t totalTasks = options.clients * options.tasks;
+    for (size_t task_id = 0; task_id < totalTasks; ++task_id) {
+        try {
+            writer->WriteResult(task_id, server.WaitResult(task_id));
+        } catch (const std::exception &e) {
+            std::cerr << "Error for task " << task_id << ": " << e.what() << std::endl;
         }
     }
 
     server.Stop();
+
+    if (!options.timing.empty()) {
+        std::ofstream timing(options.timing);
+        timing << "task ID,submit_us,start_us,finish_us\n";
+        for (const auto &t: server.GetTimings()) {
+            timing << t.task_id << "," << t.submit_us << "," << t.start_us << "," << t.finish_us << "\n";
+        }
+    }
     return 0;
 }
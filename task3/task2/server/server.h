@@ -2,13 +2,23 @@
 #define SERVER_H
 
 #include <atomic>
+#include <chrono>
+#include <cstdint>
 #include <functional>
 #include <future>
 #include <mutex>
 #include <queue>
 #include <thread>
 #include <optional>
-
+#include <vector>
+
+// Moments of a task in microseconds since the server was created
+struct TaskTiming {
+    size_t task_id;
+    int64_t submit_us;
+    int64_t start_us;
+    int64_t finish_us;
+};
 
 template<typename T>
 class Server {
@@ -23,11 +33,15 @@ public:
     size_t AddTask(Fn &&func, Args &&...args);
 
     std::optional<T> RequestResult(size_t task_number);
+    // Blocks until the task is done; the result is handed out once
+    T WaitResult(size_t task_number);
     size_t GetTaskNumber();
+    std::vector<TaskTiming> GetTimings();
 
 
 private:
     void ProcessTasks();
+    int64_t NowUs() const;
     std::vector<std::jthread> workers_;
     size_t num_workers_;
     std::atomic<bool> running_ = false;
@@ -38,6 +52,11 @@ private:
 
     std::queue<std::pair<size_t, std::function<T()>>> tasks_;
     std::unordered_map<size_t, std::future<T>> results_;
+
+    // Separate lock, so that timing does not add contention on mtx_
+    std::chrono::steady_clock::time_point created_ = std::chrono::steady_clock::now();
+    std::mutex timing_mtx_;
+    std::vector<TaskTiming> timings_;
 };
 
 #include "server.tpp"
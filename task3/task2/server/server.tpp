@@ -31,10 +31,19 @@ template<typename Fn, typename... Args>
 size_t Server<T>::AddTask(Fn &&func, Args &&...args) {
     std::unique_lock<std::mutex> lock(mtx_);
 
-    tasks_.push({this->next_id_++,
-                 [func = std::forward<Fn>(func), ... args = std::forward<Args>(args)]() { return func(args...); }});
+    size_t task_id = this->next_id_++;
+    int64_t submit_us = NowUs();
+    tasks_.push({task_id,
+                 [this, task_id, submit_us, func = std::forward<Fn>(func), ... args = std::forward<Args>(args)]() {
+                     int64_t start_us = NowUs();
+                     T result = func(args...);
+                     int64_t finish_us = NowUs();
+                     std::lock_guard<std::mutex> timing_lock(timing_mtx_);
+                     timings_.push_back({task_id, submit_us, start_us, finish_us});
+                     return result;
+                 }});
     cv_.notify_one();
-    return next_id_ - 1;
+    return task_id;
 }
 
 template<typename T>
@@ -47,11 +56,33 @@ std::optional<T> Server<T>::RequestResult(size_t task_number) {
     }
 }
 
+template<typename T>
+T Server<T>::WaitResult(size_t task_number) {
+    std::unique_lock<std::mutex> lock(mtx_);
+    cv_result_.wait(lock, [this, task_number] { return results_.find(task_number) != results_.end(); });
+    auto result = std::move(results_[task_number]);
+    results_.erase(task_number);
+    lock.unlock();
+
+    return result.get();
+}
+
 template<typename T>
 size_t Server<T>::GetTaskNumber() {
     return next_id_ - 1;
 }
 
+template<typename T>
+std::vector<TaskTiming> Server<T>::GetTimings() {
+    std::lock_guard<std::mutex> lock(timing_mtx_);
+    return timings_;
+}
+
+template<typename T>
+int64_t Server<T>::NowUs() const {
+    return std::chrono::duration_cast<std::chrono::microseconds>(std::chrono::steady_clock::now() - created_).count();
+}
+
 template<typename T>
 void Server<T>::ProcessTasks() {
     while (running_) {
@@ -66,7 +97,11 @@ void Server<T>::ProcessTasks() {
 
         lock.unlock();
 
-        auto result = std::async(std::launch::async, task.second);
+        // The task runs on this worker, so num_workers_ bounds the concurrency;
+        // packaged_task keeps an exception of the task for RequestResult/WaitResult
+        std::packaged_task<T()> packaged(std::move(task.second));
+        auto result = packaged.get_future();
+        packaged();
 
         std::lock_guard<std::mutex> result_lock(mtx_);
         results_[task.first] = std::move(result);
@@ -0,0 +1,226 @@
+import importlib.util
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# task3/task1 has a benchmark module too, so this one is loaded under its own name
+_spec = importlib.util.spec_from_file_location(
+    "task2_benchmark", os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark.py"))
+benchmark = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(benchmark)
+
+TASKS = [
+    (0, "double", "double", "sqrt", 4.0, math.nan),
+    (1, "double", "double", "pow", 2.0, 3.0),
+    (2, "double", "double", "sin", 0.0, math.nan),
+    (3, "int", "double", "pow", 1.5, 2.0),
+    (4, "double", "int", "sqrt", 9.9, math.nan),
+]
+# Task 3 truncates 2.25 to 2, task 4 takes the root of 9
+RESULTS = [(0, 2.0), (1, 8.0), (2, 0.0), (3, 2.0), (4, 3.0)]
+
+
+def write_tasks_csv(path, tasks, newline="\n"):
+    lines = ["task ID,TServer,TClient,Operation,arg1,arg2"]
+    for task_id, server, client, operation, arg1, arg2 in tasks:
+        # Like CsvTaskWriter, a unary operation has no arg2 column
+        lines.append(f"{task_id},{server},{client},{operation},{arg1}" + ("" if math.isnan(arg2) else f",{arg2}"))
+    path.write_bytes("".join(line + newline for line in lines).encode())
+
+
+def write_results_csv(path, results, newline="\n"):
+    lines = ["task ID,result"] + [f"{task_id},{result}" for task_id, result in results]
+    path.write_bytes("".join(line + newline for line in lines).encode())
+
+
+def write_tasks_bin(path, tasks):
+    types, operations = list(benchmark.type_map), list(benchmark.operation_map)
+    records = np.zeros(len(tasks), dtype=benchmark.TASK_RECORD_DTYPE)
+    for record, (task_id, server, client, operation, arg1, arg2) in zip(records, tasks):
+        record["task ID"] = task_id
+        record["TServer"], record["TClient"] = types.index(server), types.index(client)
+        record["Operation"] = operations.index(operation)
+        record["arg1"], record["arg2"] = arg1, arg2
+    write_bin(path, b"TASKS", records)
+
+
+def write_results_bin(path, results):
+    write_bin(path, b"RESULTS", np.array(results, dtype=benchmark.RESULT_RECORD_DTYPE))
+
+
+def write_bin(path, magic, records):
+    header = np.array([(magic, benchmark.BINARY_VERSION, records.dtype.itemsize)], dtype=benchmark.HEADER_DTYPE)
+    path.write_bytes(header.tobytes() + records.tobytes())
+
+
+def task_frame(tasks):
+    df = pd.DataFrame(tasks, columns=["task ID", "TServer", "TClient", "Operation", "arg1", "arg2"])
+    return df.astype(benchmark.TASK_DTYPES)
+
+
+def result_frame(results):
+    return pd.DataFrame(results, columns=["task ID", "result"]).astype(benchmark.RESULT_DTYPES)
+
+
+@pytest.fixture
+def verifier(tmp_path):
+    verifier = benchmark.StreamingVerifier(str(tmp_path / "index.bin"), capacity=4)
+    yield verifier
+    verifier.close()
+
+
+def test_follower_keeps_a_truncated_line_for_later(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_bytes(b"task ID,result\n0,2.0\n1,8.")
+    follower = benchmark.CsvFollower(str(path), benchmark.RESULT_DTYPES)
+
+    assert follower.read()["result"].tolist() == [2.0]
+    assert follower.read() is None
+    with open(path, "ab") as file:
+        file.write(b"5\n2,0.25")
+    assert follower.read()["result"].tolist() == [8.5]
+    # Once the writer has finished, a last line without newline is complete
+    assert follower.read(final=True)["result"].tolist() == [0.25]
+    follower.close()
+
+
+def test_follower_reads_crlf_lines_in_small_chunks(tmp_path):
+    path = tmp_path / "tasks.csv"
+    write_tasks_csv(path, TASKS, newline="\r\n")
+    follower = benchmark.CsvFollower(str(path), benchmark.TASK_DTYPES, chunk_bytes=16)
+
+    # A chunk without a complete line gives None, so read until the file is exhausted
+    chunks = [chunk for chunk in (follower.read(final=True) for _ in range(50)) if chunk is not None]
+    follower.close()
+    df = pd.concat(chunks, ignore_index=True)
+
+    assert df.columns.tolist() == ["task ID", "TServer", "TClient", "Operation", "arg1", "arg2"]
+    assert df["task ID"].tolist() == [0, 1, 2, 3, 4]
+    assert df["Operation"].tolist() == ["sqrt", "pow", "sin", "pow", "sqrt"]
+    assert df["arg2"].tolist()[1] == 3.0 and math.isnan(df["arg2"].tolist()[0])
+
+
+def test_follower_waits_for_the_file(tmp_path):
+    follower = benchmark.CsvFollower(str(tmp_path / "missing.csv"), benchmark.RESULT_DTYPES)
+
+    assert follower.read() is None
+
+
+def test_results_before_tasks_wait_for_them(verifier):
+    verifier.add_results(result_frame(RESULTS))
+    assert (verifier.verified, verifier.pending) == (0, 5)
+
+    verifier.add_tasks(task_frame(TASKS[:3]))
+    assert (verifier.verified, verifier.pending) == (3, 2)
+    verifier.add_tasks(task_frame(TASKS[3:]))
+
+    assert (verifier.verified, verifier.mismatched, verifier.pending) == (5, 0, 0)
+
+
+def test_index_grows_for_large_ids(verifier):
+    tasks = [(task_id + 1000, *rest) for task_id, *rest in TASKS]
+    verifier.add_tasks(task_frame(tasks))
+    verifier.add_results(result_frame([(task_id + 1000, result) for task_id, result in RESULTS]))
+
+    assert (verifier.verified, verifier.mismatched) == (5, 0)
+
+
+def test_mismatches_are_counted(verifier):
+    verifier.add_tasks(task_frame(TASKS))
+    verifier.add_results(result_frame([(0, 2.0), (1, 9.0)]))
+
+    mismatches = verifier.report()
+
+    assert (verifier.verified, verifier.mismatched) == (2, 1)
+    assert mismatches.index.tolist() == [1]
+    assert mismatches["expected"].tolist() == [8.0]
+
+
+def test_report_without_results_fails(verifier):
+    verifier.add_tasks(task_frame(TASKS))
+
+    with pytest.raises(ValueError):
+        verifier.report()
+
+
+def test_orphan_results_are_counted_apart_from_missing_ones(tmp_path, capsys):
+    tasks = [(task_id, "double", "double", "sin", 0.0, math.nan) for task_id in range(10)]
+    results = [(task_id, 0.0) for task_id in range(5)] + [(task_id, 0.0) for task_id in (100, 101, 102)]
+    write_tasks_csv(tmp_path / "tasks.csv", tasks)
+    write_results_csv(tmp_path / "results.csv", results)
+
+    benchmark.verify_streaming(str(tmp_path / "tasks.csv"), str(tmp_path / "results.csv"),
+                               str(tmp_path / "index.bin"))
+
+    output = capsys.readouterr().out
+    assert "All 5 results match" in output
+    assert "3 results have no task information" in output
+    assert "5 tasks have no result" in output
+    assert not os.path.exists(tmp_path / "index.bin")
+
+
+def test_streaming_reports_missing_files(tmp_path):
+    write_tasks_csv(tmp_path / "tasks.csv", TASKS)
+
+    with pytest.raises(FileNotFoundError):
+        benchmark.verify_streaming(str(tmp_path / "tasks.csv"), str(tmp_path / "results.csv"),
+                                   str(tmp_path / "index.bin"))
+
+
+def test_open_records_ignores_a_partial_record(tmp_path):
+    path = tmp_path / "results.bin"
+    write_results_bin(path, RESULTS)
+    with open(path, "ab") as file:
+        file.write(b"\x01\x02\x03")
+
+    records = benchmark.open_records(str(path), b"RESULTS", benchmark.RESULT_RECORD_DTYPE)
+
+    assert records["task ID"].tolist() == [0, 1, 2, 3, 4]
+    assert records["result"].tolist() == [2.0, 8.0, 0.0, 2.0, 3.0]
+
+
+def test_open_records_rejects_another_format(tmp_path):
+    path = tmp_path / "results.bin"
+    write_results_bin(path, RESULTS)
+
+    with pytest.raises(ValueError):
+        benchmark.open_records(str(path), b"TASKS", benchmark.TASK_RECORD_DTYPE)
+
+
+def test_binary_and_csv_give_the_same_report(tmp_path, capsys):
+    results = RESULTS[:4] + [(4, 4.0), (7, 1.0)]
+    write_tasks_csv(tmp_path / "tasks.csv", TASKS)
+    write_results_csv(tmp_path / "results.csv", results)
+    write_tasks_bin(tmp_path / "tasks.bin", TASKS)
+    write_results_bin(tmp_path / "results.bin", results)
+
+    from_csv = benchmark.verify_streaming(str(tmp_path / "tasks.csv"), str(tmp_path / "results.csv"),
+                                          str(tmp_path / "index.bin"))
+    csv_output = capsys.readouterr().out
+    from_bin = benchmark.verify_binary(str(tmp_path / "tasks.bin"), str(tmp_path / "results.bin"))
+    bin_output = capsys.readouterr().out
+
+    assert from_csv.index.tolist() == from_bin.index.tolist() == [4]
+    assert bin_output == csv_output
+    assert "1 of 5 results mismatch" in csv_output
+    assert "1 results have no task information" in csv_output
+
+
+def test_binary_handles_sparse_unsorted_ids(tmp_path, capsys):
+    # An array indexed by ID would need 2**60 entries here
+    ids = [2 ** 60, 7, 2 ** 40, 3, 11]
+    tasks = [(task_id, *rest) for task_id, (_, *rest) in zip(ids, TASKS)]
+    results = [(task_id, result) for task_id, (_, result) in zip(ids, RESULTS)][::-1] + [(2 ** 50, 1.0)]
+    write_tasks_bin(tmp_path / "tasks.bin", tasks)
+    write_results_bin(tmp_path / "results.bin", results)
+
+    mismatches = benchmark.verify_binary(str(tmp_path / "tasks.bin"), str(tmp_path / "results.bin"),
+                                         chunk_records=2)
+
+    output = capsys.readouterr().out
+    assert mismatches.empty
+    assert "All 5 results match" in output
+    assert "1 results have no task information" in output
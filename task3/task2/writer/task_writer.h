@@ -0,0 +1,85 @@
+#ifndef TASK_WRITER_H
+#define TASK_WRITER_H
+
+#include <array>
+#include <cmath>
+#include <cstdint>
+#include <cstring>
+#include <fstream>
+#include <mutex>
+#include <string>
+
+// Sink for task descriptions and results, shared by all client threads
+class TaskWriter {
+public:
+    virtual ~TaskWriter() = default;
+    virtual void WriteTask(size_t task_id, const std::string &server_type, const std::string &client_type,
+                           const std::string &operation, double arg1, double arg2 = NAN) = 0;
+    virtual void WriteResult(size_t task_id, double result) = 0;
+};
+
+// information_tasks.csv and tasks_results.csv
+class CsvTaskWriter : public TaskWriter {
+public:
+    CsvTaskWriter(const std::string &tasks_path, const std::string &results_path);
+    void WriteTask(size_t task_id, const std::string &server_type, const std::string &client_type,
+                   const std::string &operation, double arg1, double arg2 = NAN) override;
+    void WriteResult(size_t task_id, double result) override;
+
+private:
+    std::mutex mtx_;
+    std::ofstream tasks_;
+    std::ofstream results_;
+};
+
+// Names in the order of their codes; benchmark.py uses the same order (type_map, operation_map)
+inline const std::array<const char *, 12> kTypeNames = {
+        "double", "int", "float", "char", "long", "long long", "short",
+        "unsigned long", "unsigned int", "unsigned short", "unsigned long long", "bool"};
+inline const std::array<const char *, 3> kOperationNames = {"sqrt", "pow", "sin"};
+
+// File header: magic, format version and record size
+struct BinaryHeader {
+    char magic[8];
+    uint32_t version;
+    uint32_t record_size;
+};
+
+struct TaskRecord {
+    uint64_t task_id;
+    int8_t server_type;
+    int8_t client_type;
+    int8_t operation;
+    uint8_t pad[5];
+    double arg1;
+    double arg2;  // NaN for one-argument operations
+};
+
+struct ResultRecord {
+    uint64_t task_id;
+    double result;
+};
+
+static_assert(sizeof(BinaryHeader) == 16);
+static_assert(sizeof(TaskRecord) == 32);
+static_assert(sizeof(ResultRecord) == 16);
+
+// information_tasks.bin and tasks_results.bin: header followed by fixed-width little-endian records
+class BinaryTaskWriter : public TaskWriter {
+public:
+    static constexpr uint32_t kVersion = 1;
+
+    BinaryTaskWriter(const std::string &tasks_path, const std::string &results_path);
+    void WriteTask(size_t task_id, const std::string &server_type, const std::string &client_type,
+                   const std::string &operation, double arg1, double arg2 = NAN) override;
+    void WriteResult(size_t task_id, double result) override;
+
+private:
+    std::mutex mtx_;
+    std::ofstream tasks_;
+    std::ofstream results_;
+};
+
+#include "task_writer.tpp"
+
+#endif // TASK_WRITER_H
@@ -0,0 +1,63 @@
+#ifndef TASK_WRITER_TPP
+#define TASK_WRITER_TPP
+
+#include "task_writer.h"
+
+template<size_t N>
+int8_t NameCode(const std::array<const char *, N> &names, const std::string &name) {
+    for (size_t i = 0; i < N; ++i) {
+        if (name == names[i]) return static_cast<int8_t>(i);
+    }
+    return -1;
+}
+
+inline CsvTaskWriter::CsvTaskWriter(const std::string &tasks_path, const std::string &results_path)
+        : tasks_(tasks_path), results_(results_path) {
+    tasks_ << "task ID" << "," << "TServer" << "," << "TClient" << "," << "Operation" << "," << "arg1" << "," << "arg2" << '\n';
+    results_ << "task ID" << "," << "result" << '\n';
+}
+
+inline void CsvTaskWriter::WriteTask(size_t task_id, const std::string &server_type, const std::string &client_type,
+                                     const std::string &operation, double arg1, double arg2) {
+    std::string line = std::to_string(task_id) + "," + server_type + "," + client_type + "," + operation + "," +
+                       std::to_string(arg1);
+    if (!std::isnan(arg2)) {
+        line += "," + std::to_string(arg2);
+    }
+    std::lock_guard<std::mutex> lock(mtx_);
+    tasks_ << line << '\n';
+}
+
+inline void CsvTaskWriter::WriteResult(size_t task_id, double result) {
+    std::lock_guard<std::mutex> lock(mtx_);
+    results_ << task_id << "," << result << '\n';
+}
+
+inline BinaryTaskWriter::BinaryTaskWriter(const std::string &tasks_path, const std::string &results_path)
+        : tasks_(tasks_path, std::ios::binary), results_(results_path, std::ios::binary) {
+    BinaryHeader tasks_header{"TASKS", kVersion, sizeof(TaskRecord)};
+    BinaryHeader results_header{"RESULTS", kVersion, sizeof(ResultRecord)};
+    tasks_.write(reinterpret_cast<const char *>(&tasks_header), sizeof(tasks_header));
+    results_.write(reinterpret_cast<const char *>(&results_header), sizeof(results_header));
+}
+
+inline void BinaryTaskWriter::WriteTask(size_t task_id, const std::string &server_type, const std::string &client_type,
+                                        const std::string &operation, double arg1, double arg2) {
+    TaskRecord record{};
+    record.task_id = task_id;
+    record.server_type = NameCode(kTypeNames, server_type);
+    record.client_type = NameCode(kTypeNames, client_type);
+    record.operation = NameCode(kOperationNames, operation);
+    record.arg1 = arg1;
+    record.arg2 = arg2;
+    std::lock_guard<std::mutex> lock(mtx_);
+    tasks_.write(reinterpret_cast<const char *>(&record), sizeof(record));
+}
+
+inline void BinaryTaskWriter::WriteResult(size_t task_id, double result) {
+    ResultRecord record{task_id, result};
+    std::lock_guard<std::mutex> lock(mtx_);
+    results_.write(reinterpret_cast<const char *>(&record), sizeof(record));
+}
+
+#endif // TASK_WRITER_TPP
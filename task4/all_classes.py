@@ -1,35 +1,92 @@
 import logging
+import multiprocessing
 import os
 import queue
 import threading
 import time
 from abc import ABC
+from collections import deque, namedtuple
 from logging.handlers import RotatingFileHandler
-from typing import Tuple
+from typing import Optional, Tuple
 
 import cv2
+import numpy as np
 
-if not os.path.exists('log'):
-    os.makedirs('log')
-try:
-    os.remove(os.path.join('log', 'app.log'))
-except FileNotFoundError:
-    pass
+# Каталог логов задается LOG_DIR, тесты направляют его во временный каталог
+LOG_DIR = os.environ.get('LOG_DIR', 'log')
+os.makedirs(LOG_DIR, exist_ok=True)
+# Дочерние процессы сенсоров (spawn) импортируют модуль повторно и не должны стирать лог
+if multiprocessing.current_process().name == 'MainProcess':
+    try:
+        os.remove(os.path.join(LOG_DIR, 'app.log'))
+    except FileNotFoundError:
+        pass
 
 logging.basicConfig(
     level=logging.INFO,
     handlers=[
-        RotatingFileHandler('log/app.log', maxBytes=1024 * 1024, backupCount=5)
+        RotatingFileHandler(os.path.join(LOG_DIR, 'app.log'), maxBytes=1024 * 1024, backupCount=5)
     ]
 )
 logger = logging.getLogger(__name__)
 
 
+Sample = namedtuple('Sample', ['value', 'seq', 'timestamp', 'skipped'])
+
+
+class LatestSlot:
+    """
+    Ячейка «последнего значения»: один писатель, перезапись при записи.
+
+    Писатель публикует кортеж (seq, timestamp, value) одним присваиванием
+    ссылки, поэтому читатель всегда видит целостный отсчет без блокировок.
+    Читатель получает только самый свежий отсчет и число пропущенных.
+    """
+
+    def __init__(self):
+        self._cell = None
+        self._seq = 0
+        self._read_seq = 0
+
+    def put(self, value, timestamp: Optional[float] = None):
+        self._seq += 1
+        self._cell = (self._seq, time.monotonic() if timestamp is None else timestamp, value)
+
+    def get(self) -> Optional[Sample]:
+        cell = self._cell
+        if cell is None or cell[0] == self._read_seq:
+            return None
+        seq, timestamp, value = cell
+        skipped = seq - self._read_seq - 1
+        self._read_seq = seq
+        return Sample(value, seq, timestamp, skipped)
+
+
 class Sensor(ABC):
-    def __init__(self, sensor_name):
-        self.name = sensor_name
-        self._queue = queue.Queue(maxsize=100)
+    """
+    Базовый сенсор. mode='latest' хранит только последний отсчет (LatestSlot),
+    mode='queue' сохраняет прежнюю очередь на queue_size отсчетов.
+    """
+
+    def __init__(self, sensor_name, mode: str = 'latest', queue_size: int = 100):
+        # До проверки режима: __del__ вызывает stop() и для недостроенного объекта
         self._stop_thread_event = threading.Event()
+        self.thread = None
+        if mode not in ('latest', 'queue'):
+            raise ValueError(f"Неизвестный режим сенсора: {mode}")
+        self.name = sensor_name
+        self.mode = mode
+        self._seq = 0
+        self._slot = LatestSlot() if mode == 'latest' else None
+        self._queue = queue.Queue(maxsize=queue_size) if mode == 'queue' else None
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """
+        callback(name, seq, timestamp, value) вызывается в потоке сенсора для
+        каждого опубликованного отсчета, включая перезаписанные в слоте.
+        """
+        self._listeners.append(callback)
 
     def start(self):
         self.thread = threading.Thread(target=self._run)
@@ -37,32 +94,217 @@ class Sensor(ABC):
 
     def stop(self):
         self._stop_thread_event.set()
-        self.thread.join()
+        if self.thread is not None:
+            self.thread.join()
 
     def _run(self):
         raise NotImplementedError
 
+    def _publish(self, value, timeout: Optional[float] = None, timestamp: Optional[float] = None) -> bool:
+        """
+        Публикация отсчета. В режиме очереди без timeout ждет свободного места,
+        пока сенсор не остановлен; с timeout отбрасывает отсчет при переполнении.
+        timestamp - момент измерения по time.monotonic(), по умолчанию текущий.
+        """
+        self._seq += 1
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        for listener in self._listeners:
+            listener(self.name, self._seq, timestamp, value)
+
+        if self._slot is not None:
+            self._slot.put(value, timestamp)
+            return True
+
+        sample = Sample(value, self._seq, timestamp, 0)
+        while not self._stop_thread_event.is_set():
+            try:
+                self._queue.put(sample, timeout=0.1 if timeout is None else timeout)
+                return True
+            except queue.Full:
+                if timeout is not None:
+                    return False
+        return False
+
     def __del__(self):
         self.stop()
 
-    def get(self):
+    def get(self) -> Optional[Sample]:
+        if self._slot is not None:
+            return self._slot.get()
         try:
             return self._queue.get_nowait()
         except queue.Empty:
             return None
 
-class SensorCam(Sensor):
-    def __init__(self, camera_name: str, resolution: Tuple[int, int]):
-        super().__init__('sensor_cam')
+
+class FrameBuffer:
+    """
+    Кадр из FramePool. Потребитель, получивший буфер, обязан вызвать release();
+    при обнулении счетчика ссылок буфер возвращается в пул.
+    """
+
+    def __init__(self, pool: 'FramePool', array: np.ndarray):
+        self.array = array
+        self._pool = pool
+        self._refs = 0
+
+    def retain(self) -> 'FrameBuffer':
+        with self._pool.lock:
+            self._refs += 1
+        return self
+
+    def release(self):
+        with self._pool.lock:
+            if self._refs <= 0:
+                # Повторный release() вернул бы буфер в пул дважды, и в него писали бы два производителя
+                raise RuntimeError("FrameBuffer.release() без ссылки: буфер уже возвращен в пул")
+            self._refs -= 1
+            if self._refs == 0:
+                self._pool._free.append(self)
+
+
+class FramePool:
+    """Кольцо заранее выделенных кадров, переиспользуемых через cap.read(image=buf)."""
+
+    def __init__(self, shape: Tuple[int, ...], size: int = 4, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.lock = threading.Lock()
+        self._free = deque(FrameBuffer(self, np.empty(shape, dtype)) for _ in range(size))
+
+    def acquire(self) -> Optional[FrameBuffer]:
+        with self.lock:
+            if not self._free:
+                return None
+            buf = self._free.popleft()
+            buf._refs = 1
+            return buf
+
+
+class FrameSensor(Sensor):
+    """
+    Сенсор кадров: кадры лежат в FramePool, слот или очередь хранят FrameBuffer.
+    """
+
+    def __init__(self, sensor_name, mode: str = 'latest', pool_size: int = 4):
+        super().__init__(sensor_name, mode)
+        self.critical_error = threading.Event()
+        self._pool_size = pool_size
+        self._pool = None
+        self._frame_lock = threading.Lock()
+        self._published = None  # Буфер, на который ссылается слот
+
+    def _publish_frame(self, buf: FrameBuffer, timestamp: Optional[float] = None):
+        if self._slot is None:
+            # В очереди ссылка буфера передается потребителю
+            if not self._publish(buf, timeout=0.1, timestamp=timestamp):
+                buf.release()
+            return
+
+        # Ссылка буфера принадлежит слоту до следующей перезаписи
+        with self._frame_lock:
+            self._publish(buf, timestamp=timestamp)
+            prev, self._published = self._published, buf
+        if prev is not None:
+            prev.release()
+
+    def get(self) -> Optional[Sample]:
+        """Возвращает Sample с FrameBuffer; после использования вызовите sample.value.release()."""
+        if self._slot is None:
+            return super().get()
+        with self._frame_lock:
+            sample = super().get()
+            if sample is not None:
+                sample.value.retain()
+        return sample
+
+    def stop(self):
+        super().stop()
+        with self._frame_lock:
+            prev, self._published = self._published, None
+        if prev is not None:
+            prev.release()
+
+
+class SyntheticCapture:
+    """
+    Заменитель cv2.VideoCapture без устройства: отдает кадры заданного
+    разрешения с частотой fps. timestamp - момент захвата последнего кадра
+    по time.monotonic(). decode_ms имитирует декодирование в retrieve().
+    """
+
+    def __init__(self, resolution: Tuple[int, int], fps: float = 30, decode_ms: float = 0.0):
+        self.resolution = resolution
+        self.fps = fps
+        self.decode_ms = decode_ms
+        self.timestamp = None
+        self._frame_no = 0
+        self._next_frame = None
+        self._opened = True
+        width, height = resolution
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self._base = np.repeat(np.broadcast_to(gradient, (height, width))[:, :, None], 3, axis=2)
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def set(self, prop, value) -> bool:
+        return False
+
+    def get(self, prop) -> float:
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.resolution[0]
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.resolution[1]
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0
+
+    def grab(self) -> bool:
+        # Кадры идут по расписанию, как у настоящей камеры
+        now = time.monotonic()
+        if self._next_frame is None:
+            self._next_frame = now
+        if self._next_frame > now:
+            time.sleep(self._next_frame - now)
+        self._next_frame = max(self._next_frame + 1.0 / self.fps, now)
+        self.timestamp = time.monotonic()
+        self._frame_no += 1
+        return self._opened
+
+    def retrieve(self, image: Optional[np.ndarray] = None):
+        if self.decode_ms:
+            # Как и cv2, «декодирование» отпускает GIL
+            time.sleep(self.decode_ms / 1000)
+        if image is None or image.shape != self._base.shape:
+            image = np.empty_like(self._base)
+        np.copyto(image, self._base)
+        x = (self._frame_no * 8) % self.resolution[0]
+        image[:, x:x + 8] = 255
+        return True, image
+
+    def read(self, image: Optional[np.ndarray] = None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self):
+        self._opened = False
+
+
+class SensorCam(FrameSensor):
+    def __init__(self, camera_name: str, resolution: Tuple[int, int], mode: str = 'latest',
+                 pool_size: int = 4, capture=None):
+        super().__init__('sensor_cam', mode, pool_size)
         self.camera_name = camera_name
         self.resolution = resolution
-        self.critical_error = threading.Event()
-        self.thread = None  # Явная инициализация
 
         try:
-            # Для Windows используем CAP_DSHOW
-            self.cap = cv2.VideoCapture(int(camera_name) if camera_name.isdigit() else camera_name, 
-                                      cv2.CAP_DSHOW)
+            if capture is not None:
+                self.cap = capture
+            else:
+                # Для Windows используем CAP_DSHOW
+                api = cv2.CAP_DSHOW if os.name == 'nt' else cv2.CAP_ANY
+                self.cap = cv2.VideoCapture(int(camera_name) if camera_name.isdigit() else camera_name, api)
             
             if not self.cap.isOpened():
                 raise IOError("Не удалось открыть камеру")
@@ -70,7 +312,12 @@ class SensorCam(Sensor):
             # Установка разрешения
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
-            
+
+            # Камера может выбрать другое разрешение, пул строим по фактическому
+            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.resolution[0]
+            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.resolution[1]
+            self._pool = FramePool((height, width, 3), pool_size)
+
             logger.info(f"Камера {camera_name} настроена на {resolution}")
 
         except Exception as e:
@@ -84,9 +331,17 @@ class SensorCam(Sensor):
         max_errors = 10
         
         while not self._stop_thread_event.is_set():
-            ret, frame = self.cap.read()
-            
-            if not ret:
+            buf = self._pool.acquire()
+            if buf is None:
+                # Все буферы заняты потребителями - кадр пропускаем
+                self.cap.grab()
+                time.sleep(0.001)
+                continue
+
+            ret, frame = self.cap.read(image=buf.array)
+
+            if not ret or frame is None:
+                buf.release()
                 error_count += 1
                 logger.warning(f"Ошибка чтения кадра ({error_count}/{max_errors})")
                 if error_count >= max_errors:
@@ -94,16 +349,25 @@ class SensorCam(Sensor):
                     break
                 time.sleep(0.1)
                 continue
-                
-            if frame is not None:
-                try:
-                    self._queue.put(frame, timeout=0.1)
-                    error_count = 0  # Сброс счетчика ошибок при успехе
-                except queue.Full:
-                    pass
-                except Exception as e:
-                    logger.error(f"Ошибка помещения кадра в очередь: {str(e)}")
-            
+
+            if frame is not buf.array:
+                # OpenCV не смог писать в буфер (другой размер кадра) - перестраиваем пул
+                buf.release()
+                if frame.shape != self._pool.shape:
+                    logger.warning(f"Размер кадра {frame.shape} не совпадает с пулом {self._pool.shape}")
+                    self._pool = FramePool(frame.shape, self._pool_size, frame.dtype)
+                buf = self._pool.acquire()
+                if buf is None:
+                    continue
+                np.copyto(buf.array, frame)
+
+            try:
+                # Источники с собственной меткой времени захвата (SyntheticCapture)
+                self._publish_frame(buf, getattr(self.cap, 'timestamp', None))
+                error_count = 0  # Сброс счетчика ошибок при успехе
+            except Exception as e:
+                logger.error(f"Ошибка публикации кадра: {str(e)}")
+
             time.sleep(0.001)  # Небольшая пауза
 
     def __del__(self):
@@ -111,18 +375,26 @@ class SensorCam(Sensor):
             self.cap.release()
 
 
+class SyntheticCam(SensorCam):
+    """Камера без устройства на SyntheticCapture - для тестов и бенчмарков."""
+
+    def __init__(self, resolution: Tuple[int, int], fps: float = 30, mode: str = 'latest',
+                 pool_size: int = 4, decode_ms: float = 0.0):
+        super().__init__('synthetic', resolution, mode, pool_size, SyntheticCapture(resolution, fps, decode_ms))
+
+
 def SensorXAdapter(name: str):
     def class_decorator(cls):
         class Adapter(Sensor):
-            def __init__(self, delay):
-                super().__init__(f"{name}{str(delay)}")
+            def __init__(self, delay, mode: str = 'latest'):
+                super().__init__(f"{name}{str(delay)}", mode)
                 self._sensor_x = cls(delay)
 
             def _run(self):
                 while not self._stop_thread_event.is_set():
                     value = self._sensor_x.get()
                     try:
-                        self._queue.put(value)
+                        self._publish(value)
                     except Exception as e:
                         logger.error("Error while putting value: %s", e)
         return Adapter
@@ -140,37 +412,116 @@ class SensorX:
         return self._data
 
 
+class OverlayPanel:
+    """
+    Панель с показаниями сенсоров, закэшированная в маленьком изображении.
+    Текст перерисовывается только при изменении значений. Панель накладывается
+    на копию кадра в собственном буфере: кадр из пула камеры в это время могут
+    читать запись и другие потребители, поэтому сам он не изменяется.
+    """
+
+    def __init__(self, x: int = 10, y: int = 30, line_height: int = 30,
+                 font=cv2.FONT_HERSHEY_SIMPLEX, scale: float = 0.7,
+                 color=(0, 255, 0), thickness: int = 2):
+        self.x = x
+        self.y = y
+        self.line_height = line_height
+        self.font = font
+        self.scale = scale
+        self.color = color
+        self.thickness = thickness
+        self._values = None
+        self._image = None
+        self._mask = None
+        self._output = None
+
+    def _render(self, sensor_values):
+        lines = [f"{name}: {value}" for name, value in sensor_values.items()]
+        if not lines:
+            self._image = self._mask = None
+            return
+
+        sizes = [cv2.getTextSize(text, self.font, self.scale, self.thickness) for text in lines]
+        width = self.x + max(w for (w, _), _ in sizes) + self.thickness
+        height = self.y + self.line_height * (len(lines) - 1) + max(b for _, b in sizes) + self.thickness
+
+        image = np.zeros((height, width, 3), np.uint8)
+        y = self.y
+        for text in lines:
+            cv2.putText(image, text, (self.x, y), self.font, self.scale, self.color, self.thickness)
+            y += self.line_height
+        self._image = image
+        self._mask = image.any(axis=2)[:, :, None]
+
+    def apply(self, frame: np.ndarray, sensor_values) -> np.ndarray:
+        """
+        Возвращает кадр с панелью. Результат лежит в буфере панели и действителен
+        до следующего вызова; без показаний возвращается сам frame.
+        """
+        if sensor_values != self._values:
+            self._render(sensor_values)
+            self._values = dict(sensor_values)
+
+        if self._image is None:
+            return frame
+
+        if self._output is None or self._output.shape != frame.shape or self._output.dtype != frame.dtype:
+            self._output = np.empty_like(frame)
+        np.copyto(self._output, frame)
+        height = min(self._image.shape[0], frame.shape[0])
+        width = min(self._image.shape[1], frame.shape[1])
+        np.copyto(self._output[:height, :width], self._image[:height, :width], where=self._mask[:height, :width])
+        return self._output
+
+
 class WindowImage:
     def __init__(self, display_freq):
         self.display_freq = display_freq
         self.window_name = "Sensor Display"
         self._last_update = 0
+        self._overlay = OverlayPanel()
         cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
 
     def show(self, camera_frame, sensor_values):
         current_time = time.time()
 
         if current_time - self._last_update < 1.0 / self.display_freq:
-            return
+            return False
 
         self._last_update = current_time
 
         if camera_frame is not None:
-            display_frame = camera_frame.copy()
-            y = 30
-            for name, value in sensor_values.items():
-                text = f"{name}: {value}"
-                cv2.putText(display_frame, text, (10, y),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                y += 30
-            cv2.imshow(self.window_name, display_frame)
+            cv2.imshow(self.window_name, self._overlay.apply(camera_frame, sensor_values))
             cv2.waitKey(1)
         if camera_frame is None:
             print("Нет кадра для отображения!")
-            return
+            return False
+        return True
 
     def __del__(self):
         try:
             cv2.destroyWindow(self.window_name)
         except cv2.error:
-            pass
\ No newline at end of file
+            pass
+
+
+class HeadlessSink:
+    """
+    Замена WindowImage без GUI: тот же show() с частотой display_freq и
+    наложением панели, но без вывода на экран. shown - число показанных кадров.
+    """
+
+    def __init__(self, display_freq):
+        self.display_freq = display_freq
+        self.shown = 0
+        self._last_update = 0
+        self._overlay = OverlayPanel()
+
+    def show(self, camera_frame, sensor_values) -> bool:
+        current_time = time.time()
+        if camera_frame is None or current_time - self._last_update < 1.0 / self.display_freq:
+            return False
+        self._last_update = current_time
+        self._overlay.apply(camera_frame, sensor_values)
+        self.shown += 1
+        return True
@@ -0,0 +1,177 @@
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import AsyncIterator, Optional
+
+from all_classes import Sample, Sensor, logger
+
+
+class SensorRuntime:
+    """
+    Несколько event loop'ов (шардов), каждый в своем потоке. Асинхронные
+    сенсоры распределяются по шардам по кругу, так что тысячи сенсоров
+    обслуживаются несколькими потоками вместо потока на сенсор.
+    """
+
+    def __init__(self, shards: int = 1):
+        if shards < 1:
+            raise ValueError("Нужен хотя бы один шард")
+        self._loops = []
+        self._threads = []
+        for i in range(shards):
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._serve, args=(loop,), name=f"sensor-loop-{i}", daemon=True)
+            thread.start()
+            self._loops.append(loop)
+            self._threads.append(thread)
+        self._next_shard = itertools.cycle(range(shards))
+        self._lock = threading.Lock()
+        logger.info(f"Запущено event loop'ов для сенсоров: {shards}")
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    @property
+    def shards(self) -> int:
+        return len(self._loops)
+
+    def next_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            return self._loops[next(self._next_shard)]
+
+    def submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.next_loop())
+
+    @staticmethod
+    async def _cancel_all():
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self):
+        for loop in self._loops:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), loop).result(timeout=5)
+            loop.call_soon_threadsafe(loop.stop)
+        for thread in self._threads:
+            thread.join()
+        for loop in self._loops:
+            loop.close()
+
+
+_default_runtime = None
+_default_runtime_lock = threading.Lock()
+
+
+def get_default_runtime() -> SensorRuntime:
+    global _default_runtime
+    with _default_runtime_lock:
+        if _default_runtime is None:
+            _default_runtime = SensorRuntime()
+        return _default_runtime
+
+
+class AsyncSensor(Sensor):
+    """
+    Сенсор-корутина с тем же API start/stop/get, что и у потокового Sensor.
+    Публикация идет из потока event loop'а, поэтому в режиме очереди отсчет
+    при переполнении отбрасывается, а не блокирует loop.
+    """
+
+    def __init__(self, sensor_name, mode: str = 'latest', queue_size: int = 100,
+                 runtime: Optional[SensorRuntime] = None):
+        super().__init__(sensor_name, mode, queue_size)
+        self._runtime = runtime
+        self._loop = None
+        self._task = None
+        self._future = None
+        self.thread = None
+
+    def start(self):
+        runtime = self._runtime or get_default_runtime()
+        self._loop = runtime.next_loop()
+        self._future = asyncio.run_coroutine_threadsafe(self._main(), self._loop)
+        self._future.add_done_callback(self._on_done)
+
+    def stop(self):
+        """
+        Отменяет корутину сенсора и ждет ее завершения, иначе loop при
+        закрытии предупреждает об уничтоженной незавершенной задаче.
+        """
+        self._stop_thread_event.set()
+        if self._future is None or self._future.done():
+            return
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            # Из потока самого loop'а ждать нельзя: задача будет отменена на следующей итерации
+            self._future.cancel()
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel(), self._loop).result(timeout=5)
+
+    async def _main(self):
+        self._task = asyncio.current_task()
+        await self._arun()
+
+    async def _cancel(self):
+        # Задача _main создана раньше: loop выполняет колбэки по порядку
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def _on_done(self, future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Сенсор {self.name} завершился с ошибкой: {future.exception()}")
+
+    async def _arun(self):
+        raise NotImplementedError
+
+    def _publish(self, value, timeout: Optional[float] = 0) -> bool:
+        return super()._publish(value, timeout)
+
+
+def AsyncSensorXAdapter(name: str):
+    def class_decorator(cls):
+        class Adapter(AsyncSensor):
+            def __init__(self, delay, mode: str = 'latest', runtime: Optional[SensorRuntime] = None):
+                super().__init__(f"{name}{str(delay)}", mode, runtime=runtime)
+                self._sensor_x = cls(delay)
+
+            async def _arun(self):
+                while not self._stop_thread_event.is_set():
+                    value = await self._sensor_x.get()
+                    try:
+                        self._publish(value)
+                    except Exception as e:
+                        logger.error("Error while putting value: %s", e)
+        return Adapter
+    return class_decorator
+
+
+@AsyncSensorXAdapter(name="SensorX")
+class AsyncSensorX:
+    def __init__(self, delay):
+        self._delay = delay
+        self._data = 0
+
+    async def get(self) -> int:
+        await asyncio.sleep(self._delay)
+        self._data = self._data + 1
+        return self._data
+
+
+async def watch(sensor: Sensor, interval: float = 0.01) -> AsyncIterator[Sample]:
+    """
+    Мост от любого сенсора (в том числе потокового SensorCam) к корутинам:
+    опрашивает sensor.get() и отдает новые отсчеты, не блокируя event loop.
+    """
+    while True:
+        sample = sensor.get()
+        if sample is not None:
+            yield sample
+        else:
+            await asyncio.sleep(interval)
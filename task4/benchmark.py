@@ -0,0 +1,342 @@
+import asyncio
+import csv
+import os
+import threading
+import time
+from typing import Dict, List
+
+import click
+import numpy as np
+import psutil
+
+from all_classes import HeadlessSink, SensorX, SensorXAdapter, SyntheticCam, logger
+from async_sensors import AsyncSensorX, AsyncSensorXAdapter, SensorRuntime
+from camera_group import SyntheticCameraGroup
+
+
+class ProbeX:
+    """SensorX, запоминающий моменты выдачи отсчетов для оценки джиттера."""
+
+    def __init__(self, delay):
+        self._delay = delay
+        self._data = 0
+        self.stamps = []
+
+    def get(self) -> int:
+        time.sleep(self._delay)
+        self.stamps.append(time.monotonic())
+        self._data = self._data + 1
+        return self._data
+
+
+class AsyncProbeX(ProbeX):
+    async def get(self) -> int:
+        await asyncio.sleep(self._delay)
+        self.stamps.append(time.monotonic())
+        self._data = self._data + 1
+        return self._data
+
+
+ThreadProbe = SensorXAdapter(name="Probe")(ProbeX)
+AsyncProbe = AsyncSensorXAdapter(name="Probe")(AsyncProbeX)
+
+
+def jitter_stats(stamps: List[List[float]], delay: float) -> Dict[str, float]:
+    """Отклонение интервалов между отсчетами от заданного периода, мс."""
+    intervals = [np.diff(s) for s in stamps if len(s) > 1]
+    if not intervals:
+        return {"jitter_mean_ms": float("nan"), "jitter_p99_ms": float("nan")}
+    deviation = np.abs(np.concatenate(intervals) - delay) * 1000
+    return {
+        "jitter_mean_ms": float(deviation.mean()),
+        "jitter_p99_ms": float(np.percentile(deviation, 99)),
+    }
+
+
+def run_scaling(backend: str, count: int, delay: float, duration: float,
+                shards: int, poll_freq: float) -> Dict[str, float]:
+    proc = psutil.Process(os.getpid())
+    rss_start = proc.memory_info().rss
+    cpu_start = proc.cpu_times()
+
+    runtime = SensorRuntime(shards) if backend == "async" else None
+    if backend == "async":
+        sensors = [AsyncProbe(delay, runtime=runtime) for _ in range(count)]
+    else:
+        sensors = [ThreadProbe(delay) for _ in range(count)]
+
+    started = []
+    try:
+        wall_start = time.monotonic()
+        for sensor in sensors:
+            sensor.start()
+            started.append(sensor)
+
+        # Потребитель опрашивает сенсоры с частотой дисплея, как main.py
+        received = 0
+        while time.monotonic() - wall_start < duration:
+            for sensor in sensors:
+                if sensor.get() is not None:
+                    received += 1
+            time.sleep(1.0 / poll_freq)
+
+        rss_peak = proc.memory_info().rss
+        threads = threading.active_count()
+        cpu_end = proc.cpu_times()
+        wall_end = time.monotonic()
+        wall = wall_end - wall_start
+    finally:
+        for sensor in started:
+            sensor.stop()
+        if runtime is not None:
+            runtime.shutdown()
+
+    # Отсчеты, выданные во время остановки, в замер не входят
+    stamps = [[t for t in sensor._sensor_x.stamps if t <= wall_end] for sensor in sensors]
+    produced = sum(len(s) for s in stamps)
+    cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+
+    result = {
+        "Backend": backend,
+        "Sensors": count,
+        "Threads": threads,
+        "CPU_percent": 100 * cpu / wall,
+        "RSS_MB": (rss_peak - rss_start) / 1024 ** 2,
+        "Rate_ratio": produced / (count * wall / delay),
+        "Received": received,
+    }
+    result.update(jitter_stats(stamps, delay))
+    return result
+
+
+def run_latency(count: int, display_freq: float, resolution, camera_fps: float, delay: float,
+                duration: float, backend: str, shards: int) -> Dict[str, float]:
+    """Конвейер main.py без GUI: возраст отсчетов на момент показа и потери кадров."""
+    proc = psutil.Process(os.getpid())
+    runtime = SensorRuntime(shards) if backend == "async" else None
+    camera = SyntheticCam(resolution, camera_fps)
+    if backend == "async":
+        sensors = [AsyncSensorX(delay, runtime=runtime) for _ in range(count)]
+    else:
+        sensors = [SensorX(delay) for _ in range(count)]
+    sink = HeadlessSink(display_freq)
+
+    frame_ages, sensor_ages = [], []
+    current_frame, frame_fresh = None, False
+    latest = {}
+    started = []
+    try:
+        cpu_start = proc.cpu_times()
+        wall_start = time.monotonic()
+        for sensor in [camera, *sensors]:
+            sensor.start()
+            started.append(sensor)
+
+        while time.monotonic() - wall_start < duration:
+            sample = camera.get()
+            if sample is not None:
+                if current_frame is not None:
+                    current_frame.value.release()
+                current_frame, frame_fresh = sample, True
+            for sensor in sensors:
+                sample = sensor.get()
+                if sample is not None:
+                    latest[sensor.name] = sample
+
+            if current_frame is not None and sink.show(
+                    current_frame.value.array, {name: s.value for name, s in latest.items()}):
+                now = time.monotonic()
+                # Повторно показанный кадр не считается доставленным
+                if frame_fresh:
+                    frame_ages.append(now - current_frame.timestamp)
+                    frame_fresh = False
+                sensor_ages.extend(now - s.timestamp for s in latest.values())
+            time.sleep(0.001)
+
+        cpu_end = proc.cpu_times()
+        wall = time.monotonic() - wall_start
+        produced = camera._seq
+    finally:
+        if current_frame is not None:
+            current_frame.value.release()
+        for sensor in started:
+            sensor.stop()
+        if runtime is not None:
+            runtime.shutdown()
+
+    cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+    frame_ages_ms = np.array(frame_ages) * 1000
+    sensor_ages_ms = np.array(sensor_ages) * 1000
+    percentile = lambda a, q: float(np.percentile(a, q)) if len(a) else float("nan")
+    return {
+        "Backend": backend,
+        "Sensors": count,
+        "Display_Hz": display_freq,
+        "Frames_produced": produced,
+        "Frames_delivered": len(frame_ages),
+        "Frames_dropped": produced - len(frame_ages),
+        "Frame_age_p50_ms": percentile(frame_ages_ms, 50),
+        "Frame_age_p99_ms": percentile(frame_ages_ms, 99),
+        "Sensor_age_p50_ms": percentile(sensor_ages_ms, 50),
+        "Sensor_age_p99_ms": percentile(sensor_ages_ms, 99),
+        "CPU_percent": 100 * cpu / wall,
+        "CPU_per_sensor_percent": 100 * cpu / wall / max(count, 1),
+    }
+
+
+def run_sync(capture: str, count: int, resolution, camera_fps: float, decode_ms: float,
+             duration: float) -> Dict[str, float]:
+    """
+    Разброс моментов захвата в наборах кадров с count камер: поток на камеру
+    (набор собирается из свежих кадров всех камер) против CameraGroup.
+    """
+    if capture == "group":
+        cameras = [SyntheticCameraGroup(count, resolution, camera_fps, decode_ms=decode_ms)]
+    else:
+        cameras = [SyntheticCam(resolution, camera_fps, decode_ms=decode_ms) for _ in range(count)]
+
+    skews = []
+    latest = [None] * len(cameras)
+    started = []
+    try:
+        wall_start = time.monotonic()
+        for camera in cameras:
+            camera.start()
+            started.append(camera)
+
+        while time.monotonic() - wall_start < duration:
+            for index, camera in enumerate(cameras):
+                sample = camera.get()
+                if sample is not None:
+                    if latest[index] is not None:
+                        latest[index].value.release()
+                    latest[index] = sample
+            if all(sample is not None for sample in latest):
+                if capture == "group":
+                    skews.append(latest[0].value.skew)
+                else:
+                    stamps = [sample.timestamp for sample in latest]
+                    skews.append(max(stamps) - min(stamps))
+                for sample in latest:
+                    sample.value.release()
+                latest = [None] * len(cameras)
+            time.sleep(0.001)
+        wall = time.monotonic() - wall_start
+    finally:
+        for sample in latest:
+            if sample is not None:
+                sample.value.release()
+        for camera in started:
+            camera.stop()
+
+    skews_ms = np.array(skews) * 1000
+    percentile = lambda a, q: float(np.percentile(a, q)) if len(a) else float("nan")
+    return {
+        "Capture": capture,
+        "Cameras": count,
+        "Decode_ms": decode_ms,
+        "Sets_per_s": len(skews) / wall,
+        "Skew_p50_ms": percentile(skews_ms, 50),
+        "Skew_p99_ms": percentile(skews_ms, 99),
+        "Skew_max_ms": float(skews_ms.max()) if len(skews_ms) else float("nan"),
+    }
+
+
+def write_csv(results: List[Dict[str, float]], csv_path: str):
+    if results:
+        with open(csv_path, mode="w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+@click.option("--counts", default="10,100,1000,3000", help="Числа сенсоров через запятую")
+@click.option("--backends", default="thread,async", help="Бэкенды через запятую: thread, async")
+@click.option("--delay", default=0.01, type=float, help="Период сенсора, с")
+@click.option("--duration", default=5.0, type=float, help="Длительность замера, с")
+@click.option("--shards", default=1, type=int, help="Число event loop'ов для async")
+@click.option("--poll_freq", default=30.0, type=float, help="Частота опроса потребителем, Гц")
+@click.option("--csv", "csv_path", default="scaling_results.csv", help="Файл с результатами")
+def scaling(counts, backends, delay, duration, shards, poll_freq, csv_path):
+    """Число сенсоров против CPU, памяти и джиттера отсчетов."""
+    results = []
+    for backend in backends.split(","):
+        for count in [int(c) for c in counts.split(",")]:
+            logger.info(f"Замер {backend} x {count}")
+            try:
+                result = run_scaling(backend, count, delay, duration, shards, poll_freq)
+            except RuntimeError as e:
+                # Потоковый бэкенд упирается в лимит потоков раньше async
+                print(f"{backend} x {count}: {e}")
+                continue
+            results.append(result)
+            print(f"{backend:>6} x {count:>5}: CPU {result['CPU_percent']:6.1f}%  "
+                  f"RSS +{result['RSS_MB']:7.1f} MB  threads {result['Threads']:>5}  "
+                  f"rate {result['Rate_ratio']:.2f}  "
+                  f"jitter mean {result['jitter_mean_ms']:.2f} ms p99 {result['jitter_p99_ms']:.2f} ms")
+
+    write_csv(results, csv_path)
+
+
+@cli.command()
+@click.option("--counts", default="3,30,300", help="Числа сенсоров через запятую")
+@click.option("--display_freqs", default="10,30,60", help="Частоты показа через запятую, Гц")
+@click.option("--resolution", default=(640, 480), type=(int, int), help="Разрешение синтетической камеры")
+@click.option("--camera_fps", default=30.0, type=float, help="Частота кадров синтетической камеры")
+@click.option("--delay", default=0.01, type=float, help="Период сенсора, с")
+@click.option("--duration", default=5.0, type=float, help="Длительность замера, с")
+@click.option("--backend", default="thread", type=click.Choice(["thread", "async"]))
+@click.option("--shards", default=1, type=int, help="Число event loop'ов для async")
+@click.option("--csv", "csv_path", default="latency_results.csv", help="Файл с результатами")
+def latency(counts, display_freqs, resolution, camera_fps, delay, duration, backend, shards, csv_path):
+    """Сквозная задержка task4 без камеры и GUI: синтетическая камера и HeadlessSink."""
+    results = []
+    for count in [int(c) for c in counts.split(",")]:
+        for display_freq in [float(f) for f in display_freqs.split(",")]:
+            logger.info(f"Замер latency: {count} сенсоров, показ {display_freq} Гц")
+            result = run_latency(count, display_freq, resolution, camera_fps, delay, duration, backend, shards)
+            results.append(result)
+            print(f"{count:>5} sensors @ {display_freq:5.1f} Hz: "
+                  f"frame age p50 {result['Frame_age_p50_ms']:6.1f} p99 {result['Frame_age_p99_ms']:6.1f} ms  "
+                  f"sensor age p50 {result['Sensor_age_p50_ms']:6.1f} p99 {result['Sensor_age_p99_ms']:6.1f} ms  "
+                  f"frames {result['Frames_delivered']}/{result['Frames_produced']} "
+                  f"(dropped {result['Frames_dropped']})  "
+                  f"CPU {result['CPU_percent']:5.1f}% ({result['CPU_per_sensor_percent']:.2f}%/sensor)")
+    write_csv(results, csv_path)
+
+
+@cli.command()
+@click.option("--counts", default="2,4,8", help="Числа камер через запятую")
+@click.option("--captures", default="threads,group", help="Способы захвата через запятую: threads, group")
+@click.option("--resolution", default=(640, 480), type=(int, int), help="Разрешение синтетических камер")
+@click.option("--camera_fps", default=30.0, type=float, help="Частота кадров синтетических камер")
+@click.option("--decode_ms", default=5.0, type=float, help="Имитация времени декодирования кадра, мс")
+@click.option("--duration", default=5.0, type=float, help="Длительность замера, с")
+@click.option("--csv", "csv_path", default="sync_results.csv", help="Файл с результатами")
+def sync(counts, captures, resolution, camera_fps, decode_ms, duration, csv_path):
+    """Синхронность наборов кадров с нескольких камер: поток на камеру против CameraGroup."""
+    results = []
+    for capture in captures.split(","):
+        for count in [int(c) for c in counts.split(",")]:
+            logger.info(f"Замер sync: {capture} x {count}")
+            result = run_sync(capture, count, resolution, camera_fps, decode_ms, duration)
+            results.append(result)
+            print(f"{capture:>7} x {count:>2} cameras: {result['Sets_per_s']:5.1f} sets/s  "
+                  f"skew p50 {result['Skew_p50_ms']:6.2f} p99 {result['Skew_p99_ms']:6.2f} "
+                  f"max {result['Skew_max_ms']:6.2f} ms")
+    write_csv(results, csv_path)
+
+
+if __name__ == '__main__':
+    cli()
+
+# Пример запуска:
+# python benchmark.py scaling --counts 10,100,1000 --backends thread,async --shards 2
+# python benchmark.py latency --counts 3,30,300 --display_freqs 10,30,60
+# python benchmark.py sync --counts 2,4,8 --decode_ms 5
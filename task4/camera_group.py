@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from all_classes import FrameBuffer, FramePool, FrameSensor, SyntheticCapture, logger
+
+
+class FrameSet:
+    """
+    Согласованный набор кадров группы камер, по одному FrameBuffer на камеру.
+    retain()/release() действуют на все буферы, поэтому набор хранится в слоте
+    или очереди FrameSensor так же, как одиночный кадр.
+    """
+
+    def __init__(self, buffers: List[FrameBuffer], timestamps: List[float]):
+        self.buffers = buffers
+        self.timestamps = timestamps
+
+    @property
+    def arrays(self) -> List[np.ndarray]:
+        return [buf.array for buf in self.buffers]
+
+    @property
+    def skew(self) -> float:
+        """Разброс моментов захвата кадров набора, с"""
+        return max(self.timestamps) - min(self.timestamps)
+
+    @property
+    def offsets(self) -> List[float]:
+        """Отставание захвата каждой камеры от самой ранней, с"""
+        first = min(self.timestamps)
+        return [t - first for t in self.timestamps]
+
+    def retain(self) -> 'FrameSet':
+        for buf in self.buffers:
+            buf.retain()
+        return self
+
+    def release(self):
+        for buf in self.buffers:
+            buf.release()
+
+
+def tile(frame_set: FrameSet, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Кадры набора слева направо в одном изображении; out переиспользуется, если подходит по размеру."""
+    arrays = frame_set.arrays
+    shape = (max(a.shape[0] for a in arrays), sum(a.shape[1] for a in arrays), 3)
+    if out is None or out.shape != shape:
+        out = np.zeros(shape, np.uint8)
+    x = 0
+    for array in arrays:
+        out[:array.shape[0], x:x + array.shape[1]] = array
+        x += array.shape[1]
+    return out
+
+
+class CameraGroup(FrameSensor):
+    """
+    Синхронный захват с нескольких камер. Сначала grab() на всех устройствах
+    подряд - кадры фиксируются почти одновременно, затем retrieve() (декодирование)
+    параллельно в пуле потоков прямо в буферы FramePool каждой камеры.
+    Публикует FrameSet; метка времени набора - самый ранний захват.
+    """
+
+    def __init__(self, camera_names: Sequence[str], resolution: Tuple[int, int], mode: str = 'latest',
+                 pool_size: int = 4, captures: Optional[Sequence] = None, decode_workers: Optional[int] = None,
+                 stats_window: int = 1000):
+        super().__init__('camera_group', mode, pool_size)
+        self.camera_names = list(camera_names)
+        self.resolution = resolution
+        self.caps = []
+        self._pools: List[FramePool] = []
+
+        try:
+            for index, camera_name in enumerate(self.camera_names):
+                if captures is not None:
+                    cap = captures[index]
+                else:
+                    api = cv2.CAP_DSHOW if os.name == 'nt' else cv2.CAP_ANY
+                    cap = cv2.VideoCapture(int(camera_name) if camera_name.isdigit() else camera_name, api)
+                self.caps.append(cap)
+                if not cap.isOpened():
+                    raise IOError(f"Не удалось открыть камеру {camera_name}")
+
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or resolution[0]
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or resolution[1]
+                self._pools.append(FramePool((height, width, 3), pool_size))
+
+            logger.info(f"Группа камер {self.camera_names} настроена на {resolution}")
+        except Exception as e:
+            logger.error(f"Ошибка инициализации группы камер: {str(e)}")
+            for cap in self.caps:
+                cap.release()
+            raise
+
+        self._executor = ThreadPoolExecutor(max_workers=decode_workers or len(self.caps),
+                                            thread_name_prefix='camera_group_decode')
+        self._stats_lock = threading.Lock()
+        self._skews = deque(maxlen=stats_window)
+        self._offsets = deque(maxlen=stats_window)
+        self._grab_times = deque(maxlen=stats_window)
+        self._retrieve_times = deque(maxlen=stats_window)
+        self.sets = 0
+        self.dropped = 0
+
+    def _acquire_all(self) -> Optional[List[FrameBuffer]]:
+        buffers = []
+        for pool in self._pools:
+            buf = pool.acquire()
+            if buf is None:
+                for acquired in buffers:
+                    acquired.release()
+                return None
+            buffers.append(buf)
+        return buffers
+
+    def _retrieve(self, index: int, buf: FrameBuffer) -> Optional[FrameBuffer]:
+        ret, frame = self.caps[index].retrieve(buf.array)
+        if not ret or frame is None:
+            buf.release()
+            return None
+        if frame is buf.array:
+            return buf
+
+        # OpenCV не смог писать в буфер (другой размер кадра) - перестраиваем пул камеры
+        buf.release()
+        pool = self._pools[index]
+        if frame.shape != pool.shape:
+            logger.warning(f"Размер кадра камеры {self.camera_names[index]} {frame.shape} "
+                           f"не совпадает с пулом {pool.shape}")
+            pool = self._pools[index] = FramePool(frame.shape, self._pool_size, frame.dtype)
+        buf = pool.acquire()
+        if buf is not None:
+            np.copyto(buf.array, frame)
+        return buf
+
+    def _run(self):
+        error_count = 0
+        max_errors = 10
+
+        while not self._stop_thread_event.is_set():
+            buffers = self._acquire_all()
+            if buffers is None:
+                # Буферы какой-то камеры заняты потребителями - набор пропускаем целиком
+                for cap in self.caps:
+                    cap.grab()
+                self.dropped += 1
+                time.sleep(0.001)
+                continue
+
+            # Захват подряд на всех камерах, без декодирования между ними
+            grab_start = time.monotonic()
+            grabbed, timestamps = [], []
+            for cap in self.caps:
+                grabbed.append(cap.grab())
+                timestamps.append(getattr(cap, 'timestamp', None) or time.monotonic())
+            grab_end = time.monotonic()
+
+            if not all(grabbed):
+                for buf in buffers:
+                    buf.release()
+                error_count += 1
+                failed = [name for name, ok in zip(self.camera_names, grabbed) if not ok]
+                logger.warning(f"Ошибка захвата кадра камер {failed} ({error_count}/{max_errors})")
+                if error_count >= max_errors:
+                    self.critical_error.set()
+                    break
+                time.sleep(0.1)
+                continue
+
+            futures = [self._executor.submit(self._retrieve, index, buf) for index, buf in enumerate(buffers)]
+            retrieved = [future.result() for future in futures]
+            retrieve_end = time.monotonic()
+
+            if any(buf is None for buf in retrieved):
+                for buf in retrieved:
+                    if buf is not None:
+                        buf.release()
+                error_count += 1
+                logger.warning(f"Ошибка декодирования кадра ({error_count}/{max_errors})")
+                if error_count >= max_errors:
+                    self.critical_error.set()
+                    break
+                continue
+
+            frame_set = FrameSet(retrieved, timestamps)
+            with self._stats_lock:
+                self._skews.append(frame_set.skew)
+                self._offsets.append(frame_set.offsets)
+                self._grab_times.append(grab_end - grab_start)
+                self._retrieve_times.append(retrieve_end - grab_end)
+                self.sets += 1
+
+            try:
+                self._publish_frame(frame_set, min(timestamps))
+                error_count = 0
+            except Exception as e:
+                logger.error(f"Ошибка публикации набора кадров: {str(e)}")
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Метрики последних наборов: разброс захвата (skew), среднее отставание
+        каждой камеры, время серии grab() и параллельного retrieve(), мс.
+        """
+        with self._stats_lock:
+            skews = np.array(self._skews) * 1000
+            offsets = np.array(self._offsets) * 1000
+            grab_times = np.array(self._grab_times) * 1000
+            retrieve_times = np.array(self._retrieve_times) * 1000
+        if not len(skews):
+            return {"sets": self.sets, "dropped": self.dropped}
+        return {
+            "sets": self.sets,
+            "dropped": self.dropped,
+            "skew_p50_ms": float(np.percentile(skews, 50)),
+            "skew_p99_ms": float(np.percentile(skews, 99)),
+            "skew_max_ms": float(skews.max()),
+            "camera_offset_ms": dict(zip(self.camera_names, offsets.mean(axis=0).tolist())),
+            "grab_ms": float(grab_times.mean()),
+            "retrieve_ms": float(retrieve_times.mean()),
+        }
+
+    def stop(self):
+        super().stop()
+        self._executor.shutdown(wait=True)
+
+    def __del__(self):
+        for cap in getattr(self, 'caps', []):
+            if cap.isOpened():
+                cap.release()
+
+
+class SyntheticCameraGroup(CameraGroup):
+    """Группа из count синтетических камер - для тестов и бенчмарков."""
+
+    def __init__(self, count: int, resolution: Tuple[int, int], fps: float = 30, mode: str = 'latest',
+                 pool_size: int = 4, decode_ms: float = 0.0, decode_workers: Optional[int] = None):
+        captures = [SyntheticCapture(resolution, fps, decode_ms) for _ in range(count)]
+        super().__init__([f'synthetic{i}' for i in range(count)], resolution, mode, pool_size, captures,
+                         decode_workers)
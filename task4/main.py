@@ -3,79 +3,154 @@ import cv2
 import time
 import logging
 from all_classes import *
+from async_sensors import AsyncSensorX, SensorRuntime
+from camera_group import CameraGroup, FrameSet, SyntheticCameraGroup, tile
+from shm_sensors import ProcessSensorX
+from recording import ReplayCam, ReplaySensor, SensorRecorder, recorded_sensor_names
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @click.command()
-@click.option("--camera_name", "-c", default="0", type=str, help="Для Windows используйте 0")
+@click.option("--camera_name", "-c", default="0", type=str,
+              help="Для Windows используйте 0; несколько камер через запятую - синхронный захват группой")
 @click.option("--resolution", "-r", default=(640, 480), type=(int, int), help="Разрешение камеры")
 @click.option("--fps", "-f", default=30, type=int, help="Частота обновления кадров")
-def main(camera_name, resolution, fps):
+@click.option("--sensor_mode", "-m", default="latest", type=click.Choice(["latest", "queue"]),
+              help="latest - только свежий отсчет, queue - очередь отсчетов")
+@click.option("--backend", "-b", default="thread", type=click.Choice(["thread", "async", "process"]),
+              help="thread - поток на сенсор, async - сенсоры-корутины на event loop'ах, "
+                   "process - процесс на сенсор с обменом через shared memory")
+@click.option("--sensor_work", default=0, type=int,
+              help="CPU-нагрузка фильтра в каждом сенсоре --backend process (итераций на отсчет)")
+@click.option("--shards", "-s", default=1, type=int, help="Число event loop'ов для --backend async")
+@click.option("--record", default=None, type=click.Path(file_okay=False),
+              help="Каталог для записи всех отсчетов и кадров")
+@click.option("--replay", default=None, type=click.Path(exists=True, file_okay=False),
+              help="Каталог записи для воспроизведения вместо камеры и сенсоров")
+@click.option("--replay_speed", default=1.0, type=float, help="Скорость воспроизведения, 0 - без пауз")
+@click.option("--replay_loop", is_flag=True, help="Воспроизводить запись по кругу")
+@click.option("--synthetic", is_flag=True, help="Синтетическая камера вместо устройства")
+@click.option("--camera_fps", default=30.0, type=float, help="Частота кадров синтетической камеры")
+@click.option("--headless", is_flag=True, help="Без окна: кадры обрабатываются, но не показываются")
+@click.option("--duration", default=0.0, type=float, help="Время работы, с (0 - до выхода по 'q' или Ctrl+C)")
+def main(camera_name, resolution, fps, sensor_mode, backend, sensor_work, shards, record, replay, replay_speed, replay_loop,
+         synthetic, camera_fps, headless, duration):
     camera = None
     sensors = []
+    current_frame = None
+    runtime = None
+    recorder = None
+    display_buffer = None
+    camera_names = camera_name.split(",")
+    if len(camera_names) > 1 and (record is not None or replay is not None):
+        raise click.UsageError("Запись и воспроизведение поддерживают только одну камеру")
+    if backend == "process" and sensor_mode != "latest" and replay is None:
+        raise click.UsageError("--backend process поддерживает только --sensor_mode latest")
     
     try:
-        camera = SensorCam(camera_name, resolution)
-        logger.info(f"Камера {camera_name} инициализирована")
-        
-        sensors = [
-            SensorX(0.01),
-            SensorX(0.1),
-            SensorX(1.0)
-        ]
-        
+        if replay is not None:
+            camera = ReplayCam(replay, replay_speed, sensor_mode, replay_loop)
+            sensors = [ReplaySensor(replay, name, replay_speed, sensor_mode, replay_loop)
+                       for name in recorded_sensor_names(replay)]
+            logger.info(f"Воспроизведение записи {replay} со скоростью {replay_speed}")
+        else:
+            if len(camera_names) > 1:
+                if synthetic:
+                    camera = SyntheticCameraGroup(len(camera_names), resolution, camera_fps, sensor_mode)
+                else:
+                    camera = CameraGroup(camera_names, resolution, sensor_mode)
+                logger.info(f"Группа камер {camera.camera_names} инициализирована")
+            elif synthetic:
+                camera = SyntheticCam(resolution, camera_fps, sensor_mode)
+                logger.info(f"Камера {camera.camera_name} инициализирована")
+            else:
+                camera = SensorCam(camera_name, resolution, sensor_mode)
+                logger.info(f"Камера {camera.camera_name} инициализирована")
+
+            delays = [0.01, 0.1, 1.0]
+            if backend == "async":
+                runtime = SensorRuntime(shards)
+                sensors = [AsyncSensorX(delay, sensor_mode, runtime) for delay in delays]
+            elif backend == "process":
+                sensors = [ProcessSensorX(delay, sensor_work) for delay in delays]
+            else:
+                sensors = [SensorX(delay, sensor_mode) for delay in delays]
+
+        if record is not None:
+            recorder = SensorRecorder(record)
+            recorder.attach(camera)
+            for sensor in sensors:
+                recorder.attach(sensor)
+
         # Запуск потоков
         camera.start()
         for sensor in sensors:
             sensor.start()
             logger.info(f"Сенсор {sensor.name} запущен")
 
-        window = WindowImage(fps)
+        window = HeadlessSink(fps) if headless else WindowImage(fps)
         last_values = {}
-        last_frames = []
-        max_frames = 2
+        started_at = time.monotonic()
 
-        while True:
+        while not duration or time.monotonic() - started_at < duration:
             # Проверка ошибок камеры
             if camera.critical_error.is_set():
                 logger.error("Ошибка камеры!")
                 break
 
-            # Получение кадра
-            frame = camera.get()
-            if frame is not None:
-                last_frames.append(frame)
-                if len(last_frames) > max_frames:
-                    last_frames.pop(0)
-            
-            current_frame = last_frames[-1] if last_frames else None
+            # Получение кадра: буфер берется из пула камеры без копирования,
+            # предыдущий возвращается в пул
+            sample = camera.get()
+            if sample is not None:
+                if sample.skipped:
+                    logger.debug(f"Пропущено кадров: {sample.skipped}")
+                if current_frame is not None:
+                    current_frame.release()
+                current_frame = sample.value
 
             # Получение данных сенсоров
             sensor_values = {}
             for sensor in sensors:
-                value = sensor.get()
-                sensor_values[sensor.name] = last_values.get(sensor.name, 0) if value is None else value
+                sample = sensor.get()
+                sensor_values[sensor.name] = last_values.get(sensor.name, 0) if sample is None else sample.value
                 last_values[sensor.name] = sensor_values[sensor.name]
 
             # Отображение
-            if current_frame is not None:
-                window.show(current_frame, sensor_values)
+            if isinstance(current_frame, FrameSet):
+                # Кадры группы показываются рядом в одном окне
+                display_buffer = tile(current_frame, display_buffer)
+                window.show(display_buffer, sensor_values)
+            elif current_frame is not None:
+                window.show(current_frame.array, sensor_values)
             else:
                 logger.warning("Нет кадров для отображения")
 
             # Выход по 'q'
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            if headless:
+                time.sleep(0.001)
+            elif cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
+    except KeyboardInterrupt:
+        logger.info("Остановка по Ctrl+C")
     except Exception as e:
         logger.critical(f"Фатальная ошибка: {str(e)}", exc_info=True)
     finally:
+        if current_frame is not None:
+            current_frame.release()
         if camera is not None:
             camera.stop()
+            if isinstance(camera, CameraGroup):
+                logger.info(f"Синхронность группы камер: {camera.stats()}")
         for sensor in sensors:
             sensor.stop()
-        cv2.destroyAllWindows()
+        if runtime is not None:
+            runtime.shutdown()
+        if recorder is not None:
+            recorder.close()
+        if not headless:
+            cv2.destroyAllWindows()
         logger.info("Программа завершена")
 
 if __name__ == '__main__':
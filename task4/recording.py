@@ -0,0 +1,271 @@
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from all_classes import FramePool, FrameBuffer, FrameSensor, Sensor, logger
+
+SAMPLE_DTYPE = np.dtype([
+    ('sensor_id', '<u4'),
+    ('seq', '<u8'),
+    ('timestamp', '<f8'),
+    ('value', '<f8'),
+])
+FRAME_INDEX_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('timestamp', '<f8'),
+])
+
+
+class SampleLog:
+    """
+    Кольцевой журнал отсчетов в memory-mapped структурированном массиве NumPy
+    (samples.npy) и описании meta.json с именами сенсоров. Пустые записи имеют
+    timestamp = NaN, поэтому журнал читается по времени и после аварийного
+    завершения, даже если meta.json не успел обновиться.
+    """
+
+    def __init__(self, directory: str, capacity: int = 1_000_000, mode: str = 'w'):
+        self.directory = directory
+        self._data_path = os.path.join(directory, 'samples.npy')
+        self._meta_path = os.path.join(directory, 'meta.json')
+        self._lock = threading.Lock()
+
+        if mode == 'w':
+            os.makedirs(directory, exist_ok=True)
+            self._data = np.lib.format.open_memmap(self._data_path, mode='w+',
+                                                   dtype=SAMPLE_DTYPE, shape=(capacity,))
+            self._data['timestamp'] = np.nan
+            self.names = []
+            self.count = 0
+            self._write_meta()
+        else:
+            self._data = np.load(self._data_path, mmap_mode='r')
+            with open(self._meta_path) as file:
+                meta = json.load(file)
+            self.names = meta['names']
+            self.count = meta['count']
+        self._ids = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def open(cls, directory: str) -> 'SampleLog':
+        return cls(directory, mode='r')
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def _write_meta(self):
+        with open(self._meta_path, 'w') as file:
+            json.dump({'names': self.names, 'count': self.count, 'capacity': self.capacity}, file)
+
+    def append(self, name: str, seq: int, timestamp: float, value):
+        with self._lock:
+            sensor_id = self._ids.get(name)
+            if sensor_id is None:
+                sensor_id = self._ids[name] = len(self.names)
+                self.names.append(name)
+                self._write_meta()
+            self._data[self.count % self.capacity] = (sensor_id, seq, timestamp, value)
+            self.count += 1
+
+    def flush(self):
+        with self._lock:
+            self._data.flush()
+            self._write_meta()
+
+    def records(self, name: Optional[str] = None) -> np.ndarray:
+        """Записи журнала (или одного сенсора) в порядке времени."""
+        records = self._data[~np.isnan(self._data['timestamp'])]
+        if name is not None:
+            records = records[records['sensor_id'] == self._ids[name]]
+        return records[np.argsort(records['timestamp'], kind='stable')]
+
+
+class FrameStore:
+    """
+    Кадры камеры чанками по chunk_frames в frames_NNNNN.npy с индексом
+    (seq, timestamp) в frames_NNNNN_index.npy. Запись чанка на диск идет в
+    отдельном потоке, пока поток камеры заполняет второй буфер. append()
+    вызывается в потоке камеры и никогда не ждет: если все буферы у писателя,
+    кадр отбрасывается и учитывается в dropped.
+    """
+
+    def __init__(self, directory: str, chunk_frames: int = 64, buffers: int = 2):
+        self.directory = directory
+        self.chunk_frames = chunk_frames
+        self.dropped = 0
+        os.makedirs(directory, exist_ok=True)
+        self._buffers = buffers
+        self._allocated = False
+        self._free = queue.Queue()
+        self._pending = queue.Queue()
+        self._chunk = None
+        self._index = None
+        self._filled = 0
+        self._chunk_no = 0
+        self._writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self._writer.start()
+
+    def _allocate(self, shape: Tuple[int, ...], dtype):
+        self._allocated = True
+        for _ in range(self._buffers):
+            self._free.put((np.empty((self.chunk_frames, *shape), dtype),
+                            np.empty(self.chunk_frames, FRAME_INDEX_DTYPE)))
+
+    def append(self, name: str, seq: int, timestamp: float, frame):
+        if isinstance(frame, FrameBuffer):
+            frame = frame.array
+        if self._chunk is None:
+            if not self._allocated:
+                self._allocate(frame.shape, frame.dtype)
+            try:
+                self._chunk, self._index = self._free.get_nowait()
+            except queue.Empty:
+                # Диск не успевает за камерой
+                self.dropped += 1
+                return
+
+        self._chunk[self._filled] = frame
+        self._index[self._filled] = (seq, timestamp)
+        self._filled += 1
+        if self._filled == self.chunk_frames:
+            self._submit()
+
+    def _submit(self):
+        self._pending.put((self._chunk_no, self._chunk, self._index, self._filled))
+        self._chunk_no += 1
+        self._chunk = self._index = None
+        self._filled = 0
+
+    def _write_chunks(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            chunk_no, chunk, index, filled = item
+            base = os.path.join(self.directory, f'frames_{chunk_no:05d}')
+            np.save(base + '.npy', chunk[:filled])
+            np.save(base + '_index.npy', index[:filled])
+            self._free.put((chunk, index))
+
+    def close(self):
+        if self._chunk is not None and self._filled:
+            self._submit()
+        self._pending.put(None)
+        self._writer.join()
+        if self.dropped:
+            logger.warning(f"Не записано кадров: {self.dropped}")
+
+    @staticmethod
+    def read(directory: str) -> Iterator[Tuple[int, float, np.ndarray]]:
+        """Кадры (seq, timestamp, frame) по порядку, чанки открываются через mmap."""
+        for path in sorted(glob.glob(os.path.join(directory, 'frames_[0-9][0-9][0-9][0-9][0-9].npy'))):
+            frames = np.load(path, mmap_mode='r')
+            index = np.load(path[:-len('.npy')] + '_index.npy')
+            for (seq, timestamp), frame in zip(index, frames):
+                yield int(seq), float(timestamp), frame
+
+
+class SensorRecorder:
+    """Записывает каждый отсчет подключенных сенсоров: значения в SampleLog, кадры в FrameStore."""
+
+    def __init__(self, directory: str, capacity: int = 1_000_000, chunk_frames: int = 64):
+        self.directory = directory
+        self.samples = SampleLog(directory, capacity)
+        self._chunk_frames = chunk_frames
+        self.frames = None
+
+    def attach(self, sensor: Sensor):
+        if isinstance(sensor, FrameSensor):
+            if self.frames is None:
+                self.frames = FrameStore(os.path.join(self.directory, 'frames'), self._chunk_frames)
+            sensor.add_listener(self.frames.append)
+        else:
+            sensor.add_listener(self.samples.append)
+
+    def close(self):
+        if self.frames is not None:
+            self.frames.close()
+        self.samples.flush()
+        logger.info(f"Записано отсчетов: {self.samples.count} в {self.directory}")
+
+
+def _wait_until(stop_event: threading.Event, deadline: float) -> bool:
+    """Ждет момента deadline; True, если за это время сенсор остановили."""
+    delay = deadline - time.monotonic()
+    return delay > 0 and stop_event.wait(delay)
+
+
+class ReplaySensor(Sensor):
+    """
+    Воспроизводит записанные отсчеты сенсора через обычный интерфейс Sensor.
+    speed > 1 ускоряет воспроизведение, speed = 0 - без пауз.
+    """
+
+    def __init__(self, directory: str, sensor_name: str, speed: float = 1.0,
+                 mode: str = 'latest', loop: bool = False):
+        super().__init__(sensor_name, mode)
+        records = SampleLog.open(directory).records(sensor_name)
+        self._timestamps = records['timestamp']
+        self._values = records['value']
+        self.speed = speed
+        self.loop = loop
+
+    def _run(self):
+        if not len(self._timestamps):
+            logger.warning(f"Нет записанных отсчетов для {self.name}")
+            return
+        while not self._stop_thread_event.is_set():
+            start = time.monotonic()
+            t0 = self._timestamps[0]
+            for timestamp, value in zip(self._timestamps, self._values):
+                if self.speed > 0 and _wait_until(self._stop_thread_event, start + (timestamp - t0) / self.speed):
+                    return
+                value = float(value)
+                self._publish(int(value) if value.is_integer() else value)
+            if not self.loop:
+                return
+
+
+class ReplayCam(FrameSensor):
+    """Воспроизводит записанные кадры камеры, публикуя их через FramePool."""
+
+    def __init__(self, directory: str, speed: float = 1.0, mode: str = 'latest',
+                 loop: bool = False, pool_size: int = 4, name: str = 'sensor_cam'):
+        super().__init__(name, mode, pool_size)
+        self.directory = os.path.join(directory, 'frames')
+        self.speed = speed
+        self.loop = loop
+        first = next(FrameStore.read(self.directory), None)
+        if first is None:
+            raise IOError(f"В {self.directory} нет записанных кадров")
+        self._pool = FramePool(first[2].shape, pool_size, first[2].dtype)
+
+    def _run(self):
+        while not self._stop_thread_event.is_set():
+            start = None
+            for _, timestamp, frame in FrameStore.read(self.directory):
+                if start is None:
+                    start, t0 = time.monotonic(), timestamp
+                if self.speed > 0 and _wait_until(self._stop_thread_event, start + (timestamp - t0) / self.speed):
+                    return
+                buf = self._pool.acquire()
+                if buf is None:
+                    # Потребитель держит все буферы - кадр пропускаем
+                    continue
+                np.copyto(buf.array, frame)
+                self._publish_frame(buf)
+                if self._stop_thread_event.is_set():
+                    return
+            if not self.loop:
+                return
+
+
+def recorded_sensor_names(directory: str) -> List[str]:
+    return SampleLog.open(directory).names
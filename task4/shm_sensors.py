@@ -0,0 +1,207 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+from all_classes import FrameBuffer, FramePool, Sample, Sensor, logger
+
+# Заголовок слота: seq (uint64) и timestamp (float64), данные - с 64-го байта
+_HEADER_SIZE = 64
+
+
+class SharedSlot:
+    """
+    Слот «последнего значения» в multiprocessing.shared_memory.
+
+    Писатель (один процесс) под межпроцессной блокировкой пишет данные и
+    метку времени и увеличивает seq, читатель копирует их под той же
+    блокировкой. Захват и освобождение блокировки служат барьерами памяти,
+    поэтому слот корректен и на архитектурах со слабым порядком (ARM64), а не
+    только на x86. Без блокировки читается лишь seq: если он не изменился,
+    read_into() сразу возвращает None, не дожидаясь писателя. Блокировку
+    создает сторона, вызывающая SharedSlot без name, и передает ее в
+    дочерний процесс вместе с именем слота.
+    """
+
+    def __init__(self, shape: Tuple[int, ...] = (), dtype='f8', name: Optional[str] = None, lock=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        payload_size = max(int(np.prod(self.shape, dtype=np.int64)) * self.dtype.itemsize, self.dtype.itemsize)
+        create = name is None
+        if not create and lock is None:
+            raise ValueError("Для подключения к слоту нужна его блокировка")
+        self.lock = lock if lock is not None else mp.get_context('spawn').Lock()
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=_HEADER_SIZE + payload_size)
+        self._seq = np.ndarray((1,), np.uint64, self._shm.buf, 0)
+        self._timestamp = np.ndarray((1,), np.float64, self._shm.buf, 8)
+        self._payload = np.ndarray(self.shape, self.dtype, self._shm.buf, _HEADER_SIZE)
+        if create:
+            self._seq[0] = 0
+        self._read_seq = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def put(self, value, timestamp: Optional[float] = None):
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self.lock:
+            self._payload[...] = value
+            self._timestamp[0] = timestamp
+            self._seq[0] += 1
+
+    def read_into(self, out: np.ndarray) -> Optional[Tuple[int, float, int]]:
+        """
+        Копирует свежий отсчет в out. Возвращает (номер, timestamp, пропущено)
+        или None, если нового отсчета нет.
+        """
+        # Выровненный uint64 читается целиком; устаревшее значение лишь
+        # откладывает отсчет до следующего вызова
+        if int(self._seq[0]) == self._read_seq:
+            return None
+        with self.lock:
+            seq = int(self._seq[0])
+            np.copyto(out, self._payload)
+            timestamp = float(self._timestamp[0])
+        skipped = seq - self._read_seq - 1
+        self._read_seq = seq
+        return seq, timestamp, skipped
+
+    def close(self, unlink: bool = False):
+        # Представления numpy держат буфер, их нужно отпустить до close()
+        self._seq = self._timestamp = self._payload = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+def _process_main(driver_cls, driver_args, shm_name, lock, shape, dtype, stop_event):
+    slot = SharedSlot(shape, dtype, name=shm_name, lock=lock)
+    driver = driver_cls(*driver_args)
+    try:
+        while not stop_event.is_set():
+            value = driver.get()
+            slot.put(value, time.monotonic())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        slot.close()
+
+
+class ProcessSensor(Sensor):
+    """
+    Сенсор, у которого цикл опроса драйвера идет в отдельном процессе, а
+    отсчеты приходят через SharedSlot. get() такой же, как у Sensor; с
+    pool_size значения-кадры отдаются в FrameBuffer из локального пула,
+    как у SensorCam. Драйвер - класс с методом get(), как SensorX, объявленный
+    на уровне модуля (его импортирует дочерний процесс).
+
+    Поддерживается только режим latest: слот хранит одно значение, и
+    отсчеты, которые get() не успел прочитать, пропускаются (skipped).
+    Слушатели вызываются из get() потребителя, а не при публикации в
+    дочернем процессе: они видят только прочитанные отсчеты, и запись
+    через SensorRecorder содержит те же пропуски.
+    """
+
+    def __init__(self, sensor_name, driver_cls, driver_args: tuple = (), shape: Tuple[int, ...] = (),
+                 dtype='f8', pool_size: Optional[int] = None):
+        super().__init__(sensor_name)
+        self._ctx = mp.get_context('spawn')
+        self._stop_thread_event = self._ctx.Event()
+        self._driver_cls = driver_cls
+        self._driver_args = driver_args
+        self._shared = SharedSlot(shape, dtype, lock=self._ctx.Lock())
+        self._pool = FramePool(shape, pool_size, dtype) if pool_size else None
+        self._out = np.empty(shape, dtype)
+        self.process = None
+
+    def start(self):
+        self.process = self._ctx.Process(
+            target=_process_main,
+            args=(self._driver_cls, self._driver_args, self._shared.name, self._shared.lock,
+                  self._shared.shape, self._shared.dtype.str, self._stop_thread_event),
+            name=f"sensor-{self.name}",
+            daemon=True,
+        )
+        self.process.start()
+
+    def stop(self):
+        self._stop_thread_event.set()
+        if self.process is not None:
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                logger.warning(f"Процесс сенсора {self.name} не завершился, прерываем")
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+        if self._shared is not None:
+            self._shared.close(unlink=True)
+            self._shared = None
+
+    def add_listener(self, callback):
+        # Дочерний процесс слушателей не видит: они получают только прочитанные отсчеты
+        logger.warning(f"Слушатели {self.name} получают только отсчеты, прочитанные get()")
+        super().add_listener(callback)
+
+    def get(self) -> Optional[Sample]:
+        if self._shared is None:
+            return None
+
+        buf = None
+        if self._pool is not None:
+            buf = self._pool.acquire()
+            if buf is None:
+                return None
+            out = buf.array
+        else:
+            out = self._out
+
+        meta = self._shared.read_into(out)
+        if meta is None:
+            if buf is not None:
+                buf.release()
+            return None
+
+        seq, timestamp, skipped = meta
+        value = buf if buf is not None else (out.item() if out.ndim == 0 else out.copy())
+        for listener in self._listeners:
+            listener(self.name, seq, timestamp, value)
+        return Sample(value, seq, timestamp, skipped)
+
+
+class SensorXDriver:
+    """Драйвер SensorX для процесса: тот же счетчик с задержкой delay."""
+
+    def __init__(self, delay):
+        self._delay = delay
+        self._data = 0
+
+    def get(self) -> int:
+        time.sleep(self._delay)
+        self._data = self._data + 1
+        return self._data
+
+
+class FilteredXDriver(SensorXDriver):
+    """SensorX с CPU-нагрузкой: экспоненциальный фильтр на чистом Python."""
+
+    def __init__(self, delay, work: int = 200_000):
+        super().__init__(delay)
+        self._work = work
+        self._state = 0.0
+
+    def get(self) -> int:
+        value = super().get()
+        state = self._state
+        for _ in range(self._work):
+            state = 0.999 * state + 0.001 * value
+        self._state = state
+        return value
+
+
+def ProcessSensorX(delay, work: int = 0) -> ProcessSensor:
+    if work:
+        return ProcessSensor(f"FilteredX{delay}", FilteredXDriver, (delay, work), dtype='i8')
+    return ProcessSensor(f"SensorX{delay}", SensorXDriver, (delay,), dtype='i8')
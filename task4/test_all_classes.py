@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+
+from all_classes import FramePool, FrameSensor, LatestSlot, OverlayPanel, Sensor
+
+
+class ManualSensor(Sensor):
+    """Sensor published by the test instead of a thread."""
+
+    def _run(self):
+        pass
+
+    def publish(self, value, timeout=None):
+        return self._publish(value, timeout=timeout)
+
+
+class ManualFrameSensor(FrameSensor):
+    def _run(self):
+        pass
+
+
+def test_latest_slot_is_empty_until_put():
+    slot = LatestSlot()
+
+    assert slot.get() is None
+
+
+def test_latest_slot_returns_each_value_once():
+    slot = LatestSlot()
+    slot.put("a", timestamp=1.0)
+
+    sample = slot.get()
+
+    assert (sample.value, sample.seq, sample.timestamp, sample.skipped) == ("a", 1, 1.0, 0)
+    assert slot.get() is None
+
+
+def test_latest_slot_counts_overwritten_values():
+    slot = LatestSlot()
+    for value in range(5):
+        slot.put(value)
+
+    sample = slot.get()
+
+    assert (sample.value, sample.seq, sample.skipped) == (4, 5, 4)
+    slot.put(5)
+    slot.put(6)
+    assert slot.get().skipped == 1
+
+
+def test_latest_mode_keeps_only_the_newest_sample():
+    sensor = ManualSensor("x")
+    for value in range(3):
+        sensor.publish(value)
+
+    assert sensor.get().value == 2
+    assert sensor.get() is None
+
+
+def test_queue_mode_keeps_every_sample_and_drops_on_timeout():
+    sensor = ManualSensor("x", mode="queue", queue_size=2)
+
+    assert sensor.publish(1, timeout=0)
+    assert sensor.publish(2, timeout=0)
+    assert not sensor.publish(3, timeout=0)
+    assert [sensor.get().value, sensor.get().value, sensor.get()] == [1, 2, None]
+
+
+def test_listeners_see_every_published_value():
+    sensor = ManualSensor("x")
+    seen = []
+    sensor.add_listener(lambda name, seq, timestamp, value: seen.append((name, seq, value)))
+    sensor.publish("a")
+    sensor.publish("b")
+
+    assert seen == [("x", 1, "a"), ("x", 2, "b")]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        ManualSensor("x", mode="ring")
+
+
+def test_frame_pool_hands_out_each_buffer_once():
+    pool = FramePool((2, 2, 3), size=2)
+
+    first, second = pool.acquire(), pool.acquire()
+
+    assert first is not None and second is not None and first is not second
+    assert first.array.shape == (2, 2, 3) and first.array.dtype == np.uint8
+    assert pool.acquire() is None
+
+
+def test_frame_buffer_returns_to_pool_after_last_release():
+    pool = FramePool((2, 2, 3), size=1)
+    buf = pool.acquire()
+    buf.retain()
+
+    buf.release()
+    assert pool.acquire() is None
+    buf.release()
+    assert pool.acquire() is buf
+
+
+def test_frame_buffer_double_release_is_rejected():
+    pool = FramePool((2, 2, 3), size=2)
+    buf = pool.acquire()
+    buf.release()
+
+    with pytest.raises(RuntimeError):
+        buf.release()
+    # The buffer is in the pool once
+    acquired = [pool.acquire(), pool.acquire()]
+    assert buf in acquired and acquired[0] is not acquired[1]
+    assert pool.acquire() is None
+
+
+def test_frame_sensor_slot_owns_the_published_buffer():
+    sensor = ManualFrameSensor("camera", pool_size=2)
+    pool = FramePool((2, 2, 3), size=2)
+    first = pool.acquire()
+    sensor._publish_frame(first)
+
+    sample = sensor.get()
+    assert sample.value is first
+    # Overwriting the slot drops its reference, the consumer still holds one
+    sensor._publish_frame(pool.acquire())
+    assert pool.acquire() is None
+    sample.value.release()
+    assert pool.acquire() is first
+
+    sensor.stop()
+
+
+def test_overlay_leaves_the_frame_untouched():
+    overlay = OverlayPanel()
+    frame = np.zeros((120, 320, 3), np.uint8)
+
+    shown = overlay.apply(frame, {"SensorX0.01": 42})
+
+    assert not frame.any()
+    assert shown is not frame and shown.any()
+    # The output buffer is reused while the frame shape stays the same
+    assert overlay.apply(frame, {"SensorX0.01": 43}) is shown
+
+
+def test_overlay_without_values_shows_the_frame():
+    frame = np.zeros((120, 320, 3), np.uint8)
+
+    assert OverlayPanel().apply(frame, {}) is frame
@@ -0,0 +1,42 @@
+import time
+
+from async_sensors import AsyncSensorX, SensorRuntime
+
+
+def test_sensor_publishes_and_stop_waits_for_its_task():
+    runtime = SensorRuntime(shards=2)
+    sensors = [AsyncSensorX(0.001, runtime=runtime) for _ in range(4)]
+    try:
+        for sensor in sensors:
+            sensor.start()
+        time.sleep(0.05)
+
+        for sensor in sensors:
+            assert sensor.get() is not None
+            sensor.stop()
+            assert sensor._task.done()
+    finally:
+        runtime.shutdown()
+
+
+def test_stop_right_after_start():
+    runtime = SensorRuntime()
+    sensor = AsyncSensorX(1, runtime=runtime)
+    try:
+        sensor.start()
+        sensor.stop()
+
+        assert sensor._future.done()
+        assert sensor._task.done()
+    finally:
+        runtime.shutdown()
+
+
+def test_stop_after_shutdown_returns():
+    runtime = SensorRuntime()
+    sensor = AsyncSensorX(0.001, runtime=runtime)
+    sensor.start()
+    time.sleep(0.01)
+    runtime.shutdown()
+
+    sensor.stop()
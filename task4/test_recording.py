@@ -0,0 +1,60 @@
+import threading
+import time
+
+import numpy as np
+
+import recording
+from recording import FrameStore, SampleLog
+
+
+def test_frame_store_round_trip(tmp_path):
+    store = FrameStore(str(tmp_path), chunk_frames=3, buffers=3)
+    frames = [np.full((2, 2, 3), i, np.uint8) for i in range(7)]
+    for seq, frame in enumerate(frames):
+        store.append("cam", seq, seq / 10, frame)
+    store.close()
+
+    read = list(FrameStore.read(str(tmp_path)))
+
+    assert [(seq, timestamp) for seq, timestamp, _ in read] == [(i, i / 10) for i in range(7)]
+    assert all((frame == frames[seq]).all() for seq, _, frame in read)
+    assert store.dropped == 0
+
+
+def test_frame_store_drops_instead_of_blocking_the_camera(tmp_path, monkeypatch):
+    writer_may_finish = threading.Event()
+    save = np.save
+
+    def stalled_save(*args, **kwargs):
+        writer_may_finish.wait()
+        save(*args, **kwargs)
+
+    monkeypatch.setattr(recording.np, "save", stalled_save)
+    store = FrameStore(str(tmp_path), chunk_frames=2, buffers=2)
+    frame = np.zeros((2, 2, 3), np.uint8)
+
+    started = time.perf_counter()
+    for seq in range(10):
+        store.append("cam", seq, float(seq), frame)
+    elapsed = time.perf_counter() - started
+
+    # Two chunks of two frames fill both buffers, the rest is dropped at once
+    assert store.dropped == 6
+    assert elapsed < 0.05
+    writer_may_finish.set()
+    store.close()
+    assert [seq for seq, _, _ in FrameStore.read(str(tmp_path))] == [0, 1, 2, 3]
+
+
+def test_sample_log_orders_records_by_time(tmp_path):
+    log = SampleLog(str(tmp_path), capacity=4)
+    log.append("a", 1, 2.0, 10)
+    log.append("b", 1, 1.0, 20)
+    log.append("a", 2, 3.0, 11)
+    log.flush()
+
+    reopened = SampleLog.open(str(tmp_path))
+
+    assert reopened.names == ["a", "b"]
+    assert list(reopened.records()["value"]) == [20, 10, 11]
+    assert list(reopened.records("a")["seq"]) == [1, 2]
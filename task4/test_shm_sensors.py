@@ -0,0 +1,79 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from shm_sensors import ProcessSensorX, SharedSlot
+
+
+@pytest.fixture
+def slot():
+    slot = SharedSlot((2, 3), 'f8')
+    yield slot
+    slot.close(unlink=True)
+
+
+def test_read_into_is_empty_until_put(slot):
+    out = np.empty((2, 3))
+
+    assert slot.read_into(out) is None
+
+
+def test_read_into_returns_each_value_once(slot):
+    out = np.empty((2, 3))
+    slot.put(np.full((2, 3), 7.0), timestamp=1.5)
+
+    assert slot.read_into(out) == (1, 1.5, 0)
+    assert (out == 7.0).all()
+    assert slot.read_into(out) is None
+
+
+def test_read_into_counts_overwritten_values(slot):
+    out = np.empty((2, 3))
+    for value in range(4):
+        slot.put(np.full((2, 3), value))
+
+    seq, _, skipped = slot.read_into(out)
+
+    assert (seq, skipped) == (4, 3)
+    assert (out == 3).all()
+
+
+def test_reader_sees_writes_through_another_mapping(slot):
+    reader = SharedSlot(slot.shape, slot.dtype, name=slot.name, lock=slot.lock)
+    out = np.empty((2, 3))
+    slot.put(np.arange(6.0).reshape(2, 3), timestamp=2.0)
+
+    assert reader.read_into(out) == (1, 2.0, 0)
+    assert (out == np.arange(6.0).reshape(2, 3)).all()
+    reader.close()
+
+
+def test_attaching_requires_the_lock(slot):
+    with pytest.raises(ValueError):
+        SharedSlot(slot.shape, slot.dtype, name=slot.name)
+
+
+def test_process_sensor_delivers_counter_values(monkeypatch):
+    # The spawned child inherits sys.path, task5 has its own all_classes module
+    monkeypatch.syspath_prepend(os.path.dirname(os.path.abspath(__file__)))
+    sensor = ProcessSensorX(0.001)
+    seen = []
+    sensor.add_listener(lambda name, seq, timestamp, value: seen.append(value))
+    sensor.start()
+    try:
+        samples = []
+        deadline = time.monotonic() + 30
+        while len(samples) < 3 and time.monotonic() < deadline:
+            sample = sensor.get()
+            if sample is not None:
+                samples.append(sample)
+            time.sleep(0.005)
+    finally:
+        sensor.stop()
+
+    assert len(samples) == 3
+    assert [sample.value for sample in samples] == seen
+    assert all(later.value > earlier.value for earlier, later in zip(samples, samples[1:]))
+    assert all(sample.value == sample.seq for sample in samples)
@@ -0,0 +1,74 @@
+import statistics
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from logging_settings import logger
+
+# YOLO input sizes must be multiples of the model stride
+STRIDE = 32
+
+
+class ResolutionController:
+    """
+    Steps the model input size down when inference does not fit the frame budget
+    of the target fps, and back up when the larger size is expected to fit again.
+
+    Results are scaled back to the original frame by ultralytics, so keypoints
+    stay in 640x480 coordinates whatever the input size is.
+    """
+
+    def __init__(self, target_fps: float, min_imgsz: int = 320, max_imgsz: int = 640, step: int = 64,
+                 window: int = 15, headroom: float = 0.8):
+        if target_fps <= 0:
+            raise ValueError("target_fps must be positive")
+        if min_imgsz > max_imgsz:
+            raise ValueError("min_imgsz must not exceed max_imgsz")
+        self.target_fps = target_fps
+        self.min_imgsz = max(STRIDE, min_imgsz // STRIDE * STRIDE)
+        self.max_imgsz = max(self.min_imgsz, max_imgsz // STRIDE * STRIDE)
+        self.step = max(STRIDE, step // STRIDE * STRIDE)
+        self.headroom = headroom
+        self.imgsz = self.max_imgsz
+        self.history: List[Tuple[float, int]] = [(time.time(), self.imgsz)]
+        self._latencies = deque(maxlen=window)
+
+    @property
+    def budget(self) -> float:
+        return 1 / self.target_fps
+
+    def for_workers(self, num_workers: int) -> "ResolutionController":
+        """Controller of one of num_workers workers sharing the frame stream"""
+        return ResolutionController(self.target_fps / num_workers, self.min_imgsz, self.max_imgsz, self.step,
+                                    self._latencies.maxlen, self.headroom)
+
+    def update(self, latency: float) -> int:
+        """Account the inference latency of one frame, seconds; returns the input size for the next frame"""
+        self._latencies.append(latency)
+        if len(self._latencies) < self._latencies.maxlen:
+            return self.imgsz
+
+        median = statistics.median(self._latencies)
+        new_imgsz = self.imgsz
+        if median > self.budget and self.imgsz > self.min_imgsz:
+            new_imgsz = max(self.min_imgsz, self.imgsz - self.step)
+        elif self.imgsz < self.max_imgsz:
+            larger = min(self.max_imgsz, self.imgsz + self.step)
+            # Inference time grows roughly with the number of input pixels
+            if median * (larger / self.imgsz) ** 2 < self.budget * self.headroom:
+                new_imgsz = larger
+
+        if new_imgsz != self.imgsz:
+            logger.info(f"imgsz {self.imgsz} -> {new_imgsz}: median latency {1000 * median:.1f} ms, "
+                        f"budget {1000 * self.budget:.1f} ms")
+            self.imgsz = new_imgsz
+            self.history.append((time.time(), new_imgsz))
+            # Latencies measured at the old size say nothing about the new one
+            self._latencies.clear()
+        return self.imgsz
+
+    def summary(self) -> Optional[str]:
+        if len(self.history) == 1:
+            return None
+        sizes = " -> ".join(str(imgsz) for _, imgsz in self.history)
+        return f"imgsz changed {len(self.history) - 1} times: {sizes}"
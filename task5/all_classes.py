@@ -3,19 +3,61 @@ import queue
 import threading
 import time
 from queue import Queue
-from typing import Union
+from typing import Optional, Union
 
 import cv2
 import numpy as np
 from ultralytics import YOLO
 
+from adaptive_resolution import ResolutionController
+from inference_cache import InferenceCache
 from logging_settings import logger
 
+MODEL_WEIGHTS = 'yolov8s-pose.pt'
+
+
+def load_model(shared: bool = False):
+    """
+    YOLO model on CPU. shared=True moves the weights to shared memory, so spawned
+    worker processes that receive the model map them instead of holding a copy.
+    """
+    model = YOLO(MODEL_WEIGHTS).to('cpu')
+    if shared:
+        # Fused in advance: fusing Conv+BN on the first predict in a worker would create private weights
+        model.model.fuse(verbose=False)
+        model.model.share_memory()
+        # The checkpoint is only needed for training and export, workers must not receive it
+        model.ckpt = {}
+    return model
+
+
+def infer(model, frame: np.ndarray, cache: Optional[InferenceCache] = None,
+          resolution: Optional[ResolutionController] = None) -> np.ndarray:
+    """Model result rendered on the frame, taken from the cache when possible"""
+    imgsz = resolution.imgsz if resolution is not None else None
+    result = cache.get(frame, imgsz) if cache is not None else None
+    if result is None:
+        start = time.perf_counter()
+        if imgsz is None:
+            result = model(frame, verbose=False)[0]
+        else:
+            result = model(frame, imgsz=imgsz, verbose=False)[0]
+        if resolution is not None:
+            resolution.update(time.perf_counter() - start)
+        if cache is not None:
+            cache.put(frame, result, imgsz)
+    return result.plot()
+
 
 class VideoProccessor:
-    def __init__(self, input_path: str, output_path: str, is_video: bool):
+    def __init__(self, input_path: str, output_path: str, is_video: bool,
+                 cache: Optional[InferenceCache] = None, resolution: Optional[ResolutionController] = None):
         self.input_path = input_path
         self.is_video = is_video
+        # Live frames never repeat, so caching them would only hash and write every frame
+        self.cache = cache if is_video else None
+        # Adaptive input size is for live sources only, recorded videos are processed at full size
+        self.resolution = None if is_video else resolution
         try:
             self.cap = cv2.VideoCapture(input_path)
 
@@ -50,8 +92,7 @@ class VideoProccessor:
 
     def process_frame(self, model, frame: np.ndarray) -> np.ndarray:
         """Processing of one frame"""
-        results = model(frame, verbose=False)
-        return results[0].plot()
+        return infer(model, frame, self.cache, self.resolution)
 
 
 class SingleVideoProccessor(VideoProccessor):
@@ -73,6 +114,8 @@ class SingleVideoProccessor(VideoProccessor):
             logger.critical(f"Fatal error: {str(e)}", exc_info=True)
         finally:
             cv2.destroyAllWindows()
+            if self.resolution is not None and self.resolution.summary():
+                logger.info(self.resolution.summary())
 
     def record_process(self, model) -> float:
         start_time = time.time()
@@ -85,7 +128,7 @@ class SingleVideoProccessor(VideoProccessor):
         return time.time() - start_time
 
     def run(self) -> float | None:
-        model = YOLO('yolov8s-pose.pt').to('cpu')
+        model = load_model()
         if self.is_video:
             return self.record_process(model)
         else:
@@ -93,8 +136,10 @@ class SingleVideoProccessor(VideoProccessor):
             return None
 
 
-def worker(in_queue, out_queue, stop_event):
-    local_model = YOLO('yolov8s-pose.pt').to('cpu')
+def worker(in_queue, out_queue, stop_event, cache: Optional[InferenceCache] = None,
+           resolution: Optional[ResolutionController] = None, model=None):
+    # A model with shared weights comes from the parent, otherwise every worker loads its own copy
+    local_model = model if model is not None else load_model()
     while not stop_event.is_set():
         try:
             frame_idx, frame = in_queue.get(timeout=0.1)
@@ -104,8 +149,10 @@ def worker(in_queue, out_queue, stop_event):
         if frame is None:
             break
 
-        res = local_model(frame, verbose=False)
-        out_queue.put((frame_idx, res[0].plot()))
+        out_queue.put((frame_idx, infer(local_model, frame, cache, resolution)))
+
+    if resolution is not None and resolution.summary():
+        logger.info(resolution.summary())
 
 
 def put_frames_to_queue(input_path: str, in_queue: Union[Queue, mp.Queue],
@@ -133,10 +180,16 @@ def put_frames_to_queue(input_path: str, in_queue: Union[Queue, mp.Queue],
 
 
 class MultiVideoProccessor(VideoProccessor):
-    def __init__(self, input_path: str, output_path: str, num_workers: int, parallel_type: str, is_video: bool):
-        super().__init__(input_path, output_path, is_video)
+    def __init__(self, input_path: str, output_path: str, num_workers: int, parallel_type: str, is_video: bool,
+                 cache: Optional[InferenceCache] = None, resolution: Optional[ResolutionController] = None,
+                 weights_sharing: bool = False):
+        super().__init__(input_path, output_path, is_video, cache, resolution)
         self.num_workers = num_workers
         self.parallel_type = parallel_type
+        self.weights_sharing = weights_sharing
+        self.workers = []
+        if weights_sharing and parallel_type == "thread":
+            logger.warning("Weights sharing applies to worker processes only, threads load their own models")
         if hasattr(self, 'cap'):
             self.cap.release()
 
@@ -157,9 +210,17 @@ class MultiVideoProccessor(VideoProccessor):
             worker_class = mp.Process
             stop_event = mp.Event()
 
-        workers = []
+        shared_model = None
+        if self.weights_sharing and self.parallel_type != "thread":
+            shared_model = load_model(shared=True)
+            logger.info("Model weights loaded once and shared with worker processes")
+
+        workers = self.workers = []
         for _ in range(self.num_workers):
-            worker_obj = worker_class(target=worker, args=(in_queue, out_queue, stop_event))
+            # Every worker gets 1/num_workers of the frames and adapts its own input size
+            resolution = self.resolution.for_workers(self.num_workers) if self.resolution is not None else None
+            worker_obj = worker_class(target=worker,
+                                      args=(in_queue, out_queue, stop_event, self.cache, resolution, shared_model))
             worker_obj.start()
             workers.append(worker_obj)
 
@@ -156,6 +156,7 @@
 # # Пример запуска:
 # # python benchmark.py path_to_video.mp4 --runs 3 --max_processes 8
 import os
+import threading
 import time
 import csv
 import logging
@@ -174,6 +175,9 @@ from all_classes import SingleVideoProccessor, MultiVideoProccessor
 from utils import is_video_file, get_video_resolution, resize_video
 from logging_settings import logger
 
+# common/ ищется через PYTHONPATH: PYTHONPATH=.. python benchmark.py
+from common.bench_results import BenchRun
+
 # Настройка логгера бенчмарка
 benchmark_logger = logging.getLogger("benchmark")
 benchmark_logger.setLevel(logging.INFO)
@@ -189,10 +193,46 @@ def get_system_info() -> Dict[str, str]:
         "OS": f"{platform.system()} {platform.release()}"
     }
 
-def run_benchmark(video_path: str, regime: str, num_workers: int, runs: int) -> List[Dict[str, float]]:
+class WorkerMemoryMonitor:
+    """Пиковые USS/PSS/RSS процессов-воркеров MultiVideoProccessor за прогон, МБ"""
+
+    def __init__(self, processor, interval: float = 0.5):
+        self.processor = processor
+        self.interval = interval
+        self.peaks = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for worker_obj in list(getattr(self.processor, "workers", [])):
+                try:
+                    info = psutil.Process(worker_obj.pid).memory_full_info()
+                except (psutil.Error, TypeError, ValueError):
+                    continue
+                peak = self.peaks.setdefault(worker_obj.pid, {"uss": 0, "pss": 0, "rss": 0})
+                for field in peak:
+                    # PSS есть только в Linux
+                    peak[field] = max(peak[field], getattr(info, field, 0))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def mean_mb(self, field: str) -> float:
+        values = [peak[field] for peak in self.peaks.values() if peak[field]]
+        return sum(values) / len(values) / (1024 ** 2) if values else float("nan")
+
+def run_benchmark(video_path: str, regime: str, num_workers: int, runs: int,
+                  weights_sharing: bool = False) -> List[Dict[str, float]]:
     results = []
-    for i in tqdm(range(runs), desc=f"{regime}-{num_workers}"):
-        temp_output = f"temp_{regime}_{num_workers}_run{i}{Path(video_path).suffix}"
+    config = f"{regime}-{num_workers}" + ("-shared" if weights_sharing else "")
+    for i in tqdm(range(runs), desc=config):
+        temp_output = f"temp_{config}_run{i}{Path(video_path).suffix}"
         try:
             # Запуск CPU/Memory мониторинга
             if regime == "thread":
@@ -205,9 +245,12 @@ def run_benchmark(video_path: str, regime: str, num_workers: int, runs: int) ->
             if num_workers == 1 or regime == "thread":
                 processor = SingleVideoProccessor(video_path, temp_output, True)
             else:
-                processor = MultiVideoProccessor(video_path, temp_output, num_workers, regime, True)
+                processor = MultiVideoProccessor(video_path, temp_output, num_workers, regime, True,
+                                                 weights_sharing=weights_sharing)
 
-            elapsed = processor.run()
+            # Память воркеров-процессов: USS - собственная, PSS - с долей общих страниц (весов)
+            with WorkerMemoryMonitor(processor) as monitor:
+                elapsed = processor.run()
             
             if regime == "thread":
                 time.sleep(1)  # даём процессору собраться с мыслями
@@ -218,10 +261,16 @@ def run_benchmark(video_path: str, regime: str, num_workers: int, runs: int) ->
                 mem_usage = psutil.virtual_memory().used / (1024 ** 2)
 
             results.append({
-                "Config": f"{regime}-{num_workers}",
+                "Config": config,
+                "Regime": regime,
+                "Workers": num_workers,
+                "Shared": weights_sharing,
                 "Total Time": elapsed,
                 "CPU Usage": cpu_usage,
                 "Mem Usage": mem_usage,
+                "Worker USS": monitor.mean_mb("uss"),
+                "Worker PSS": monitor.mean_mb("pss"),
+                "Worker RSS": monitor.mean_mb("rss"),
                 "Run": i + 1
             })
 
@@ -241,7 +290,9 @@ def generate_report(results: List[Dict[str, float]], output_csv: str = "benchmar
     agg_df = df.groupby("Config").agg({
         "Total Time": ["mean", "std"],
         "CPU Usage": "mean",
-        "Mem Usage": "mean"
+        "Mem Usage": "mean",
+        "Worker USS": "mean",
+        "Worker PSS": "mean",
     }).reset_index()
 
     best_config = agg_df.loc[agg_df[("Total Time", "mean")].idxmin()]
@@ -261,6 +312,40 @@ def generate_report(results: List[Dict[str, float]], output_csv: str = "benchmar
         plt.savefig(f"benchmark_{metric.lower().replace(' ', '_')}.png")
         plt.close()
 
+def report_weights_sharing(results: List[Dict[str, float]]):
+    # Экономия памяти на воркер: одинаковые конфигурации процессов с общими весами и без
+    df = pd.DataFrame(results)
+    df = df[df["Regime"] == "process"]
+    memory = df.groupby(["Workers", "Shared"])[["Worker USS", "Worker PSS", "Worker RSS"]].mean()
+    for workers in sorted(df["Workers"].unique()):
+        if (workers, False) not in memory.index or (workers, True) not in memory.index:
+            continue
+        private, shared = memory.loc[(workers, False)], memory.loc[(workers, True)]
+        line = (f"{workers} workers: USS {private['Worker USS']:.0f} -> {shared['Worker USS']:.0f} MB, "
+                f"PSS {private['Worker PSS']:.0f} -> {shared['Worker PSS']:.0f} MB, "
+                f"RSS {private['Worker RSS']:.0f} -> {shared['Worker RSS']:.0f} MB per worker "
+                f"(saved {private['Worker USS'] - shared['Worker USS']:.0f} MB USS)")
+        print(f"[INFO] Weights sharing, {line}")
+        benchmark_logger.info(f"Weights sharing, {line}")
+
+def write_bench_run(results: List[Dict[str, float]], video_path: str, output_json: str = "benchmark_results.json"):
+    # Общий формат результатов (common/bench_results.py) для сравнения с базовым прогоном
+    run = BenchRun("task5", os.path.dirname(os.path.abspath(__file__)))
+    run.describe("total_time_s", "s")
+    # mem_mb - прирост RSS (потоки) или память всей системы (процессы): зависит от хоста, только для сведения
+    run.describe("mem_mb", "MB", gate=False)
+    run.describe("worker_uss_mb", "MB")
+    run.describe("worker_pss_mb", "MB")
+    for result in results:
+        config = {"regime": result["Regime"], "workers": result["Workers"], "weights_sharing": result["Shared"],
+                  "video": os.path.basename(video_path)}
+        # NaN (нет процессов-воркеров) в JSON не пишем
+        worker_uss, worker_pss = result["Worker USS"], result["Worker PSS"]
+        run.add_trial(config, total_time_s=result["Total Time"], mem_mb=result["Mem Usage"],
+                      worker_uss_mb=None if pd.isna(worker_uss) else worker_uss,
+                      worker_pss_mb=None if pd.isna(worker_pss) else worker_pss)
+    run.save(output_json)
+
 def explain_results(system_info: Dict[str, str]):
     print("\n=== System Information ===")
     for k, v in system_info.items():
@@ -271,7 +356,9 @@ def explain_results(system_info: Dict[str, str]):
 @click.argument("video_path", type=click.Path(exists=True))
 @click.option("--runs", default=3, help="Количество прогонов на конфигурацию")
 @click.option("--max_processes", default=4, help="Макс. процессов для безопасности системы")
-def benchmark(video_path: str, runs: int, max_processes: int):
+@click.option("--json", "output_json", default="benchmark_results.json",
+              help="JSON с результатами в общем формате common/bench_results.py")
+def benchmark(video_path: str, runs: int, max_processes: int, output_json: str):
     if not is_video_file(video_path):
         raise ValueError("Input must be a video file")
 
@@ -279,25 +366,29 @@ def benchmark(video_path: str, runs: int, max_processes: int):
     if (height, width) != (640, 480):
         resize_video(video_path, (640, 480))
 
+    process_counts = [2, 4, *[i for i in [6, 8] if i <= max_processes]]
     configs = [
-        ("thread", 2), ("thread", 4), ("thread", 8), ("thread", 16),
-        ("process", 2), ("process", 4),
-        *[("process", i) for i in [6, 8] if i <= max_processes]
+        ("thread", 2, False), ("thread", 4, False), ("thread", 8, False), ("thread", 16, False),
+        *[("process", i, False) for i in process_counts],
+        # Те же процессы с общими весами модели - для оценки экономии памяти
+        *[("process", i, True) for i in process_counts]
     ]
 
     all_results = []
     system_info = get_system_info()
 
     try:
-        for regime, workers in configs:
-            benchmark_logger.info(f"Testing {regime}-{workers}...")
-            results = run_benchmark(video_path, regime, workers, runs)
+        for regime, workers, shared in configs:
+            benchmark_logger.info(f"Testing {regime}-{workers}{'-shared' if shared else ''}...")
+            results = run_benchmark(video_path, regime, workers, runs, shared)
             all_results.extend(results)
     except KeyboardInterrupt:
         benchmark_logger.info("Benchmark interrupted by user")
     finally:
         if all_results:
             generate_report(all_results)
+            report_weights_sharing(all_results)
+            write_bench_run(all_results, video_path, output_json)
             explain_results(system_info)
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from logging_settings import logger
+
+
+class InferenceCache:
+    """
+    On-disk cache of model outputs keyed by the model weights hash and the frame content hash.
+
+    A frame hits only if it is byte-identical to a cached one, e.g. when the
+    same file is processed again in any frame order; a re-encoded or resized
+    copy of a clip misses. Only boxes and keypoints are stored, so a hit is
+    rendered again with the current plotting code. Entries are evicted least
+    recently used first, by file modification time, once the cache exceeds
+    max_bytes. The hit/miss counters and the cache size are shared between
+    threads and worker processes.
+    """
+
+    def __init__(self, cache_dir: str, weights: str, max_bytes: int = 1 << 30):
+        self.cache_dir = cache_dir
+        self.weights = weights
+        self.max_bytes = max_bytes
+        # Worker processes are spawned (see MultiVideoProccessor.run), so the counters must be too
+        context = mp.get_context('spawn')
+        self.hits = context.Value('L', 0)
+        self.misses = context.Value('L', 0)
+        # Total size of the entries, -1 until the first put() measures it; its lock serializes eviction
+        self._size = context.Value('q', -1)
+        self._model_hash = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __getstate__(self):
+        # Worker processes compute the model hash themselves
+        state = self.__dict__.copy()
+        state['_model_hash'] = None
+        return state
+
+    @property
+    def model_hash(self) -> str:
+        if self._model_hash is None:
+            digest = hashlib.sha256()
+            try:
+                with open(self.weights, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+            except OSError:
+                logger.warning(f"Weights file {self.weights} not found, cache is keyed by its name")
+                digest.update(self.weights.encode())
+            self._model_hash = digest.hexdigest()[:16]
+        return self._model_hash
+
+    def key(self, frame: np.ndarray, imgsz: Optional[int] = None) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.model_hash.encode())
+        digest.update(str(imgsz).encode())
+        digest.update(str(frame.shape).encode())
+        digest.update(np.ascontiguousarray(frame).data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npz")
+
+    def get(self, frame: np.ndarray, imgsz: Optional[int] = None):
+        """Cached result for the frame at the model input size as an ultralytics Results object, None on a miss"""
+        path = self._path(self.key(frame, imgsz))
+        try:
+            with np.load(path) as data:
+                boxes = data['boxes']
+                keypoints = data['keypoints'] if 'keypoints' in data else None
+                names = json.loads(str(data['names']))
+            # Touching the entry makes it most recently used
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            with self.misses.get_lock():
+                self.misses.value += 1
+            return None
+
+        from ultralytics.engine.results import Results
+        with self.hits.get_lock():
+            self.hits.value += 1
+        return Results(frame, path=path, names={int(k): v for k, v in names.items()},
+                       boxes=boxes, keypoints=keypoints)
+
+    def put(self, frame: np.ndarray, result, imgsz: Optional[int] = None) -> None:
+        """Store boxes and keypoints of the model result for the frame at the model input size"""
+        path = self._path(self.key(frame, imgsz))
+        arrays = {
+            'boxes': result.boxes.data.cpu().numpy(),
+            'names': np.array(json.dumps(result.names)),
+        }
+        if result.keypoints is not None:
+            arrays['keypoints'] = result.keypoints.data.cpu().numpy()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name and renamed, so other workers never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            # Measured before the rename: once visible, the entry may be evicted by another worker
+            entry_size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            # A failed write leaves no temporary file behind
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._size.get_lock():
+            if self._size.value < 0:
+                self._size.value = self.size()
+            else:
+                self._size.value += entry_size
+            if self._size.value > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.npz'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache takes 90% of max_bytes"""
+        with self._size.get_lock():
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size.value = total
+        logger.info(f"Inference cache evicted down to {total / (1 << 20):.1f} MB")
+
+    def summary(self) -> Optional[str]:
+        total = self.hits.value + self.misses.value
+        if total == 0:
+            return None
+        return f"Inference cache: {self.hits.value} hits, {self.misses.value} misses ({100 * self.hits.value / total:.1f}% hits)"
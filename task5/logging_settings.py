@@ -2,17 +2,18 @@ import logging
 import os
 from logging.handlers import RotatingFileHandler
 
-if not os.path.exists('log'):
-    os.makedirs('log')
+# Каталог логов задается LOG_DIR, тесты направляют его во временный каталог
+LOG_DIR = os.environ.get('LOG_DIR', 'log')
+os.makedirs(LOG_DIR, exist_ok=True)
 try:
-    os.remove(os.path.join('log', 'app.log'))
+    os.remove(os.path.join(LOG_DIR, 'app.log'))
 except FileNotFoundError:
     pass
 
 logging.basicConfig(
     level=logging.INFO,
     handlers=[
-        RotatingFileHandler('log/app.log', maxBytes=1024 * 1024, backupCount=5)
+        RotatingFileHandler(os.path.join(LOG_DIR, 'app.log'), maxBytes=1024 * 1024, backupCount=5)
     ]
 )
 logger = logging.getLogger(__name__)
\ No newline at end of file
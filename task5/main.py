@@ -2,7 +2,9 @@ import os
 
 import click
 
-from all_classes import SingleVideoProccessor, MultiVideoProccessor
+from all_classes import MODEL_WEIGHTS, SingleVideoProccessor, MultiVideoProccessor
+from adaptive_resolution import ResolutionController
+from inference_cache import InferenceCache
 from logging_settings import logger
 from utils import get_video_resolution, resize_video, is_video_file
 
@@ -23,24 +25,76 @@ from utils import get_video_resolution, resize_video, is_video_file
     show_default=True,
     help="The number of flows/processes."
 )
-def main(input_path: str, regime: str, num_workers: int) :
+@click.option(
+    "--cache_dir",
+    type=str,
+    default=None,
+    help="Video files: directory of the on-disk inference cache; disabled by default."
+)
+@click.option(
+    "--cache_mb",
+    type=int,
+    default=1024,
+    show_default=True,
+    help="Size limit of the inference cache, MB."
+)
+@click.option(
+    "--target_fps",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Camera mode: adapt the model input size to keep up with this fps; disabled by default."
+)
+@click.option(
+    "--min_imgsz",
+    type=int,
+    default=320,
+    show_default=True,
+    help="Smallest model input size used by --target_fps."
+)
+@click.option(
+    "--max_imgsz",
+    type=int,
+    default=640,
+    show_default=True,
+    help="Largest model input size used by --target_fps."
+)
+@click.option(
+    "--weights_sharing",
+    is_flag=True,
+    help="Process mode: load the model weights once and share them read-only with the workers."
+)
+def main(input_path: str, regime: str, num_workers: int, cache_dir: str, cache_mb: int,
+         target_fps: float, min_imgsz: int, max_imgsz: int, weights_sharing: bool) :
 
-    if is_video_file(input_path):
+    is_video = is_video_file(input_path)
+    if is_video:
         height, width = get_video_resolution(input_path)
 
         if (height, width) != (640, 480):
             print(f"Change in resolution with {width} x {height} by 640x480 ...")
             resize_video(input_path, (640, 480))
 
+    if cache_dir and not is_video:
+        message = "Inference cache is only used for video files, camera frames never repeat"
+        print(message)
+        logger.warning(message)
+        cache_dir = None
+    cache = InferenceCache(cache_dir, MODEL_WEIGHTS, cache_mb << 20) if cache_dir else None
+    resolution = ResolutionController(target_fps, min_imgsz, max_imgsz) if target_fps is not None else None
+
     try:
         if num_workers == 1:
-            processor = SingleVideoProccessor(input_path, f"result_{os.path.basename(input_path)}", is_video_file(input_path))
+            processor = SingleVideoProccessor(input_path, f"result_{os.path.basename(input_path)}", is_video, cache, resolution)
         else:
-            processor = MultiVideoProccessor(input_path, f"result_{os.path.basename(input_path)}", num_workers, regime, is_video_file(input_path))
+            processor = MultiVideoProccessor(input_path, f"result_{os.path.basename(input_path)}", num_workers, regime, is_video, cache, resolution, weights_sharing)
 
         time_elapsed = processor.run()
         if time_elapsed is not None:
             print(f"Обработка заняла {time_elapsed:.2f} сек")
+        summary = cache.summary() if cache is not None else None
+        if summary:
+            print(summary)
+            logger.info(summary)
 
     except Exception as e:
         logger.error(e)
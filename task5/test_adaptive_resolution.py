@@ -0,0 +1,64 @@
+import pytest
+
+from adaptive_resolution import ResolutionController
+
+
+def feed(controller, latency, frames):
+    for _ in range(frames):
+        imgsz = controller.update(latency)
+    return imgsz
+
+
+def test_steps_down_when_over_budget():
+    controller = ResolutionController(target_fps=20, min_imgsz=320, max_imgsz=640, step=64, window=5)
+
+    # 80 ms against a 50 ms budget: one step per full window
+    assert feed(controller, 0.080, 4) == 640
+    assert feed(controller, 0.080, 1) == 576
+    assert feed(controller, 0.080, 5) == 512
+    assert feed(controller, 0.080, 100) == 320
+    assert [imgsz for _, imgsz in controller.history] == [640, 576, 512, 448, 384, 320]
+
+
+def test_steps_up_only_with_headroom():
+    controller = ResolutionController(target_fps=20, min_imgsz=320, max_imgsz=640, step=64, window=5)
+    feed(controller, 0.080, 100)
+    assert controller.imgsz == 320
+
+    # 36 ms at 320 is expected to take 36 * (384 / 320)**2 = 51.8 ms at 384, over 0.8 * 50 ms
+    assert feed(controller, 0.036, 20) == 320
+    # 25 ms scales to 36 ms, within the headroom
+    assert feed(controller, 0.025, 5) == 384
+
+
+def test_holds_size_within_budget():
+    controller = ResolutionController(target_fps=20, min_imgsz=320, max_imgsz=640, step=64, window=5)
+
+    assert feed(controller, 0.045, 50) == 640
+    assert controller.summary() is None
+
+
+def test_sizes_are_multiples_of_stride():
+    controller = ResolutionController(target_fps=10, min_imgsz=300, max_imgsz=650, step=50)
+
+    assert (controller.min_imgsz, controller.max_imgsz, controller.step) == (288, 640, 32)
+
+
+def test_for_workers_splits_the_frame_rate():
+    controller = ResolutionController(target_fps=30, window=7)
+    worker = controller.for_workers(3)
+
+    assert worker.target_fps == 10
+    assert worker.budget == pytest.approx(0.1)
+    assert worker._latencies.maxlen == 7
+
+
+@pytest.mark.parametrize("target_fps", [0, -5])
+def test_rejects_non_positive_target_fps(target_fps):
+    with pytest.raises(ValueError):
+        ResolutionController(target_fps)
+
+
+def test_rejects_inverted_size_range():
+    with pytest.raises(ValueError):
+        ResolutionController(10, min_imgsz=640, max_imgsz=320)
@@ -0,0 +1,130 @@
+import multiprocessing as mp
+import os
+
+import numpy as np
+import pytest
+
+import inference_cache
+from inference_cache import InferenceCache
+
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class FakeResult:
+    """The part of an ultralytics Results object that InferenceCache.put() reads."""
+
+    def __init__(self, boxes=64):
+        self.boxes = type("Boxes", (), {"data": FakeTensor(np.random.rand(boxes, 6).astype(np.float32))})()
+        self.keypoints = None
+        self.names = {0: "person"}
+
+
+def frame(seed):
+    return np.random.default_rng(seed).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+
+
+def entries(cache):
+    return sorted(path for _, _, path in cache._entries())
+
+
+def put_frames(cache, seeds):
+    for seed in seeds:
+        cache.put(frame(seed), FakeResult(), 640)
+
+
+@pytest.fixture
+def weights(tmp_path):
+    path = tmp_path / "weights.pt"
+    path.write_bytes(b"weights")
+    return str(path)
+
+
+def test_key_depends_on_frame_size_and_weights(tmp_path, weights):
+    cache = InferenceCache(str(tmp_path / "cache"), weights)
+    other_weights = tmp_path / "other.pt"
+    other_weights.write_bytes(b"other")
+    other = InferenceCache(str(tmp_path / "cache"), str(other_weights))
+
+    assert cache.key(frame(0), 640) == cache.key(frame(0).copy(), 640)
+    assert cache.key(frame(0), 640) != cache.key(frame(1), 640)
+    assert cache.key(frame(0), 640) != cache.key(frame(0), 320)
+    assert cache.key(frame(0), 640) != other.key(frame(0), 640)
+
+
+def test_miss_is_counted(tmp_path, weights):
+    cache = InferenceCache(str(tmp_path / "cache"), weights)
+
+    assert cache.get(frame(0), 640) is None
+    assert (cache.hits.value, cache.misses.value) == (0, 1)
+
+
+def test_eviction_keeps_size_under_limit(tmp_path, weights):
+    cache = InferenceCache(str(tmp_path / "cache"), weights)
+    put_frames(cache, range(1))
+    entry_size = cache.size()
+    cache.max_bytes = 5 * entry_size
+
+    put_frames(cache, range(1, 20))
+
+    assert cache.size() <= cache.max_bytes
+    assert cache._size.value == cache.size()
+
+
+def test_eviction_removes_least_recently_used(tmp_path, weights):
+    cache = InferenceCache(str(tmp_path / "cache"), weights)
+    put_frames(cache, range(4))
+    paths = {seed: cache._path(cache.key(frame(seed), 640)) for seed in range(4)}
+    # Frame 0 is the oldest write but was used most recently
+    for age, seed in enumerate([1, 2, 3, 0]):
+        os.utime(paths[seed], (1000 + age, 1000 + age))
+    cache.max_bytes = cache.size() * 3 // 4
+
+    cache.evict()
+
+    assert not os.path.exists(paths[1])
+    assert os.path.exists(paths[0])
+    assert cache.size() <= cache.max_bytes * 0.9
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path, weights, monkeypatch):
+    cache = InferenceCache(str(tmp_path / "cache"), weights)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(inference_cache.np, "savez", fail)
+    with pytest.raises(OSError):
+        put_frames(cache, [0])
+
+    assert [name for _, _, names in os.walk(cache.cache_dir) for name in names] == []
+
+
+def put_in_worker(cache, seeds):
+    put_frames(cache, seeds)
+
+
+def test_size_limit_holds_across_worker_processes(tmp_path, weights):
+    cache = InferenceCache(str(tmp_path / "cache"), weights)
+    put_frames(cache, [0])
+    cache.max_bytes = 6 * cache.size()
+
+    context = mp.get_context("spawn")
+    workers = [context.Process(target=put_in_worker, args=(cache, range(1 + 10 * i, 11 + 10 * i)))
+               for i in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert cache.size() <= cache.max_bytes
+    assert cache._size.value == cache.size()